@@ -1,30 +1,68 @@
+import importlib.util
+import math
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from cache_dispositions import disposition_en_cache
+from disposition import DispositionSpheres
+from empilement_aleatoire import (DISPERSION, LOI_RAYONS, LOIS_RAYONS, MODE_ALEATOIRE, MODE_POLYDISPERSE,
+                                  MODES_DISPOSITION, generer_centres_aleatoires_boite, remplir_polydisperse)
+from empreinte import polygone_rectangle
+from instrumentation import compter, phase, rendre_figure, session_instrumentation
+from rendu_contours import dessiner_contour_prisme
+from rendu_spheres import dessiner_spheres_lod
+from reseau_spheres import MODES_EMPILEMENT, calculer_nombre_par_axe, generer_centres_boite
+from solveur_rayon import afficher_solutions, resoudre_boite, saisir_objectifs
+from statistiques import afficher_statistiques, statistiques_boite, statistiques_disposition
+from validation import afficher_rapport, valider_disposition
 
+@session_instrumentation()
 def dessiner_parallelepipede_avec_spheres():
     """
     Génère et affiche un parallélépipède rectangle rempli de sphères
     """
+    import matplotlib.pyplot as plt
+
     print("=== Générateur de Parallélépipède avec Sphères ===")
     
-    # Saisie des dimensions du parallélépipède
-    try:
-        largeur = float(input("Entrez la largeur du parallélépipède (axe X): "))
-        longueur = float(input("Entrez la longueur du parallélépipède (axe Y): "))
-        hauteur = float(input("Entrez la hauteur du parallélépipède (axe Z): "))
-        rayon_sphere = float(input("Entrez le rayon des sphères: "))
+    with phase("saisie"):
+        # Saisie des dimensions du parallélépipède
+        try:
+            largeur = float(input("Entrez la largeur du parallélépipède (axe X): "))
+            longueur = float(input("Entrez la longueur du parallélépipède (axe Y): "))
+            hauteur = float(input("Entrez la hauteur du parallélépipède (axe Z): "))
+            rayon_sphere = float(input("Entrez le rayon des sphères: "))
+            mode = input("Mode d'empilement (cubique/cfc/hc/aleatoire/polydisperse) [cubique]: ").strip().lower() or "cubique"
         
-        if largeur <= 0 or longueur <= 0 or hauteur <= 0 or rayon_sphere <= 0:
-            print("Erreur: Toutes les valeurs doivent être positives!")
-            return
+            if mode not in MODES_DISPOSITION:
+                print("Erreur: Mode d'empilement inconnu!")
+                return
             
-        if rayon_sphere * 2 > min(largeur, longueur, hauteur):
-            print("Attention: Le diamètre des sphères est plus grand que la plus petite dimension!")
+            graine, loi, dispersion = None, LOI_RAYONS, DISPERSION
+            if mode == MODE_POLYDISPERSE:
+                loi = input(f"Loi des rayons ({'/'.join(LOIS_RAYONS)}) [{LOI_RAYONS}]: ").strip().lower() or LOI_RAYONS
+                saisie = input(f"Dispersion relative des rayons [{DISPERSION}]: ").strip()
+                dispersion = float(saisie) if saisie else DISPERSION
+                
+                if loi not in LOIS_RAYONS:
+                    print("Erreur: Loi des rayons inconnue!")
+                    return
+            if mode in (MODE_ALEATOIRE, MODE_POLYDISPERSE):
+                saisie = input("Graine du tirage (vide = tirage libre): ").strip()
+                graine = int(saisie) if saisie else None
             
-    except ValueError:
-        print("Erreur: Veuillez entrer des nombres valides!")
-        return
+            if not all(math.isfinite(val) for val in [largeur, longueur, hauteur, rayon_sphere, dispersion]):
+                print("Erreur: Toutes les valeurs doivent être des nombres finis!")
+                return
+            if largeur <= 0 or longueur <= 0 or hauteur <= 0 or rayon_sphere <= 0 or dispersion < 0:
+                print("Erreur: Toutes les valeurs doivent être positives!")
+                return
+            
+            if rayon_sphere * 2 > min(largeur, longueur, hauteur):
+                print("Attention: Le diamètre des sphères est plus grand que la plus petite dimension!")
+            
+        except ValueError:
+            print("Erreur: Veuillez entrer des nombres valides!")
+            return
     
     # Calcul du nombre de sphères dans chaque direction
     # On calcule combien de sphères peuvent tenir dans chaque dimension
@@ -33,58 +71,82 @@ def dessiner_parallelepipede_avec_spheres():
     
     # Calcul du nombre maximal de sphères par dimension
     # On s'assure qu'il y a assez d'espace pour placer les sphères sans qu'elles dépassent
-    nx = max(1, int(largeur / diametre))
-    ny = max(1, int(longueur / diametre))
-    nz = max(1, int(hauteur / diametre))
+    nx, ny, nz = calculer_nombre_par_axe(largeur, longueur, hauteur, diametre)
     
     # Vérification que les sphères peuvent physiquement tenir dans l'espace
     espace_min_x = largeur / nx
     espace_min_y = longueur / ny
     espace_min_z = hauteur / nz
     
-    if (espace_min_x < diametre or espace_min_y < diametre or espace_min_z < diametre):
+    if mode == "cubique" and (espace_min_x < diametre or espace_min_y < diametre or espace_min_z < diametre):
         print("Attention: Les sphères risquent de se chevaucher!")
     
-    print(f"\nNombre de sphères: {nx} x {ny} x {nz} = {nx * ny * nz} sphères")
-    print(f"Espace alloué par sphère: {espace_min_x:.1f} x {espace_min_y:.1f} x {espace_min_z:.1f}")
+    # Statistiques analytiques, sans attendre le rendu de la scène
+    # (en mode aléatoire ou polydisperse, elles ne sont connues qu'après le tirage)
+    if mode in MODES_EMPILEMENT:
+        with phase("statistiques"):
+            stats = statistiques_boite(largeur, longueur, hauteur, rayon_sphere, mode)
+        
+        if mode == "cubique":
+            print(f"\nNombre de sphères: {nx} x {ny} x {nz} = {nx * ny * nz} sphères")
+            print(f"Espace alloué par sphère: {espace_min_x:.1f} x {espace_min_y:.1f} x {espace_min_z:.1f}")
+        else:
+            print(f"\nNombre de sphères (empilement {mode}): {stats['nombre_total']} sphères")
+        
+        afficher_statistiques(stats, "Volume du parallélépipède")
     
+    # Construction de la scène puis affichage
+    with phase("construction"):
+        fig = construire_figure_parallelepipede(largeur, longueur, hauteur, rayon_sphere, mode, graine,
+                                                loi=loi, dispersion=dispersion)
+    rendre_figure(fig)
+    with phase("affichage"):
+        plt.show()
+
+def construire_figure_parallelepipede(largeur, longueur, hauteur, rayon_sphere, mode="cubique", graine=None, nombre=None,
+                                      rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION):
+    """
+    Construit la figure du parallélépipède rempli de sphères, sans l'afficher
+
+    En mode aléatoire, graine rend le tirage reproductible et nombre borne
+    le nombre de sphères (saturation par défaut). En mode polydisperse, les
+    rayons sont donnés (rayons) ou tirés selon loi autour de rayon_sphere.
+    """
+    import matplotlib.pyplot as plt
+
     # Création de la figure 3D
     fig = plt.figure(figsize=(12, 9))
     ax = fig.add_subplot(111, projection='3d')
     
-    # Génération des centres des sphères
-    centres_x = []
-    centres_y = []
-    centres_z = []
-    
-    # Calcul des positions pour centrer les sphères dans des sous-volumes égaux
-    # Diviser chaque dimension en nx, ny, nz parties égales
-    # Placer chaque sphère au centre de gravité de son sous-volume
-    
-    for i in range(nx):
-        for j in range(ny):
-            for k in range(nz):
-                # Calculer le centre de chaque sous-volume
-                # Chaque sous-volume a une largeur de largeur/nx, longueur/ny, hauteur/nz
-                x = (i + 0.5) * (largeur / nx)  # Centre en X du sous-volume i
-                y = (j + 0.5) * (longueur / ny)  # Centre en Y du sous-volume j
-                z = (k + 0.5) * (hauteur / nz)  # Centre en Z du sous-volume k
-                
-                centres_x.append(x)
-                centres_y.append(y)
-                centres_z.append(z)
+    # Génération des centres des sphères selon le mode d'empilement
+    # (en mode cubique, chaque sphère est au centre de gravité de son sous-volume)
+    disposition = disposition_parallelepipede_en_cache(largeur, longueur, hauteur, rayon_sphere, mode, graine, nombre,
+                                                       rayons, loi, dispersion)
+    compter("spheres", len(disposition))
+    
+    if mode not in MODES_EMPILEMENT:
+        print(f"\nNombre de sphères (empilement {mode}): {len(disposition)} sphères")
+        afficher_statistiques(statistiques_disposition(disposition.centres, disposition.rayon, largeur * longueur * hauteur,
+                                                       mode, "Parallélépipède"),
+                              "Volume du parallélépipède")
+    
+    # Vérifier l'absence de chevauchement et de débordement
+    with phase("validation"):
+        afficher_rapport(valider_disposition(disposition, disposition.rayon, boite=(0, 0, 0, largeur, longueur, hauteur)))
     
     # Dessiner le contour du parallélépipède
-    dessiner_contour_parallelepipede(ax, largeur, longueur, hauteur)
+    with phase("dessin_contour"):
+        dessiner_contour_parallelepipede(ax, largeur, longueur, hauteur)
     
     # Dessiner les sphères
-    dessiner_spheres(ax, centres_x, centres_y, centres_z, rayon_sphere)
+    with phase("dessin_spheres"):
+        dessiner_spheres(ax, disposition)
     
     # Configuration de l'affichage
     ax.set_xlabel('X (Largeur)')
     ax.set_ylabel('Y (Longueur)')
     ax.set_zlabel('Z (Hauteur)')
-    ax.set_title(f'Parallélépipède ({largeur}x{longueur}x{hauteur}) avec {len(centres_x)} sphères (r={rayon_sphere})')
+    ax.set_title(f'Parallélépipède ({largeur}x{longueur}x{hauteur}) avec {len(disposition)} sphères (r={rayon_sphere})')
     
     # Égaliser les échelles des axes
     max_dim = max(largeur, longueur, hauteur)
@@ -92,65 +154,85 @@ def dessiner_parallelepipede_avec_spheres():
     ax.set_ylim([0, max_dim])
     ax.set_zlim([0, max_dim])
     
-    # Informations supplémentaires
-    volume_parallelepipede = largeur * longueur * hauteur
-    volume_sphere = (4/3) * np.pi * rayon_sphere**3
-    volume_total_spheres = len(centres_x) * volume_sphere
-    taux_remplissage = (volume_total_spheres / volume_parallelepipede) * 100
-    
-    print(f"\n=== Statistiques ===")
-    print(f"Volume du parallélépipède: {volume_parallelepipede:.2f}")
-    print(f"Volume d'une sphère: {volume_sphere:.2f}")
-    print(f"Volume total des sphères: {volume_total_spheres:.2f}")
-    print(f"Taux de remplissage: {taux_remplissage:.1f}%")
-    
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return fig
+
+def disposition_parallelepipede_en_cache(largeur, longueur, hauteur, rayon_sphere, mode="cubique", graine=None, nombre=None,
+                                         rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION):
+    """
+    Retourne la disposition des sphères du parallélépipède, depuis le cache si possible
+    """
+    parametres = {"largeur": largeur, "longueur": longueur, "hauteur": hauteur, "rayon": rayon_sphere, "mode": mode}
+    if mode == MODE_ALEATOIRE:
+        parametres.update(graine=graine, nombre=nombre)
+        generer = lambda: generer_centres_aleatoires_boite(0, 0, largeur, longueur, hauteur, rayon_sphere, nombre, graine=graine)
+    elif mode == MODE_POLYDISPERSE:
+        # Centres et rayons sont mis en cache ensemble, dans un tableau (N, 4)
+        parametres.update(graine=graine, loi=loi, dispersion=dispersion,
+                          rayons=None if rayons is None else np.asarray(rayons, dtype=float).tolist())
+        generer = lambda: np.column_stack(remplir_polydisperse(polygone_rectangle(0, 0, largeur, longueur), hauteur,
+                                                               rayon_sphere, rayons, loi, dispersion, graine))
+    else:
+        generer = lambda: generer_centres_boite(0, 0, largeur, longueur, hauteur, 2 * rayon_sphere, mode=mode)
+    with phase("generation_centres"):
+        # Un tirage sans graine n'est pas reproductible : inutile de le garder en cache
+        if mode not in MODES_EMPILEMENT and graine is None:
+            centres = generer()
+        else:
+            centres = disposition_en_cache("boite", parametres, generer)
+    if mode == MODE_POLYDISPERSE:
+        return DispositionSpheres(centres[:, :3], centres[:, 3])
+    return DispositionSpheres(centres, rayon_sphere)
 
 def dessiner_contour_parallelepipede(ax, largeur, longueur, hauteur):
     """
     Dessine le contour du parallélépipède
     """
-    # Définir les 8 sommets du parallélépipède
-    sommets = np.array([
-        [0, 0, 0], [largeur, 0, 0], [largeur, longueur, 0], [0, longueur, 0],  # base inférieure
-        [0, 0, hauteur], [largeur, 0, hauteur], [largeur, longueur, hauteur], [0, longueur, hauteur]  # base supérieure
-    ])
-    
-    # Définir les arêtes du parallélépipède
-    aretes = [
-        [0, 1], [1, 2], [2, 3], [3, 0],  # base inférieure
-        [4, 5], [5, 6], [6, 7], [7, 4],  # base supérieure
-        [0, 4], [1, 5], [2, 6], [3, 7]   # arêtes verticales
-    ]
-    
-    # Dessiner les arêtes
-    for arete in aretes:
-        points = sommets[arete]
-        ax.plot3D(*points.T, 'k-', linewidth=2, alpha=0.6)
+    # Les 12 arêtes (base inférieure, base supérieure, verticales) en un seul artiste
+    dessiner_contour_prisme(ax, polygone_rectangle(0, 0, largeur, longueur), hauteur, alpha=0.6)
 
-def dessiner_spheres(ax, centres_x, centres_y, centres_z, rayon):
+def dessiner_spheres(ax, disposition):
     """
-    Dessine les sphères dans le repère 3D
+    Dessine les sphères d'une disposition dans le repère 3D
     """
-    # Créer une sphère unitaire
-    u = np.linspace(0, 2 * np.pi, 20)
-    v = np.linspace(0, np.pi, 15)
-    x_sphere = np.outer(np.cos(u), np.sin(v))
-    y_sphere = np.outer(np.sin(u), np.sin(v))
-    z_sphere = np.outer(np.ones(np.size(u)), np.cos(v))
-    
-    # Dessiner chaque sphère
-    colors = plt.cm.viridis(np.linspace(0, 1, len(centres_x)))
-    
-    for i, (cx, cy, cz) in enumerate(zip(centres_x, centres_y, centres_z)):
-        # Adapter la taille et la position de la sphère
-        x = rayon * x_sphere + cx
-        y = rayon * y_sphere + cy
-        z = rayon * z_sphere + cz
-        
-        # Dessiner la sphère avec une couleur différente
-        ax.plot_surface(x, y, z, color=colors[i], alpha=0.7, linewidth=0)
+    # Une couleur différente par sphère (sauf couleurs portées par la disposition),
+    # niveau de détail adapté à la scène
+    valeurs_couleur = disposition.valeurs
+    if valeurs_couleur is None:
+        valeurs_couleur = np.linspace(0, 1, len(disposition))
+    dessiner_spheres_lod(ax, disposition.centres, disposition.rayon, valeurs_couleur)
+
+def rechercher_rayon_parallelepipede():
+    """
+    Cherche le rayon et le mode d'empilement qui atteignent un objectif de
+    remplissage, sans générer ni afficher la scène
+    """
+    print("=== Recherche du Rayon des Sphères ===")
+    
+    try:
+        largeur = float(input("Entrez la largeur du parallélépipède (axe X): "))
+        longueur = float(input("Entrez la longueur du parallélépipède (axe Y): "))
+        hauteur = float(input("Entrez la hauteur du parallélépipède (axe Z): "))
+        taux, nombre, jeu = saisir_objectifs()
+    except ValueError:
+        print("Erreur: Veuillez entrer des nombres valides!")
+        return
+    
+    if not all(math.isfinite(val) for val in [largeur, longueur, hauteur]):
+        print("Erreur: Toutes les valeurs doivent être des nombres finis!")
+        return
+    if largeur <= 0 or longueur <= 0 or hauteur <= 0:
+        print("Erreur: Toutes les valeurs doivent être positives!")
+        return
+    
+    try:
+        with phase("recherche"):
+            resultat = resoudre_boite(largeur, longueur, hauteur, taux, nombre, jeu)
+    except ValueError as erreur:
+        print(f"Erreur: {erreur}")
+        return
+    
+    afficher_solutions(resultat)
 
 def menu_principal():
     """
@@ -161,24 +243,25 @@ def menu_principal():
         print("    GÉNÉRATEUR DE PARALLÉLÉPIPÈDE AVEC SPHÈRES")
         print("="*50)
         print("1. Générer un nouveau parallélépipède")
-        print("2. Quitter")
+        print("2. Rechercher le rayon pour un objectif de remplissage")
+        print("3. Quitter")
         
-        choix = input("\nVotre choix (1-2): ").strip()
+        choix = input("\nVotre choix (1-3): ").strip()
         
         if choix == "1":
             dessiner_parallelepipede_avec_spheres()
         elif choix == "2":
+            rechercher_rayon_parallelepipede()
+        elif choix == "3":
             print("Au revoir!")
             break
         else:
-            print("Choix invalide! Veuillez entrer 1 ou 2.")
+            print("Choix invalide! Veuillez entrer 1, 2 ou 3.")
 
 if __name__ == "__main__":
-    # Vérifier que matplotlib est disponible
-    try:
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import Axes3D
-        menu_principal()
-    except ImportError:
+    # Vérifier que matplotlib est disponible, sans l'importer avant le premier dessin
+    if importlib.util.find_spec("matplotlib") is None:
         print("Erreur: matplotlib n'est pas installé!")
-        print("Installez-le avec: pip install matplotlib")
\ No newline at end of file
+        print("Installez-le avec: pip install matplotlib")
+    else:
+        menu_principal()
@@ -0,0 +1,221 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Mesures sans fenêtre : le backend doit être fixé avant tout import de pyplot
+import matplotlib
+matplotlib.use("Agg")
+
+# Les temps de génération doivent être mesurés sans le cache des dispositions
+os.environ["TEST3D_CACHE"] = ""
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Nombres de sphères visés, de 10 à 10^6
+TAILLES = [10, 100, 1000, 10000, 100000, 1000000]
+
+REPETITIONS = 3
+
+# Dimensions fixes de la structure en croix des mesures sans sphères
+CROIX = {"largeur_centrale": 10, "longueur_centrale": 8, "largeur_bras": 4, "longueur_bras": 6, "hauteur": 5}
+
+def cote_pour(taille):
+    """
+    Côté d'un cube de diamètre unitaire contenant environ taille sphères (réseau cubique)
+    """
+    return max(1, round(taille ** (1 / 3)))
+
+def preparer_axes():
+    """
+    Crée une figure 3D vide sur laquelle mesurer le dessin
+    """
+    fig = plt.figure(figsize=(12, 9))
+    return fig, fig.add_subplot(111, projection='3d')
+
+def cas_generation_rectangle(taille):
+    from plan_croix_avec_spheres import generer_spheres_rectangle
+    cote = cote_pour(taille)
+    return lambda: generer_spheres_rectangle(0, 0, cote, cote, cote, 1.0), cote ** 3
+
+def cas_generation_boite(mode):
+    def cas(taille):
+        from reseau_spheres import compter_centres_boite, generer_centres_boite
+        # Cube de même volume que le réseau cubique, rempli selon le mode
+        cote = cote_pour(taille)
+        return (lambda: generer_centres_boite(0, 0, cote, cote, cote, 1.0, mode=mode),
+                compter_centres_boite(cote, cote, cote, 1.0, mode))
+    return cas
+
+def cas_generation_aleatoire(taille):
+    from empilement_aleatoire import generer_centres_aleatoires_boite
+    # Cube contenant environ taille sphères de diamètre unitaire à saturation (~37 %)
+    cote = max(1.0, (taille * np.pi / 6 / 0.37) ** (1 / 3))
+    return lambda: generer_centres_aleatoires_boite(0, 0, cote, cote, cote, 0.5, graine=0), taille
+
+def cas_plus_proches_voisins(taille):
+    from index_spheres import IndexSpheres
+    # Autant de requêtes que de centres, tirés dans le même cube
+    rng = np.random.default_rng(0)
+    cote = taille ** (1 / 3)
+    index = IndexSpheres(rng.random((taille, 3)) * cote, 0.3)
+    points = rng.random((taille, 3)) * cote
+    # Première requête hors mesure : construction de l'arbre ou des gabarits
+    index.k_plus_proches(points[:1], 1)
+    return lambda: index.k_plus_proches(points, 1), taille, taille
+
+def cas_murs_sols(taille):
+    from plan_3d import generer_structure_croix
+    def mesure():
+        fig, ax = preparer_axes()
+        generer_structure_croix(ax, *CROIX.values(), 0.3)
+        plt.close(fig)
+    return mesure, 0
+
+def cas_contour_croix(taille):
+    from plan_croix_avec_spheres import dessiner_contour_croix_3d
+    def mesure():
+        fig, ax = preparer_axes()
+        dessiner_contour_croix_3d(ax, *CROIX.values())
+        plt.close(fig)
+    return mesure, 0
+
+def cas_rendu_boite(taille):
+    from app import construire_figure_parallelepipede
+    cote = cote_pour(taille)
+    def mesure():
+        fig = construire_figure_parallelepipede(cote, cote, cote, 0.5)
+        fig.savefig(io.BytesIO(), format="png", dpi=100)
+        plt.close(fig)
+    return mesure, cote ** 3
+
+def cas_export_stl(taille):
+    from export_maillage import exporter_scene
+    from reseau_spheres import generer_centres_boite
+    cote = cote_pour(taille)
+    centres = generer_centres_boite(0, 0, cote, cote, cote, 1.0)
+    def mesure():
+        with tempfile.TemporaryDirectory() as dossier:
+            exporter_scene(os.path.join(dossier, "scene.stl"), centres=centres, rayon=0.5, niveau=(8, 5))
+    return mesure, len(centres)
+
+# Cas mesurés : nom -> (construction de la mesure pour une taille, taille maximale par défaut)
+# Les cas sans sphères (taille maximale None) ne sont mesurés qu'une fois.
+# Une construction peut aussi donner un nombre de requêtes, dont le débit est affiché.
+CAS = {
+    "generation_rectangle": (cas_generation_rectangle, 10 ** 6),
+    "generation_boite_cubique": (cas_generation_boite("cubique"), 10 ** 6),
+    "generation_boite_cfc": (cas_generation_boite("cfc"), 10 ** 6),
+    "generation_boite_hc": (cas_generation_boite("hc"), 10 ** 6),
+    "generation_aleatoire": (cas_generation_aleatoire, 10 ** 5),
+    "plus_proches_voisins": (cas_plus_proches_voisins, 10 ** 6),
+    "murs_sols_croix": (cas_murs_sols, None),
+    "contour_croix": (cas_contour_croix, None),
+    "rendu_boite_savefig": (cas_rendu_boite, 10 ** 5),
+    "export_stl": (cas_export_stl, 10 ** 5),
+}
+
+def mesurer(fonction, repetitions=REPETITIONS):
+    """
+    Mesure le temps d'exécution (meilleur et moyen) puis le pic de mémoire
+    Python d'une fonction sans argument
+
+    Le pic de mémoire est mesuré par tracemalloc lors d'une exécution
+    séparée, pour ne pas fausser les temps.
+    """
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+
+    tracemalloc.start()
+    try:
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"temps_min": min(durees), "temps_moyen": sum(durees) / len(durees),
+            "repetitions": repetitions, "memoire_pic": pic}
+
+def executer_benchmark(noms_cas=None, tailles=TAILLES, repetitions=REPETITIONS, sans_limite=False):
+    """
+    Exécute les cas demandés pour chaque taille et retourne les résultats
+    """
+    resultats = []
+    for nom in noms_cas or CAS:
+        if nom not in CAS:
+            raise ValueError(f"Cas inconnu: {nom!r} (choix: {', '.join(CAS)})")
+        construire, taille_max = CAS[nom]
+
+        tailles_cas = tailles if taille_max is not None else [0]
+        for taille in tailles_cas:
+            if taille_max is not None and taille > taille_max and not sans_limite:
+                continue
+            # Les scripts affichent leur progression, inutile pendant les mesures
+            with contextlib.redirect_stdout(io.StringIO()):
+                fonction, nombre_spheres, *requetes = construire(taille)
+                mesure = mesurer(fonction, repetitions)
+            resultat = {"cas": nom, "taille": taille, "nombre_spheres": nombre_spheres, **mesure}
+            debit = ""
+            if requetes:
+                resultat["requetes_par_seconde"] = requetes[0] / max(mesure["temps_min"], 1e-12)
+                debit = f"  {resultat['requetes_par_seconde'] / 1e6:7.2f} M req/s"
+            resultats.append(resultat)
+            print(f"{nom:<26} {nombre_spheres:>9} sphères  {mesure['temps_min'] * 1000:10.2f} ms"
+                  f"  {mesure['memoire_pic'] / 2 ** 20:9.1f} Mio{debit}", flush=True)
+
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "plateforme": platform.platform(),
+        "resultats": resultats,
+    }
+
+def comparer(reference, actuel):
+    """
+    Affiche le rapport des temps entre deux exécutions du benchmark
+    """
+    anciens = {(r["cas"], r["taille"]): r for r in reference["resultats"]}
+    print("\n=== Comparaison (temps actuel / référence) ===")
+    for resultat in actuel["resultats"]:
+        ancien = anciens.get((resultat["cas"], resultat["taille"]))
+        if ancien is None:
+            continue
+        rapport = resultat["temps_min"] / max(ancien["temps_min"], 1e-12)
+        print(f"{resultat['cas']:<26} {resultat['taille']:>9}  x{rapport:6.2f}")
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande du benchmark
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de la génération, du rendu et de l'export")
+    parser.add_argument("--sortie", default="benchmark.json", help="Fichier JSON des résultats (défaut: benchmark.json)")
+    parser.add_argument("--cas", nargs="+", choices=list(CAS), help="Cas à mesurer (défaut: tous)")
+    parser.add_argument("--tailles", nargs="+", type=int, default=TAILLES, help="Nombres de sphères visés")
+    parser.add_argument("--repetitions", type=int, default=REPETITIONS)
+    parser.add_argument("--sans-limite", action="store_true", help="Ignore la taille maximale de chaque cas")
+    parser.add_argument("--comparer", help="Fichier JSON d'une exécution de référence")
+    args = parser.parse_args(arguments)
+
+    resultats = executer_benchmark(args.cas, args.tailles, args.repetitions, args.sans_limite)
+    with open(args.sortie, "w", encoding="utf-8") as fichier:
+        json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {args.sortie}", file=sys.stderr)
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as fichier:
+            comparer(json.load(fichier), resultats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Version des algorithmes de génération : à incrémenter dès que les centres
+# produits pour des paramètres donnés changent, pour invalider le cache
+VERSION_CODE = 4
+
+# Dossier du cache (variable d'environnement TEST3D_CACHE ; vide pour désactiver)
+DOSSIER_CACHE = os.environ.get("TEST3D_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "test_3d"))
+
+# Taille maximale du cache sur disque, en octets
+TAILLE_MAX_CACHE = 512 * 1024 * 1024
+
+# Au-delà de cette taille (octets), une disposition est stockée en .npy brut
+# et rechargée par projection en mémoire plutôt que compressée en .npz
+SEUIL_PROJECTION = 8 * 1024 * 1024
+
+def cle_disposition(forme, parametres):
+    """
+    Calcule la clé d'une disposition : empreinte sha256 de la forme, des
+    paramètres et de la version du code
+    """
+    contenu = json.dumps({"forme": forme, "parametres": parametres, "version": VERSION_CODE},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+def fichiers_cache(dossier):
+    """
+    Liste les fichiers (chemin, taille, date d'accès) du cache
+    """
+    if not os.path.isdir(dossier):
+        return []
+
+    fichiers = []
+    for nom in os.listdir(dossier):
+        if nom.endswith((".npy", ".npz")):
+            chemin = os.path.join(dossier, nom)
+            try:
+                infos = os.stat(chemin)
+            except FileNotFoundError:
+                continue
+            fichiers.append((chemin, infos.st_size, infos.st_mtime))
+    return fichiers
+
+def charger_disposition(cle, dossier=DOSSIER_CACHE):
+    """
+    Charge une disposition du cache, ou retourne None si elle est absente
+
+    Les fichiers .npy sont projetés en mémoire (lecture seule). La date du
+    fichier est mise à jour pour l'éviction LRU.
+    """
+    for extension in (".npy", ".npz"):
+        chemin = os.path.join(dossier, cle + extension)
+        if not os.path.exists(chemin):
+            continue
+        try:
+            if extension == ".npy":
+                centres = np.load(chemin, mmap_mode="r")
+            else:
+                with np.load(chemin) as archive:
+                    centres = archive["centres"]
+            os.utime(chemin)
+        except (OSError, ValueError, KeyError):
+            # Fichier tronqué ou illisible : il sera régénéré
+            continue
+        return centres
+    return None
+
+def enregistrer_disposition(cle, centres, dossier=DOSSIER_CACHE, taille_max=TAILLE_MAX_CACHE):
+    """
+    Enregistre une disposition dans le cache puis applique l'éviction LRU
+
+    L'écriture passe par un fichier temporaire renommé, afin qu'un autre
+    processus ne lise jamais un fichier incomplet.
+    """
+    centres = np.ascontiguousarray(centres, dtype=float)
+    if centres.nbytes > taille_max:
+        return None
+
+    os.makedirs(dossier, exist_ok=True)
+    extension = ".npy" if centres.nbytes >= SEUIL_PROJECTION else ".npz"
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix=".tmp")
+    try:
+        with os.fdopen(descripteur, "wb") as fichier:
+            if extension == ".npy":
+                np.save(fichier, centres)
+            else:
+                np.savez_compressed(fichier, centres=centres)
+        chemin = os.path.join(dossier, cle + extension)
+        os.replace(temporaire, chemin)
+    except BaseException:
+        os.unlink(temporaire)
+        raise
+
+    evincer_cache(dossier, taille_max)
+    return chemin
+
+def evincer_cache(dossier=DOSSIER_CACHE, taille_max=TAILLE_MAX_CACHE):
+    """
+    Supprime les dispositions les moins récemment utilisées jusqu'à ce que
+    le cache tienne dans taille_max octets
+    """
+    fichiers = sorted(fichiers_cache(dossier), key=lambda fichier: fichier[2])
+    taille = sum(fichier[1] for fichier in fichiers)
+    supprimes = 0
+    for chemin, taille_fichier, _ in fichiers:
+        if taille <= taille_max:
+            break
+        try:
+            os.remove(chemin)
+        except FileNotFoundError:
+            pass
+        taille -= taille_fichier
+        supprimes += 1
+    return supprimes
+
+def vider_cache(dossier=DOSSIER_CACHE):
+    """
+    Supprime toutes les dispositions du cache
+    """
+    return evincer_cache(dossier, -1)
+
+def disposition_en_cache(forme, parametres, generer, dossier=DOSSIER_CACHE, taille_max=TAILLE_MAX_CACHE):
+    """
+    Retourne les centres (N, 3) d'une disposition, depuis le cache si possible
+
+    generer est appelée sans argument seulement en cas d'absence du cache.
+    Les paramètres doivent être sérialisables en JSON. Un tableau (N, k) à
+    deux dimensions (centres suivis des rayons, par exemple) est gardé tel quel.
+    """
+    if not dossier:
+        return generer()
+
+    cle = cle_disposition(forme, parametres)
+    centres = charger_disposition(cle, dossier)
+    if centres is None:
+        centres = np.asarray(generer(), dtype=float)
+        if centres.ndim != 2:
+            centres = centres.reshape(-1, 3)
+        try:
+            enregistrer_disposition(cle, centres, dossier, taille_max)
+        except OSError as erreur:
+            # Un cache inaccessible ne doit pas empêcher le rendu
+            print(f"Attention: disposition non mise en cache ({erreur})")
+    return centres
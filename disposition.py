@@ -0,0 +1,218 @@
+import numpy as np
+
+# Types de coordonnées acceptés pour le stockage direct des centres
+TYPES_COORDONNEES = (np.float64, np.float32)
+
+# Tolérance (relative au pas) pour le passage en indices de réseau
+TOLERANCE_RESEAU = 1e-6
+
+class DispositionSpheres:
+    """
+    Disposition de sphères rangée dans un seul tableau contigu
+
+    Les centres sont stockés soit directement en coordonnées (N, 3) float64
+    ou float32, soit en indices entiers de réseau (N, 3) avec une origine et
+    un pas par axe. Chaque sphère peut porter un rayon, un numéro de région
+    et une valeur de couleur. Les accès (centres, x, y, z, blocs) sont des
+    vues sans copie lorsque les coordonnées sont stockées directement. Les
+    régions rangées d'un seul tenant (depuis_blocs) sont extraites en vues.
+    """
+
+    def __init__(self, centres, rayon, regions=None, noms_regions=None, valeurs=None, dtype=np.float64,
+                 origine=None, pas=None):
+        centres = np.asarray(centres).reshape(-1, 3)
+        if pas is not None:
+            # centres contient des indices entiers de réseau
+            self.donnees = np.ascontiguousarray(centres, dtype=type_indices(centres))
+            self.origine = np.zeros(3) if origine is None else np.asarray(origine, dtype=float).reshape(3)
+            self.pas = np.broadcast_to(np.asarray(pas, dtype=float), (3,)).copy()
+        else:
+            if np.dtype(dtype) not in [np.dtype(t) for t in TYPES_COORDONNEES]:
+                raise ValueError(f"Type de coordonnées non pris en charge: {np.dtype(dtype)}")
+            self.donnees = np.ascontiguousarray(centres, dtype=dtype)
+            self.origine = None
+            self.pas = None
+        
+        self.rayon = rayon if np.ndim(rayon) == 0 else self.colonne(rayon, np.float64)
+        self.regions = None if regions is None else self.colonne(regions, np.int16)
+        # Régions rangées d'un seul tenant, dans l'ordre de leurs numéros
+        self.regions_contigues = self.regions is not None and bool(np.all(self.regions[1:] >= self.regions[:-1]))
+        self.noms_regions = list(noms_regions or [])
+        self.valeurs = None if valeurs is None else self.colonne(valeurs, np.float32)
+
+    def colonne(self, valeurs, dtype):
+        """
+        Vérifie et convertit une propriété par sphère en tableau (N,)
+        """
+        valeurs = np.ascontiguousarray(valeurs, dtype=dtype).reshape(-1)
+        if len(valeurs) != len(self.donnees):
+            raise ValueError(f"{len(valeurs)} valeurs pour {len(self.donnees)} sphères!")
+        return valeurs
+
+    @classmethod
+    def depuis_reseau(cls, indices, origine, pas, rayon, regions=None, noms_regions=None, valeurs=None):
+        """
+        Crée une disposition stockée en indices entiers de réseau (N, 3)
+
+        Le centre d'indice (i, j, k) est origine + (i, j, k) * pas.
+        """
+        return cls(indices, rayon, regions, noms_regions, valeurs, origine=origine, pas=pas)
+
+    @classmethod
+    def depuis_blocs(cls, blocs, rayon, noms_regions=None, dtype=np.float64):
+        """
+        Assemble des blocs de centres (n, 3) en une disposition, un numéro de
+        région par bloc
+        """
+        blocs = [np.asarray(bloc).reshape(-1, 3) for bloc in blocs]
+        centres = np.concatenate(blocs) if blocs else np.empty((0, 3))
+        regions = np.repeat(np.arange(len(blocs)), [len(bloc) for bloc in blocs])
+        return cls(centres, rayon, regions, noms_regions, dtype=dtype)
+
+    @property
+    def en_reseau(self):
+        """
+        Indique si les centres sont stockés en indices de réseau
+        """
+        return self.pas is not None
+
+    def __len__(self):
+        return len(self.donnees)
+
+    @property
+    def centres(self):
+        """
+        Centres (N, 3) : vue sans copie, ou calcul à partir des indices de réseau
+        """
+        if self.en_reseau:
+            return self.origine + self.donnees * self.pas
+        return self.donnees
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Permet de passer la disposition partout où un tableau (N, 3) est attendu
+        """
+        centres = self.centres
+        if dtype is not None and np.dtype(dtype) != centres.dtype:
+            return centres.astype(dtype)
+        return centres.copy() if copy else centres
+
+    def coordonnee(self, axe):
+        """
+        Coordonnées des centres selon un axe, tableau (N,) : vue sans copie,
+        ou calcul de cette seule colonne à partir des indices de réseau
+        """
+        if self.en_reseau:
+            return self.origine[axe] + self.donnees[:, axe] * self.pas[axe]
+        return self.donnees[:, axe]
+
+    @property
+    def x(self):
+        """
+        Coordonnées x des centres (N,), vue si stockées directement
+        """
+        return self.coordonnee(0)
+
+    @property
+    def y(self):
+        """
+        Coordonnées y des centres (N,), vue si stockées directement
+        """
+        return self.coordonnee(1)
+
+    @property
+    def z(self):
+        """
+        Coordonnées z des centres (N,), vue si stockées directement
+        """
+        return self.coordonnee(2)
+
+    def colonnes(self):
+        """
+        Retourne les vues (centres_x, centres_y, centres_z) attendues par les scripts de dessin
+        """
+        centres = self.centres
+        return centres[:, 0], centres[:, 1], centres[:, 2]
+
+    def rayons(self):
+        """
+        Rayon de chaque sphère, tableau (N,) en lecture seule
+        """
+        return np.broadcast_to(np.asarray(self.rayon, dtype=float), (len(self),))
+
+    def blocs(self, taille_bloc):
+        """
+        Parcourt les centres par blocs (n, 3), sans copie si les coordonnées
+        sont stockées directement
+        """
+        for debut in range(0, len(self), taille_bloc):
+            bloc = self.donnees[debut:debut + taille_bloc]
+            yield self.origine + bloc * self.pas if self.en_reseau else bloc
+
+    def selection(self, masque):
+        """
+        Retourne la sous-disposition des sphères désignées par un masque, des
+        indices ou une tranche
+
+        Une tranche (slice) donne des vues sur les tableaux de la disposition ;
+        un masque ou des indices en donnent des copies.
+        """
+        extraire = lambda valeurs: None if valeurs is None else valeurs[masque]
+        rayon = self.rayon if np.ndim(self.rayon) == 0 else self.rayon[masque]
+        if self.en_reseau:
+            return DispositionSpheres(self.donnees[masque], rayon, extraire(self.regions), self.noms_regions,
+                                      extraire(self.valeurs), origine=self.origine, pas=self.pas)
+        return DispositionSpheres(self.donnees[masque], rayon, extraire(self.regions), self.noms_regions,
+                                  extraire(self.valeurs), self.donnees.dtype)
+
+    def region(self, nom):
+        """
+        Retourne la sous-disposition d'une région désignée par son nom, en
+        vues si les régions sont rangées d'un seul tenant
+        """
+        if self.regions is None or nom not in self.noms_regions:
+            raise ValueError(f"Région inconnue: {nom!r}")
+        numero = self.noms_regions.index(nom)
+        if self.regions_contigues:
+            debut, fin = np.searchsorted(self.regions, [numero, numero + 1])
+            return self.selection(slice(debut, fin))
+        return self.selection(self.regions == numero)
+
+    def compacter(self, pas, origine=None):
+        """
+        Retourne la même disposition stockée en indices entiers de réseau
+
+        Lève ValueError si un centre n'est pas sur le réseau (origine, pas).
+        """
+        centres = self.centres
+        pas = np.broadcast_to(np.asarray(pas, dtype=float), (3,))
+        if origine is None:
+            origine = centres.min(axis=0) if len(centres) else np.zeros(3)
+        positions = (centres - origine) / pas
+        indices = np.rint(positions)
+        if len(indices) and np.abs(positions - indices).max() > TOLERANCE_RESEAU:
+            raise ValueError("Les centres ne sont pas sur le réseau demandé!")
+        return DispositionSpheres.depuis_reseau(indices, origine, pas, self.rayon,
+                                                self.regions, self.noms_regions, self.valeurs)
+
+    def nombre_octets(self):
+        """
+        Mémoire occupée par les tableaux de la disposition
+        """
+        return sum(tableau.nbytes for tableau in (self.donnees, self.regions, self.valeurs, self.rayon)
+                   if isinstance(tableau, np.ndarray))
+
+def type_indices(indices):
+    """
+    Plus petit type entier signé qui contient tous les indices
+
+    Lève ValueError si même un entier de 64 bits ne les contient pas.
+    """
+    if not len(indices):
+        return np.int16
+    bornes = np.array([np.min(indices), np.max(indices)], dtype=float)
+    for type_entier in (np.int16, np.int32, np.int64):
+        # Comparaison en flottants : int64 n'y est pas exact, d'où la borne stricte
+        if np.all(np.abs(bornes) < np.iinfo(type_entier).max):
+            return type_entier
+    raise ValueError("Indices de réseau trop grands pour un entier de 64 bits!")
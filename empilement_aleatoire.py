@@ -0,0 +1,598 @@
+import itertools
+import math
+
+import numpy as np
+
+from empreinte import aire_polygone, normaliser_polygone, points_dans_polygone_epars, points_loin_des_aretes, polygone_rectangle
+from grille_spatiale import GrilleChainee, GrilleSpatiale
+from reseau_spheres import MODES_EMPILEMENT
+
+# Mode d'empilement aléatoire (ajout séquentiel aléatoire, ~38 % à saturation),
+# proposé à côté des réseaux réguliers de reseau_spheres
+MODE_ALEATOIRE = "aleatoire"
+
+# Mode polydisperse : rayons tirés selon une loi (ou donnés), les plus grands placés d'abord
+MODE_POLYDISPERSE = "polydisperse"
+
+# Modes proposés par les scripts interactifs
+MODES_DISPOSITION = MODES_EMPILEMENT + (MODE_ALEATOIRE, MODE_POLYDISPERSE)
+
+# Lois des rayons du mode polydisperse, paramétrées par un rayon central et
+# une dispersion relative
+LOIS_RAYONS = ("uniforme", "normale", "lognormale")
+LOI_RAYONS = "lognormale"
+DISPERSION = 0.25
+
+# Fraction du volume visée par les rayons tirés (compacité aléatoire maximale)
+TAUX_CIBLE = 0.64
+
+# Rapport maximal entre le plus grand et le plus petit rayon d'une classe du
+# mode polydisperse, remplie comme un empilement aléatoire de sphères égales
+RAPPORT_CLASSES = 1.25
+
+# Tolérance relative : des sphères tangentes ne se chevauchent pas
+TOLERANCE_CONTACT = 1e-9
+
+# Nombre de candidats (ou de cellules) traités ensemble
+TAILLE_LOT = 4096
+
+# Nombre de sous-cellules examinées ensemble lors de l'élagage (petit, pour rester en cache)
+TAILLE_LOT_ELAGAGE = 1 << 14
+
+# Nombre maximal de subdivisions des cellules encore libres
+NIVEAUX_MAX = 8
+
+# Subdivisions supplémentaires, au-delà du côté d/√3, des sous-cellules d'une
+# classe du mode polydisperse suivie d'une plus petite, qui comble ses derniers
+# vides (la dernière classe va jusqu'à NIVEAUX_MAX, comme les sphères égales)
+NIVEAUX_INTERMEDIAIRES = 0
+
+# Largeur de la bordure de cellules vides autour de la grille
+BORDURE = 2
+
+# Décalages des huit sous-cellules d'une cellule coupée en deux selon chaque axe
+SOUS_CELLULES = np.array(list(itertools.product((0, 1), repeat=3)))
+
+def decalages_voisinage():
+    """
+    Décalages (K, 3) des cellules pouvant contenir un centre à moins d'un
+    diamètre d'un point de la cellule (0, 0, 0), pour des cellules de côté d/√3
+
+    L'écart minimal entre deux cellules est compté en côtés de cellule ; un
+    conflit exige un écart au carré inférieur à 3.
+    """
+    decalages = np.array(list(itertools.product(range(-BORDURE, BORDURE + 1), repeat=3)))
+    ecart = np.maximum(np.abs(decalages) - 1, 0)
+    return decalages[np.sum(ecart ** 2, axis=1) < 3]
+
+DECALAGES_VOISINAGE = decalages_voisinage()
+
+def couronnes_voisinage():
+    """
+    Découpe le voisinage en couronnes de cellules, de la plus proche à la plus
+    lointaine (écart minimal au carré de 0, 1 puis 2 côtés de cellule)
+    """
+    ecart = np.sum(np.maximum(np.abs(DECALAGES_VOISINAGE) - 1, 0) ** 2, axis=1)
+    return [DECALAGES_VOISINAGE[ecart == valeur] for valeur in range(3)]
+
+COURONNES_VOISINAGE = couronnes_voisinage()
+
+def decalages_recouvrement(niveau):
+    """
+    Décalages (K, 3) des cellules dont un centre peut recouvrir entièrement
+    une sous-cellule de niveau donné de la cellule (0, 0, 0)
+
+    Le long d'un axe, le point de la sous-cellule (de côté s) le plus
+    éloigné d'un centre en est au moins à s/2 dans la même cellule, à s dans
+    une cellule voisine et à 1 + s deux cellules plus loin (en côtés de cellule).
+    Les décalages sont triés du plus proche au plus lointain : les cellules
+    proches sont les plus susceptibles de recouvrir la sous-cellule.
+    """
+    s = 0.5 ** niveau
+    ecart = np.sum(np.array([s / 2, s, 1 + s])[np.abs(DECALAGES_VOISINAGE)] ** 2, axis=1)
+    ordre = np.argsort(ecart, kind="stable")
+    return DECALAGES_VOISINAGE[ordre[ecart[ordre] < 3]]
+
+def generer_centres_aleatoires(polygone, hauteur, rayon, nombre=None, tentatives_max=None, graine=None,
+                               taille_lot=TAILLE_LOT, niveaux_max=NIVEAUX_MAX):
+    """
+    Remplit le prisme d'un polygone par ajout séquentiel aléatoire de sphères, tableau (N, 3)
+
+    Les centres sont rangés dans une grille de côté d/√3 : une cellule en
+    contient au plus un et un candidat n'est comparé qu'aux centres des
+    cellules voisines, ce qui rend chaque insertion O(1).
+
+    Les candidats sont tirés uniformément dans les cellules encore libres.
+    Après chaque série de tirages, les cellules occupées ou entièrement
+    recouvertes par la zone d'exclusion d'un centre sont retirées et les
+    autres coupées en huit : le tirage se concentre sur l'espace restant et
+    atteint la saturation (environ 38 % loin des parois) en quelques séries.
+    Les candidats d'une série sont comparés ensemble aux centres déjà placés,
+    couronne de cellules par couronne, puis départagés entre eux. Le coût
+    est linéaire dans le volume divisé par le cube du rayon : sur un cœur,
+    10^4 sphères prennent environ 2 s et 10^5 environ 16 s (cas
+    generation_aleatoire de benchmark.py). La seconde se tient jusqu'à
+    quelques milliers de sphères ; au-delà, compter 0,15 ms par sphère.
+
+    Le remplissage s'arrête à nombre sphères, après tentatives_max candidats,
+    à saturation ou après niveaux_max subdivisions. graine rend le tirage
+    reproductible.
+    """
+    if rayon <= 0:
+        raise ValueError("Le rayon des sphères doit être positif!")
+    polygone = normaliser_polygone(polygone)
+    generateur = np.random.default_rng(graine)
+    diametre = 2 * rayon
+    cote = diametre / math.sqrt(3)
+    
+    # Domaine des centres : boîte englobante réduite d'un rayon
+    bas = np.append(polygone.min(axis=0) + rayon, rayon)
+    haut = np.append(polygone.max(axis=0) - rayon, hauteur - rayon)
+    if np.any(haut < bas) or nombre == 0:
+        return np.empty((0, 3))
+    etendue = polygone.max(axis=0) - polygone.min(axis=0)
+    rectangle = math.isclose(aire_polygone(polygone), etendue[0] * etendue[1])
+    
+    # Grille entourée de cellules vides : le voisinage n'a pas de cas de bord
+    dimensions = np.maximum(np.ceil((haut - bas) / cote).astype(np.int64), 1)
+    forme = dimensions + 2 * BORDURE
+    pas_plats = np.array([forme[1] * forme[2], forme[2], 1])
+    grille_plate = np.full(int(np.prod(forme)), -1, dtype=np.int32)
+    couronnes = [decalages @ pas_plats for decalages in COURONNES_VOISINAGE]
+    
+    # Au plus un centre par cellule ; le tableau des centres grandit par doublement
+    capacite = int(np.prod(dimensions)) if nombre is None else min(int(nombre), int(np.prod(dimensions)))
+    centres = np.empty((min(capacite, taille_lot), 3))
+    nb_centres = tentatives = 0
+    
+    def voisins_places(cellules, decalages):
+        """
+        Retourne les couples (ligne, indice de centre) des centres placés
+        dans le voisinage (décalages plats) de chaque cellule
+        """
+        # Voisinage lu une fois par cellule distincte (triée), puis développé par ligne
+        uniques, inverse = np.unique(cellules, return_inverse=True)
+        voisins = np.take(grille_plate, (uniques[:, None] + decalages).reshape(-1))
+        positions = np.flatnonzero(voisins >= 0)
+        places = voisins[positions]
+        par_cellule = np.bincount(positions // len(decalages), minlength=len(uniques))
+        comptes = par_cellule[inverse]
+        debuts = (np.cumsum(par_cellule) - par_cellule)[inverse]
+        lignes = np.repeat(np.arange(len(cellules)), comptes)
+        rangs = np.arange(len(lignes)) - np.repeat(np.cumsum(comptes) - comptes, comptes)
+        return lignes, places[np.repeat(debuts, comptes) + rangs]
+    
+    def dans_domaine(points):
+        """
+        Teste si des candidats (n, 3) sont des centres admissibles
+        """
+        valides = np.all(points <= haut, axis=1)
+        if not rectangle and valides.any():
+            dedans = np.flatnonzero(valides)
+            valides[dedans] = (points_dans_polygone_epars(polygone, points[dedans, :2])
+                               & points_loin_des_aretes(polygone, points[dedans, :2], rayon))
+        return valides
+    
+    def inserer(points, cellules):
+        """
+        Insère les candidats admissibles qui ne chevauchent ni un centre
+        placé ni un candidat tiré avant eux dans le lot
+
+        Les candidats, un par cellule libre, sont placés provisoirement dans
+        la grille : la lecture du voisinage compare chacun aux centres placés
+        et aux candidats précédents. Les conflits du lot sont réglés en faveur
+        du premier tiré. Le voisinage est lu couronne par couronne, de la plus
+        proche à la plus lointaine, et un candidat refusé n'est plus comparé
+        aux couronnes suivantes : près de la saturation, la plupart le sont
+        dès la première.
+        """
+        nonlocal centres, nb_centres
+        valides = np.flatnonzero(dans_domaine(points))
+        valides = valides[grille_plate[cellules[valides]] < 0]
+        _, premiers = np.unique(cellules[valides], return_index=True)
+        retenus = valides[np.sort(premiers)][:capacite - nb_centres]
+        
+        if nb_centres + len(retenus) > len(centres):
+            centres = np.concatenate([centres, np.empty((max(len(centres), len(retenus)), 3))])
+        provisoires = np.arange(nb_centres, nb_centres + len(retenus))
+        centres[provisoires] = points[retenus]
+        grille_plate[cellules[retenus]] = provisoires
+        refuses = np.zeros(len(retenus), dtype=bool)
+        for couronne in couronnes:
+            encore = np.flatnonzero(~refuses)
+            if len(encore) == 0:
+                break
+            lignes, indices = voisins_places(cellules[retenus[encore]], couronne)
+            lignes = encore[lignes]
+            ecart = centres[indices] - points[retenus[lignes]]
+            conflit = ((indices < provisoires[lignes])
+                       & (np.einsum("ij,ij->i", ecart, ecart) < diametre * diametre * (1 - 1e-12)))
+            refuses[lignes[conflit]] = True
+        grille_plate[cellules[retenus]] = -1
+        
+        acceptes = retenus[~refuses]
+        nouveaux = np.arange(nb_centres, nb_centres + len(acceptes))
+        centres[nouveaux] = points[acceptes]
+        grille_plate[cellules[acceptes]] = nouveaux
+        nb_centres += len(acceptes)
+    
+    def recouvertes(cellules, coins, taille, decalages):
+        """
+        Teste si des sous-cellules sont entièrement recouvertes par la zone
+        d'exclusion d'un centre voisin
+
+        Le voisinage est parcouru décalage par décalage, du plus proche au
+        plus lointain, et une sous-cellule n'est plus examinée dès qu'un
+        centre la recouvre.
+        """
+        couvert = np.zeros(len(cellules), dtype=bool)
+        actives = np.arange(len(cellules))
+        milieux = coins + taille / 2
+        for decalage in decalages:
+            voisins = grille_plate[cellules[actives] + decalage]
+            occupees = np.flatnonzero(voisins >= 0)
+            # Point de la sous-cellule le plus éloigné du centre voisin
+            ecart = np.abs(centres[voisins[occupees]] - milieux[actives[occupees]]) + taille / 2
+            couvert[actives[occupees[np.einsum("ij,ij->i", ecart, ecart) <= diametre * diametre]]] = True
+            actives = actives[~couvert[actives]]
+            if len(actives) == 0:
+                break
+        return couvert
+    
+    def elaguer(toutes, niveau):
+        """
+        Retire les sous-cellules (V, 3) hors du domaine, dans une cellule
+        occupée ou recouvertes par la zone d'exclusion d'un centre voisin
+        """
+        taille = cote / 2 ** niveau
+        recouvrement = decalages_recouvrement(niveau) @ pas_plats
+        garder = []
+        for debut in range(0, len(toutes), TAILLE_LOT_ELAGAGE):
+            sous_cellules = toutes[debut:debut + TAILLE_LOT_ELAGAGE]
+            coins = bas + sous_cellules * taille
+            cellules = ((sous_cellules >> niveau) + BORDURE) @ pas_plats
+            
+            # Une sous-cellule touche le domaine si son centre est à moins
+            # d'une demi-diagonale (dans le plan) d'un centre admissible
+            libre = np.all(coins <= haut, axis=1) & (grille_plate[cellules] < 0)
+            if not rectangle and libre.any():
+                milieux = coins[libre, :2] + taille / 2
+                indices = np.flatnonzero(libre)
+                libre[indices] = (points_dans_polygone_epars(polygone, milieux)
+                                  & points_loin_des_aretes(polygone, milieux, rayon - taille / math.sqrt(2)))
+            
+            # Recouverte si son point le plus éloigné d'un centre voisin en est à moins d'un diamètre
+            restantes = np.flatnonzero(libre)
+            libre[restantes] = ~recouvertes(cellules[restantes], coins[restantes], taille, recouvrement)
+            garder.append(sous_cellules[libre])
+        
+        return np.concatenate(garder) if garder else np.empty((0, 3), dtype=np.int64)
+    
+    def subdiviser(toutes, niveau):
+        """
+        Coupe en huit les sous-cellules (V, 3) libres de niveau donné et ne
+        garde que les filles dans le domaine et non recouvertes
+
+        Les huit filles d'une sous-cellule sont dans la même cellule de la
+        grille et ont donc les mêmes centres voisins : chaque centre voisin
+        est lu une fois pour les huit, et une sous-cellule n'est plus
+        examinée dès que toutes ses filles sont recouvertes.
+        """
+        taille = cote / 2 ** (niveau + 1)
+        recouvrement = decalages_recouvrement(niveau + 1) @ pas_plats
+        garder = []
+        for debut in range(0, len(toutes), TAILLE_LOT_ELAGAGE):
+            meres = toutes[debut:debut + TAILLE_LOT_ELAGAGE]
+            cellules = ((meres >> niveau) + BORDURE) @ pas_plats
+            
+            # Seules les mères qui touchent le haut du domaine ont des filles dehors
+            libre = np.ones((len(meres), len(SOUS_CELLULES)), dtype=bool)
+            bord = np.flatnonzero(np.any(bas + (2 * meres + 1) * taille > haut, axis=1))
+            if len(bord):
+                libre[bord] = np.all(bas + (meres[bord, None, :] * 2 + SOUS_CELLULES) * taille <= haut, axis=2)
+            if not rectangle:
+                lignes, rangs = np.nonzero(libre)
+                milieux = bas[:2] + ((meres[lignes] * 2 + SOUS_CELLULES[rangs])[:, :2] + 0.5) * taille
+                libre[lignes, rangs] = (points_dans_polygone_epars(polygone, milieux)
+                                        & points_loin_des_aretes(polygone, milieux, rayon - taille / math.sqrt(2)))
+            
+            # Les huit drapeaux d'une mère sont lus d'un coup comme un entier de 64 bits
+            milieux = bas + (meres + 0.5) * (2 * taille)
+            drapeaux = libre.view(np.uint64).reshape(-1)
+            actives = np.flatnonzero(drapeaux)
+            for decalage in recouvrement:
+                voisins = grille_plate[cellules[actives] + decalage]
+                occupees = np.flatnonzero(voisins >= 0)
+                ecart = centres[voisins[occupees]] - milieux[actives[occupees]]
+                
+                # Le long d'un axe, le point le plus éloigné de la fille la plus
+                # favorable est à |écart| du centre, ou à taille - |écart| s'il
+                # est à moins d'une demi-fille du milieu de la mère
+                distance = np.abs(ecart)
+                distance = np.where(distance >= taille / 2, distance, taille - distance)
+                utiles = np.flatnonzero(np.einsum("ij,ij->i", distance, distance) <= diametre * diametre)
+                if len(utiles) == 0:
+                    continue
+                
+                # Point le plus éloigné de chaque fille, du bas (0) et du haut (1) selon chaque axe
+                ecart = ecart[utiles, None, :] + np.array([[taille / 2], [-taille / 2]])
+                ecart = (np.abs(ecart) + taille / 2) ** 2
+                distances = (ecart[:, :, None, None, 0] + ecart[:, None, :, None, 1]
+                             + ecart[:, None, None, :, 2]).reshape(-1, 8)
+                libre[actives[occupees[utiles]]] &= distances > diametre * diametre
+                actives = actives[drapeaux[actives] != 0]
+                if len(actives) == 0:
+                    break
+            lignes, rangs = np.nonzero(libre)
+            garder.append(meres[lignes] * 2 + SOUS_CELLULES[rangs])
+        
+        return np.concatenate(garder) if garder else np.empty((0, 3), dtype=np.int64)
+    
+    sous_cellules = np.indices(dimensions).reshape(3, -1).T
+    niveau = 0
+    while len(sous_cellules) and nb_centres < capacite:
+        # Une série de tirages : autant de candidats que de sous-cellules libres
+        taille = cote / 2 ** niveau
+        for _ in range(0, len(sous_cellules), taille_lot):
+            nb = min(taille_lot, len(sous_cellules))
+            if tentatives_max is not None:
+                nb = min(nb, tentatives_max - tentatives)
+            if nb <= 0 or nb_centres >= capacite:
+                break
+            tentatives += nb
+            tirees = sous_cellules[generateur.integers(len(sous_cellules), size=nb)]
+            points = bas + (tirees + generateur.random((nb, 3))) * taille
+            inserer(points, ((tirees >> niveau) + BORDURE) @ pas_plats)
+        
+        if niveau == niveaux_max or (tentatives_max is not None and tentatives >= tentatives_max):
+            break
+        
+        # Subdivision des sous-cellules restantes
+        sous_cellules = subdiviser(elaguer(sous_cellules, niveau), niveau)
+        niveau += 1
+    
+    return centres[:nb_centres]
+
+def generer_centres_aleatoires_boite(x_start, y_start, largeur, longueur, hauteur, rayon, nombre=None,
+                                     tentatives_max=None, graine=None):
+    """
+    Remplit un parallélépipède par ajout séquentiel aléatoire de sphères, tableau (N, 3)
+    """
+    polygone = polygone_rectangle(x_start, y_start, largeur, longueur)
+    return generer_centres_aleatoires(polygone, hauteur, rayon, nombre, tentatives_max, graine)
+
+def bornes_rayons(rayon, dispersion, loi):
+    """
+    Plus petit et plus grand rayon que tirer_rayons peut donner
+
+    Les lois normale et lognormale sont tronquées à trois écarts-types, et
+    toutes à 5 % du rayon : le coût du remplissage croît comme le volume
+    divisé par le cube du plus petit rayon.
+    """
+    if loi == "uniforme":
+        bas, haut = rayon * (1 - dispersion), rayon * (1 + dispersion)
+    elif loi == "normale":
+        bas, haut = rayon * (1 - 3 * dispersion), rayon * (1 + 3 * dispersion)
+    elif loi == "lognormale":
+        bas, haut = rayon * math.exp(-3 * dispersion), rayon * math.exp(3 * dispersion)
+    else:
+        raise ValueError(f"Loi de rayons inconnue: {loi!r} (choix: {', '.join(LOIS_RAYONS)})")
+    return max(bas, 0.05 * rayon), haut
+
+def tirer_rayons(rayon, dispersion, loi, nombre, generateur):
+    """
+    Tire nombre rayons autour d'un rayon central, tableau (nombre,)
+
+    dispersion est relative : demi-largeur de la loi uniforme, écart-type de
+    la loi normale ou écart-type du logarithme pour la loi lognormale. Les
+    rayons restent dans bornes_rayons.
+    """
+    bas, haut = bornes_rayons(rayon, dispersion, loi)
+    if loi == "uniforme":
+        rayons = rayon * (1 + dispersion * generateur.uniform(-1, 1, nombre))
+    elif loi == "normale":
+        rayons = generateur.normal(rayon, dispersion * rayon, nombre)
+    else:
+        rayons = rayon * np.exp(generateur.normal(0, dispersion, nombre))
+    return np.clip(rayons, bas, haut)
+
+def rayons_pour_volume(volume, rayon, dispersion=DISPERSION, loi=LOI_RAYONS, graine=None, taux=TAUX_CIBLE):
+    """
+    Tire des rayons selon une loi jusqu'à ce que leur volume cumulé atteigne
+    taux fois le volume donné, tableau (N,)
+    """
+    generateur = np.random.default_rng(graine)
+    cible = taux * volume
+    estimation = max(1, int(math.ceil(cible / ((4 / 3) * math.pi * rayon ** 3))))
+    
+    rayons, cumul = [], 0.0
+    while cumul < cible:
+        tires = tirer_rayons(rayon, dispersion, loi, estimation, generateur)
+        rayons.append(tires)
+        cumul += np.sum((4 / 3) * np.pi * tires ** 3)
+    rayons = np.concatenate(rayons)
+    
+    # Arrêt au premier rayon qui fait atteindre la cible
+    volumes = np.cumsum((4 / 3) * np.pi * rayons ** 3)
+    return rayons[:np.searchsorted(volumes, cible) + 1]
+
+def generer_centres_polydisperses(polygone, hauteur, rayons, graine=None, taille_lot=TAILLE_LOT,
+                                  niveaux_max=NIVEAUX_MAX, niveaux_intermediaires=NIVEAUX_INTERMEDIAIRES):
+    """
+    Place des sphères de rayons donnés dans le prisme d'un polygone, des plus
+    grandes aux plus petites
+
+    Les rayons sont regroupés en classes (au plus RAPPORT_CLASSES entre le
+    plus grand et le plus petit rayon d'une classe), remplies dans l'ordre
+    décroissant comme par generer_centres_aleatoires : les candidats sont
+    tirés dans des sous-cellules encore libres, élaguées puis coupées en
+    huit après chaque série. Une sous-cellule reste libre tant que le centre
+    d'une sphère du plus petit rayon en attente peut encore s'y trouver : les
+    petites sphères sont ainsi tirées dans les vides laissés par les grandes.
+
+    Chaque classe range ses sphères dans sa propre GrilleChainee, de cellules
+    à sa taille, complétée à chaque lot sans être reconstruite. Les sphères
+    d'une classe encore en attente quand il n'en reste aucune libre, ou que
+    ses sous-cellules ont atteint le côté d/√3 (d le plus petit diamètre de
+    la classe) puis niveaux_intermediaires subdivisions de plus (niveaux_max
+    pour la dernière classe), sont abandonnées.
+
+    Retourne les centres (N, 3) et les rayons (N,) des sphères placées.
+    """
+    rayons = np.sort(np.asarray(rayons, dtype=float).reshape(-1))[::-1]
+    if len(rayons) and rayons[-1] <= 0:
+        raise ValueError("Les rayons des sphères doivent être positifs!")
+    polygone = normaliser_polygone(polygone)
+    generateur = np.random.default_rng(graine)
+    
+    bas = np.append(polygone.min(axis=0), 0.0)
+    haut = np.append(polygone.max(axis=0), hauteur)
+    etendue = haut - bas
+    rectangle = math.isclose(aire_polygone(polygone), etendue[0] * etendue[1])
+    rayons = rayons[2 * rayons <= etendue.min()]
+    grilles = []
+    
+    def dans_domaine(points, r):
+        """
+        Teste si des candidats (n, 3) de rayons r (n,) sont entièrement dans le prisme
+        """
+        valides = np.all((points >= bas + r[:, None]) & (points <= haut - r[:, None]), axis=1)
+        if not rectangle and valides.any():
+            dedans = np.flatnonzero(valides)
+            valides[dedans] = (points_dans_polygone_epars(polygone, points[dedans, :2])
+                               & points_loin_des_aretes(polygone, points[dedans, :2], r[dedans]))
+        return valides
+    
+    def touches(points, r, demi_cote=0.0, facteur=1.0):
+        """
+        GrilleChainee.touches sur les grilles de toutes les classes, des plus
+        grandes sphères (qui recouvrent le plus) aux plus petites
+        """
+        r = np.broadcast_to(np.asarray(r, dtype=float), (len(points),))
+        resultat = np.zeros(len(points), dtype=bool)
+        for grille in grilles:
+            restants = np.flatnonzero(~resultat)
+            resultat[restants] = grille.touches(points[restants], r[restants], demi_cote, facteur)
+        return resultat
+    
+    def inserer(points, spheres):
+        """
+        Place les candidats admissibles qui ne chevauchent ni une sphère
+        placée ni un candidat plus grand du lot, retourne leurs rangs
+
+        spheres donne, dans l'ordre décroissant des rayons, l'indice de la
+        sphère de chaque candidat : une sphère tirée plusieurs fois n'est
+        placée qu'une fois.
+        """
+        r = rayons[spheres]
+        retenus = np.flatnonzero(dans_domaine(points, r))
+        retenus = retenus[~touches(points[retenus], r[retenus], facteur=1 - TOLERANCE_CONTACT)]
+        retenus = retenus[np.sort(np.unique(spheres[retenus], return_index=True)[1])]
+        
+        # Chevauchements dans le lot : la plus grande sphère l'emporte
+        if len(retenus) > 1:
+            diametre = grilles[-1].taille_cellule
+            paires, distances = GrilleSpatiale(points[retenus], diametre).paires_proches(diametre)
+            conflit = distances < (r[retenus[paires[:, 0]]] + r[retenus[paires[:, 1]]]) * (1 - TOLERANCE_CONTACT)
+            refuses = np.zeros(len(retenus), dtype=bool)
+            refuses[paires[conflit].max(axis=1)] = True
+            retenus = retenus[~refuses]
+        
+        grilles[-1].inserer(points[retenus], r[retenus])
+        return retenus
+    
+    def elaguer(toutes, taille, r):
+        """
+        Retire les sous-cellules (V, 3) de côté taille où aucun centre de
+        rayon r ne peut être placé : hors du domaine ou recouvertes par la
+        zone d'exclusion (rayon r + R) d'une sphère placée de rayon R
+        """
+        garder = []
+        for debut in range(0, len(toutes), TAILLE_LOT_ELAGAGE):
+            sous_cellules = toutes[debut:debut + TAILLE_LOT_ELAGAGE]
+            coins = bas + sous_cellules * taille
+            milieux = coins + taille / 2
+            
+            # La sous-cellule doit recouper la boîte des centres ; le test du
+            # polygone n'est sûr qu'une fois la demi-diagonale plus petite que r
+            libre = np.all((coins + taille >= bas + r) & (coins <= haut - r), axis=1)
+            if not rectangle and taille / math.sqrt(2) < r and libre.any():
+                indices = np.flatnonzero(libre)
+                libre[indices] = (points_dans_polygone_epars(polygone, milieux[indices, :2])
+                                  & points_loin_des_aretes(polygone, milieux[indices, :2], r - taille / math.sqrt(2)))
+            
+            restantes = np.flatnonzero(libre)
+            libre[restantes] = ~touches(milieux[restantes], r, demi_cote=taille / 2)
+            garder.append(sous_cellules[libre])
+        
+        return np.concatenate(garder) if garder else np.empty((0, 3), dtype=np.int64)
+    
+    def subdiviser(sous_cellules):
+        """
+        Coupe chaque sous-cellule (V, 3) en huit
+        """
+        return (sous_cellules[:, None, :] * 2 + SOUS_CELLULES).reshape(-1, 3)
+    
+    debut_classe = 0
+    while debut_classe < len(rayons):
+        fin_classe = int(np.searchsorted(-rayons, -rayons[debut_classe] / RAPPORT_CLASSES, side="right"))
+        en_attente = np.arange(debut_classe, fin_classe)
+        debut_classe = fin_classe
+        
+        # Le plus grand diamètre de la classe borne r + R pour les sphères
+        # de la classe et des suivantes : il sert de taille de cellule
+        diametre = 2 * rayons[en_attente[0]]
+        grilles.append(GrilleChainee(bas, haut, diametre, capacite=min(len(en_attente), taille_lot)))
+        
+        # Cellules libres d'au moins ce côté, coupées seulement tant qu'il
+        # reste des sphères en attente : jusqu'à un côté de d/√3 pour le plus
+        # petit diamètre d de la classe, puis quelques fois encore
+        r = rayons[en_attente[-1]]
+        niveau_base = int(math.ceil(math.log2(diametre * math.sqrt(3) / (2 * r))))
+        base = 2 * r / math.sqrt(3) * 2 ** niveau_base
+        niveau_max = niveau_base + (niveaux_max if fin_classe == len(rayons) else niveaux_intermediaires)
+        sous_cellules = elaguer(np.indices(np.ceil(etendue / base).astype(np.int64)).reshape(3, -1).T, base, r)
+        niveau = 0
+        
+        while len(sous_cellules) and len(en_attente):
+            # Une série de tirages : autant de candidats que de sous-cellules
+            # libres (au moins un par sphère en attente), chacun d'une sphère
+            # en attente de la classe prise au hasard (les plus grandes ne
+            # tiennent pas forcément dans les derniers vides)
+            taille = base / 2 ** niveau
+            tirages = max(len(sous_cellules), len(en_attente))
+            for debut in range(0, tirages, taille_lot):
+                if len(en_attente) == 0:
+                    break
+                nombre = min(taille_lot, tirages - debut)
+                choisies = np.sort(generateur.integers(len(en_attente), size=nombre))
+                tirees = sous_cellules[generateur.integers(len(sous_cellules), size=nombre)]
+                points = bas + (tirees + generateur.random((nombre, 3))) * taille
+                places = np.zeros(len(en_attente), dtype=bool)
+                places[choisies[inserer(points, en_attente[choisies])]] = True
+                en_attente = en_attente[~places]
+            
+            if niveau == niveau_max or len(en_attente) == 0:
+                break
+            r = rayons[en_attente[-1]]
+            niveau += 1
+            sous_cellules = elaguer(subdiviser(elaguer(sous_cellules, taille, r)), taille / 2, r)
+    
+    if not grilles:
+        return np.empty((0, 3)), np.empty(0)
+    return (np.concatenate([grille.centres[:grille.nombre] for grille in grilles]),
+            np.concatenate([grille.rayons[:grille.nombre] for grille in grilles]))
+
+def remplir_polydisperse(polygone, hauteur, rayon, rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION, graine=None):
+    """
+    Remplit le prisme d'un polygone de sphères polydisperses
+
+    Les rayons sont donnés (rayons) ou tirés selon une loi autour de rayon
+    jusqu'à couvrir TAUX_CIBLE du volume. Retourne les centres (N, 3) et
+    les rayons (N,) des sphères placées.
+    """
+    generateur = np.random.default_rng(graine)
+    if rayons is None:
+        polygone = normaliser_polygone(polygone)
+        rayons = rayons_pour_volume(aire_polygone(polygone) * hauteur, rayon, dispersion, loi, generateur)
+    return generer_centres_polydisperses(polygone, hauteur, rayons, generateur)
@@ -0,0 +1,364 @@
+import numpy as np
+
+from geometrie import calculer_dimensions_croix
+from reseau_spheres import TAILLE_BLOC, axes_reseau_boite, tranches_z
+
+def normaliser_polygone(sommets):
+    """
+    Convertit une liste de sommets en tableau (M, 2) sans point de fermeture
+    ni sommets consécutifs confondus
+    """
+    polygone = np.asarray(sommets, dtype=float)[:, :2]
+    
+    # Suppression des doublons consécutifs (y compris le retour au point de départ)
+    suivant = np.roll(polygone, -1, axis=0)
+    polygone = polygone[np.any(polygone != suivant, axis=1)]
+    
+    if len(polygone) < 3:
+        raise ValueError("Le polygone doit avoir au moins 3 sommets distincts!")
+    return polygone
+
+def polygone_rectangle(x, y, largeur, longueur):
+    """
+    Retourne le polygone d'un rectangle
+    """
+    return np.array([[x, y], [x + largeur, y], [x + largeur, y + longueur], [x, y + longueur]], dtype=float)
+
+def polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, centre=None):
+    """
+    Retourne le contour extérieur de la croix, tableau (20, 2)
+
+    longueur_bras peut être un nombre ou un quadruplet (gauche, droit, haut,
+    bas) pour une croix à bras inégaux. Le contour part du coin inférieur
+    gauche du bras gauche. Par défaut, la croix touche les axes x=0 et y=0.
+    """
+    if np.ndim(longueur_bras) == 0:
+        bras_gauche = bras_droit = bras_haut = bras_bas = longueur_bras
+        _, _, centre_x, centre_y = calculer_dimensions_croix(
+            largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    else:
+        bras_gauche, bras_droit, bras_haut, bras_bas = longueur_bras
+        centre_x = bras_gauche + largeur_centrale / 2
+        centre_y = bras_bas + longueur_centrale / 2
+    
+    if centre is not None:
+        centre_x, centre_y = centre
+    
+    gauche, droite = centre_x - largeur_centrale/2, centre_x + largeur_centrale/2
+    bas, haut = centre_y - longueur_centrale/2, centre_y + longueur_centrale/2
+    
+    return np.array([
+        # Bras gauche - partie basse, puis bras bas
+        [gauche - bras_gauche, centre_y - largeur_bras/2], [gauche, centre_y - largeur_bras/2],
+        [gauche, bas], [centre_x - largeur_bras/2, bas],
+        [centre_x - largeur_bras/2, bas - bras_bas], [centre_x + largeur_bras/2, bas - bras_bas],
+        [centre_x + largeur_bras/2, bas], [droite, bas],
+        # Bras droit
+        [droite, centre_y - largeur_bras/2], [droite + bras_droit, centre_y - largeur_bras/2],
+        [droite + bras_droit, centre_y + largeur_bras/2], [droite, centre_y + largeur_bras/2],
+        # Bras haut
+        [droite, haut], [centre_x + largeur_bras/2, haut],
+        [centre_x + largeur_bras/2, haut + bras_haut], [centre_x - largeur_bras/2, haut + bras_haut],
+        [centre_x - largeur_bras/2, haut], [gauche, haut],
+        # Bras gauche - partie haute
+        [gauche, centre_y + largeur_bras/2], [gauche - bras_gauche, centre_y + largeur_bras/2],
+    ], dtype=float)
+
+def aire_signee_polygone(polygone):
+    """
+    Calcule l'aire signée d'un polygone simple (positive si le contour est
+    parcouru dans le sens direct)
+    """
+    x, y = polygone[:, 0], polygone[:, 1]
+    return (np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+def aire_polygone(polygone):
+    """
+    Calcule l'aire d'un polygone simple (formule du lacet)
+    """
+    return abs(aire_signee_polygone(polygone))
+
+def aretes_polygone(polygone):
+    """
+    Retourne les arêtes du polygone sous forme d'un tableau (M, 2, 2)
+    """
+    return np.stack([polygone, np.roll(polygone, -1, axis=0)], axis=1)
+
+def decaler_polygone(polygone, distance):
+    """
+    Décale le contour d'un polygone vers l'intérieur de distance, tableau (M, 2)
+
+    Chaque sommet est placé à l'intersection des deux arêtes voisines
+    décalées, ce qui conserve les angles droits d'un plan. La distance doit
+    être positive et inférieure à la demi-largeur des parties les plus
+    étroites : au-delà, une arête décalée s'annule ou se retourne.
+    """
+    if not distance > 0:
+        raise ValueError("L'épaisseur des murs doit être positive!")
+    polygone = normaliser_polygone(polygone)
+    directions = np.roll(polygone, -1, axis=0) - polygone
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    
+    # Normale intérieure de chaque arête : à gauche pour un contour direct
+    sens = 1.0 if aire_signee_polygone(polygone) > 0 else -1.0
+    normales = sens * np.column_stack([-directions[:, 1], directions[:, 0]])
+    precedentes = np.roll(normales, 1, axis=0)
+    
+    # Sommet décalé commun aux arêtes précédente et suivante
+    bissectrices = (precedentes + normales) / (1 + np.sum(precedentes * normales, axis=1))[:, None]
+    decale = polygone + distance * bissectrices
+    
+    # Chaque arête décalée doit garder le sens et une longueur non nulle
+    longueurs = np.sum((np.roll(decale, -1, axis=0) - decale) * directions, axis=1)
+    if np.any(longueurs <= 1e-9 * np.linalg.norm(np.roll(polygone, -1, axis=0) - polygone, axis=1)):
+        raise ValueError("L'épaisseur des murs doit être inférieure à la demi-largeur des parties les plus étroites!")
+    return decale
+
+def faces_murs_prisme(polygone, hauteur, epaisseur_mur):
+    """
+    Calcule les faces des murs qui longent le contour d'un polygone, tableau (4M, 4, 3)
+
+    Le contour extérieur est le polygone, le contour intérieur son décalage
+    de epaisseur_mur. Chaque arête donne une face extérieure, une face
+    intérieure, une face de base et une face de sommet.
+    """
+    exterieur = normaliser_polygone(polygone)
+    interieur = decaler_polygone(exterieur, epaisseur_mur)
+    
+    def niveau(contour, z):
+        return np.column_stack([contour, np.full(len(contour), z)])
+    
+    ext_bas, ext_haut = niveau(exterieur, 0.0), niveau(exterieur, hauteur)
+    int_bas, int_haut = niveau(interieur, 0.0), niveau(interieur, hauteur)
+    
+    def suivant(points):
+        return np.roll(points, -1, axis=0)
+    
+    return np.concatenate([
+        np.stack([ext_bas, suivant(ext_bas), suivant(ext_haut), ext_haut], axis=1),  # faces extérieures
+        np.stack([suivant(int_bas), int_bas, int_haut, suivant(int_haut)], axis=1),  # faces intérieures
+        np.stack([ext_bas, int_bas, suivant(int_bas), suivant(ext_bas)], axis=1),    # base
+        np.stack([ext_haut, suivant(ext_haut), suivant(int_haut), int_haut], axis=1),  # sommet
+    ])
+
+def points_dans_polygone(polygone, points):
+    """
+    Teste l'appartenance de points (N, 2) au polygone par la règle pair-impair
+
+    Les points sont regroupés par ordonnée : pour chaque ordonnée distincte,
+    les abscisses d'intersection avec toutes les arêtes sont calculées d'un
+    coup, triées, puis chaque point compte les intersections à sa gauche par
+    recherche dichotomique. Les points d'une grille partagent peu
+    d'ordonnées, ce qui rend le test quasi linéaire.
+    """
+    points = np.asarray(points, dtype=float)
+    dedans = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return dedans
+    
+    aretes = aretes_polygone(polygone)
+    x1, y1 = aretes[:, 0, 0], aretes[:, 0, 1]
+    x2, y2 = aretes[:, 1, 0], aretes[:, 1, 1]
+    
+    ordre = np.argsort(points[:, 1], kind="stable")
+    ordonnees, debuts = np.unique(points[ordre, 1], return_index=True)
+    fins = np.append(debuts[1:], len(points))
+    
+    # Abscisses d'intersection de chaque ligne horizontale avec chaque arête
+    y = ordonnees[:, None]
+    coupe = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_coupe = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    x_coupe = np.sort(np.where(coupe, x_coupe, np.inf), axis=1)
+    
+    for ligne, (debut, fin) in enumerate(zip(debuts, fins)):
+        indices = ordre[debut:fin]
+        nb_coupes = np.searchsorted(x_coupe[ligne], points[indices, 0], side="right")
+        dedans[indices] = nb_coupes % 2 == 1
+    
+    return dedans
+
+def points_dans_polygone_epars(polygone, points):
+    """
+    Teste l'appartenance de points (N, 2) dispersés au polygone par la règle pair-impair
+
+    Variante de points_dans_polygone pour des points tirés au hasard, qui ne
+    partagent pas leurs ordonnées : la boucle porte sur les arêtes, chacune
+    testée contre tous les points à la fois.
+    """
+    points = np.asarray(points, dtype=float)
+    dedans = np.zeros(len(points), dtype=bool)
+    px, py = points[:, 0], points[:, 1]
+    
+    for (x1, y1), (x2, y2) in aretes_polygone(polygone):
+        coupe = (y1 > py) != (y2 > py)
+        if not coupe.any():
+            continue
+        x_coupe = x1 + (py[coupe] - y1) * (x2 - x1) / (y2 - y1)
+        dedans[coupe] ^= x_coupe <= px[coupe]
+    
+    return dedans
+
+def points_loin_des_aretes(polygone, points, marge):
+    """
+    Teste si les points (N, 2) sont à une distance d'au moins marge de toutes les arêtes
+
+    marge est un nombre ou un tableau (N,) d'une marge par point. Pour chaque
+    arête, seuls les points de la bande d'ordonnées concernée (retrouvée par
+    dichotomie sur les points triés) sont examinés.
+    """
+    points = np.asarray(points, dtype=float)
+    marges = np.broadcast_to(np.asarray(marge, dtype=float), (len(points),))
+    loin = np.ones(len(points), dtype=bool)
+    if len(points) == 0 or marges.max() <= 0:
+        return loin
+    
+    ordre = np.argsort(points[:, 1], kind="stable")
+    y_tries = points[ordre, 1]
+    marge_max = marges.max()
+    
+    for (ax_, ay), (bx, by) in aretes_polygone(polygone):
+        debut = np.searchsorted(y_tries, min(ay, by) - marge_max, side="left")
+        fin = np.searchsorted(y_tries, max(ay, by) + marge_max, side="right")
+        if debut == fin:
+            continue
+        
+        indices = ordre[debut:fin]
+        px, py = points[indices, 0], points[indices, 1]
+        proches = (px >= min(ax_, bx) - marge_max) & (px <= max(ax_, bx) + marge_max)
+        if not proches.any():
+            continue
+        
+        indices, px, py = indices[proches], px[proches], py[proches]
+        
+        # Distance au segment [a, b] par projection bornée
+        dx, dy = bx - ax_, by - ay
+        longueur_carree = dx * dx + dy * dy
+        t = np.clip(((px - ax_) * dx + (py - ay) * dy) / longueur_carree, 0, 1) if longueur_carree > 0 else 0
+        distance_carree = (px - ax_ - t * dx) ** 2 + (py - ay - t * dy) ** 2
+        loin[indices[distance_carree < marges[indices] ** 2 * (1 - 1e-9)]] = False
+    
+    return loin
+
+def projeter_sur_bord(polygone, points):
+    """
+    Retourne le point du contour le plus proche de chaque point (N, 2) et sa distance
+    """
+    points = np.asarray(points, dtype=float)
+    projections = np.zeros_like(points)
+    distances = np.full(len(points), np.inf)
+    
+    for a, b in aretes_polygone(polygone):
+        ab = b - a
+        longueur_carree = ab @ ab
+        t = np.clip((points - a) @ ab / longueur_carree, 0, 1) if longueur_carree > 0 else np.zeros(len(points))
+        q = a + t[:, None] * ab
+        d = np.linalg.norm(points - q, axis=1)
+        plus_proche = d < distances
+        projections[plus_proche] = q[plus_proche]
+        distances[plus_proche] = d[plus_proche]
+    
+    return projections, distances
+
+def points_dans_empreinte(polygone, points, marge=0.0):
+    """
+    Teste si les points (N, 2) sont dans le polygone, à au moins marge du bord
+
+    marge est un nombre ou un tableau (N,) d'une marge par point.
+    """
+    points = np.asarray(points, dtype=float)
+    marges = np.broadcast_to(np.asarray(marge, dtype=float), (len(points),))
+    dedans = points_dans_polygone(polygone, points)
+    if len(points) and marges.max() > 0 and dedans.any():
+        indices = np.flatnonzero(dedans)
+        dedans[indices] = points_loin_des_aretes(polygone, points[indices], marges[indices])
+    return dedans
+
+def axes_empreinte(polygone, hauteur, rayon_sphere, mode="cubique", z_start=0.0):
+    """
+    Retourne, pour chaque sous-grille du réseau englobant, les positions
+    (K, 2) retenues dans le plan et les hauteurs des couches
+
+    Le masque est calculé une seule fois dans le plan puis partagé par toutes
+    les couches du prisme.
+    """
+    x_min, y_min = polygone.min(axis=0)
+    x_max, y_max = polygone.max(axis=0)
+    
+    resultat = []
+    for xs, ys, zs in axes_reseau_boite(x_min, y_min, x_max - x_min, y_max - y_min, hauteur,
+                                        2 * rayon_sphere, z_start, mode):
+        plan = np.column_stack([np.repeat(xs, len(ys)), np.tile(ys, len(xs))])
+        plan = plan[points_dans_empreinte(polygone, plan, marge=rayon_sphere)]
+        resultat.append((plan, zs))
+    
+    return resultat
+
+def remplir_empreinte(polygone, hauteur, rayon_sphere, mode="cubique", z_start=0.0):
+    """
+    Remplit de sphères le prisme extrudé d'un polygone quelconque, tableau (N, 3)
+
+    Un seul réseau englobant est généré puis masqué : aucune sphère ne
+    dépasse du contour.
+    """
+    polygone = normaliser_polygone(polygone)
+    
+    blocs = [
+        np.column_stack([np.repeat(plan, len(zs), axis=0), np.tile(zs, len(plan))])
+        for plan, zs in axes_empreinte(polygone, hauteur, rayon_sphere, mode, z_start)
+    ]
+    if not blocs:
+        return np.empty((0, 3))
+    
+    return np.concatenate(blocs)
+
+def iterer_remplir_empreinte(polygone, hauteur, rayon_sphere, mode="cubique", z_start=0.0, taille_bloc=TAILLE_BLOC):
+    """
+    Remplit le prisme d'un polygone par blocs (n, 3) d'au plus taille_bloc
+    centres, par tranches de z croissant
+    """
+    polygone = normaliser_polygone(polygone)
+    colonnes = axes_empreinte(polygone, hauteur, rayon_sphere, mode, z_start)
+    
+    for z_min, z_max in tranches_z([(zs, len(plan)) for plan, zs in colonnes], taille_bloc):
+        morceaux = [(plan, zs[(zs >= z_min) & (zs <= z_max)]) for plan, zs in colonnes]
+        morceaux = [(plan, zs) for plan, zs in morceaux if len(plan) and len(zs)]
+        # Sous-grilles de la tranche par première couche croissante
+        for plan, zs in sorted(morceaux, key=lambda morceau: morceau[1][0]):
+            if len(plan) * len(zs) <= taille_bloc:
+                yield np.column_stack([np.repeat(plan, len(zs), axis=0), np.tile(zs, len(plan))])
+                continue
+            # Couche par couche, découpée si elle ne tient pas dans un bloc
+            for z in zs:
+                for debut in range(0, len(plan), taille_bloc):
+                    morceau = plan[debut:debut + taille_bloc]
+                    yield np.column_stack([morceau, np.full(len(morceau), z)])
+
+def compter_centres_empreinte(polygone, hauteur, rayon_sphere, mode="cubique"):
+    """
+    Compte les sphères du prisme d'un polygone sans générer les positions 3D
+    """
+    polygone = normaliser_polygone(polygone)
+    return sum(len(plan) * len(zs) for plan, zs in axes_empreinte(polygone, hauteur, rayon_sphere, mode))
+
+def contour_prisme(polygone, hauteur):
+    """
+    Retourne les sommets de base (z=0) et de sommet (z=hauteur) du prisme, tableaux (M, 3)
+    """
+    polygone = normaliser_polygone(polygone)
+    points_base = np.column_stack([polygone, np.zeros(len(polygone))])
+    points_sommet = np.column_stack([polygone, np.full(len(polygone), hauteur)])
+    return points_base, points_sommet
+
+def aretes_prisme(polygone, hauteur):
+    """
+    Retourne les arêtes du prisme extrudé d'un polygone, tableau (3M, 2, 3)
+
+    Dans l'ordre : arêtes de la base (z=0), du sommet (z=hauteur), puis verticales.
+    """
+    points_base, points_sommet = contour_prisme(polygone, hauteur)
+    return np.concatenate([
+        np.stack([points_base, np.roll(points_base, -1, axis=0)], axis=1),
+        np.stack([points_sommet, np.roll(points_sommet, -1, axis=0)], axis=1),
+        np.stack([points_base, points_sommet], axis=1),
+    ])
\ No newline at end of file
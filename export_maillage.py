@@ -0,0 +1,395 @@
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from empilement_aleatoire import DISPERSION, LOI_RAYONS, LOIS_RAYONS, MODES_DISPOSITION
+from empreinte import faces_murs_prisme, polygone_croix
+from geometrie import calculer_dimensions_croix, faces_sol_croix
+from maillage_sphere import gabarit_sphere
+from reseau_spheres import MODES_EMPILEMENT, iterer_centres_boite
+
+# Nombre maximal de triangles conservés en mémoire pendant l'écriture
+TAILLE_TAMPON = 65536
+
+# Tessellation des sphères exportées (n_u, n_v)
+NIVEAU_EXPORT = (20, 15)
+
+FORMATS_EXPORT = (".stl", ".ply", ".obj")
+
+# Enregistrement d'un triangle STL binaire (50 octets)
+DTYPE_STL = np.dtype([("normale", "<f4", (3,)), ("sommets", "<f4", (3, 3)), ("attribut", "<u2")])
+
+# Sommet et face d'un fichier PLY binaire (indices de sommets en uint)
+DTYPE_PLY_SOMMET = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4")])
+DTYPE_PLY_FACE = np.dtype([("n", "u1"), ("sommets", "<u4", (3,))])
+DTYPE_PLY_INSTANCE = np.dtype([("x", "<f4"), ("y", "<f4"), ("z", "<f4"), ("rayon", "<f4")])
+
+# Nombre maximal de sommets d'un fichier PLY, indexables en uint
+NOMBRE_MAX_SOMMETS_PLY = 2 ** 32
+
+def trianguler_quadrilateres(quadrilateres):
+    """
+    Découpe des quadrilatères (Q, 4, 3) en triangles (2Q, 3, 3)
+    """
+    quadrilateres = np.asarray(quadrilateres, dtype=float).reshape(-1, 4, 3)
+    return np.concatenate([quadrilateres[:, [0, 1, 2]], quadrilateres[:, [0, 2, 3]]])
+
+def normales_triangles(triangles):
+    """
+    Calcule la normale unitaire de chaque triangle (T, 3, 3)
+    """
+    normales = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normes = np.linalg.norm(normales, axis=1, keepdims=True)
+    return normales / np.where(normes > 0, normes, 1)
+
+def triangles_structure_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, epaisseur_mur):
+    """
+    Retourne les triangles (T, 3, 3) des murs et du sol de la structure en croix
+
+    Le sol est toujours présent ; les murs sont omis si epaisseur_mur vaut 0.
+    """
+    _, _, centre_x, centre_y = calculer_dimensions_croix(
+        largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    quadrilateres = [faces_sol_croix(centre_x, centre_y, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)]
+    
+    if epaisseur_mur > 0:
+        quadrilateres.insert(0, faces_murs_prisme(
+            polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras), hauteur, epaisseur_mur))
+    
+    return trianguler_quadrilateres(np.concatenate(quadrilateres))
+
+def blocs_centres(centres, taille_bloc):
+    """
+    Découpe les centres en blocs d'au plus taille_bloc sphères
+
+    centres est un tableau (N, 3), une DispositionSpheres (parcourue par
+    vues) ou un itérable de blocs (n, 3), par exemple issu de
+    iterer_centres_boite : il n'est alors parcouru qu'une fois.
+    """
+    if hasattr(centres, "blocs"):
+        centres = centres.blocs(taille_bloc)
+    elif isinstance(centres, np.ndarray):
+        centres = [centres]
+    for bloc in centres:
+        bloc = np.asarray(bloc, dtype=float).reshape(-1, 3)
+        for debut in range(0, len(bloc), taille_bloc):
+            yield bloc[debut:debut + taille_bloc]
+
+def rayons_spheres(rayon, debut, nombre):
+    """
+    Rayons (nombre,) des sphères debut à debut + nombre du flux de centres
+
+    rayon est un nombre ou un tableau d'un rayon par sphère, dans l'ordre des centres.
+    """
+    if np.ndim(rayon) == 0:
+        return np.full(nombre, float(rayon))
+    rayons = np.asarray(rayon, dtype=float).reshape(-1)[debut:debut + nombre]
+    if len(rayons) != nombre:
+        raise ValueError("Il faut un rayon par sphère!")
+    return rayons
+
+def spheres_par_bloc(nb_triangles_sphere, taille_tampon):
+    """
+    Nombre de sphères dont les triangles tiennent dans le tampon
+    """
+    return max(1, taille_tampon // nb_triangles_sphere)
+
+def exporter_stl(chemin, triangles=None, centres=None, rayon=None, niveau=NIVEAU_EXPORT, taille_tampon=TAILLE_TAMPON):
+    """
+    Écrit la scène dans un fichier STL binaire, par blocs de taille fixe
+
+    Le nombre de triangles de l'en-tête est complété à la fin de l'écriture.
+    rayon est un nombre ou un tableau d'un rayon par sphère.
+    """
+    triangles = np.empty((0, 3, 3)) if triangles is None else np.asarray(triangles, dtype=float)
+    sommets, _, indices = gabarit_sphere(*niveau)
+    triangles_sphere = sommets[indices]
+    
+    tampon = np.zeros(max(taille_tampon, len(indices)), dtype=DTYPE_STL)
+    total = 0
+    
+    with open(chemin, "wb") as fichier:
+        fichier.write(b"Test_3d STL binaire".ljust(80, b" "))
+        fichier.write(struct.pack("<I", 0))
+        
+        # Murs et sols
+        for debut in range(0, len(triangles), len(tampon)):
+            bloc = triangles[debut:debut + len(tampon)]
+            n = len(bloc)
+            tampon["sommets"][:n] = bloc
+            tampon["normale"][:n] = normales_triangles(bloc)
+            fichier.write(tampon[:n].tobytes())
+            total += n
+        
+        # Sphères : le gabarit unitaire est mis à l'échelle et translaté pour chaque centre du bloc
+        if centres is not None:
+            normales_sphere = normales_triangles(triangles_sphere)
+            nb_spheres = 0
+            for bloc in blocs_centres(centres, spheres_par_bloc(len(indices), len(tampon))):
+                n = len(bloc) * len(indices)
+                rayons = rayons_spheres(rayon, nb_spheres, len(bloc))
+                tampon["sommets"][:n] = (triangles_sphere[None] * rayons[:, None, None, None]
+                                         + bloc[:, None, None, :]).reshape(-1, 3, 3)
+                tampon["normale"][:n] = np.tile(normales_sphere, (len(bloc), 1))
+                fichier.write(tampon[:n].tobytes())
+                total += n
+                nb_spheres += len(bloc)
+        
+        fichier.seek(80)
+        fichier.write(struct.pack("<I", total))
+    
+    return total
+
+# Nombre maximal de chiffres des nombres d'éléments de l'en-tête PLY
+LARGEUR_COMPTE_PLY = 20
+
+def entete_ply(elements, taille=None):
+    """
+    Construit l'en-tête d'un fichier PLY binaire à partir de (nom, nombre, propriétés)
+
+    Avec taille, une dernière ligne de commentaire complète l'en-tête à
+    taille octets : il peut être réécrit en place, avec les nombres exacts,
+    une fois les éléments comptés.
+    """
+    lignes = ["ply", "format binary_little_endian 1.0", "comment Test_3d"]
+    for nom, nombre, proprietes in elements:
+        lignes.append(f"element {nom} {nombre}")
+        lignes.extend(f"property {propriete}" for propriete in proprietes)
+    entete = "\n".join(lignes) + "\n"
+    if taille is not None:
+        entete += "comment" + " " * (taille - len(entete) - len("comment\nend_header\n")) + "\n"
+    return (entete + "end_header\n").encode("ascii")
+
+def taille_entete_ply(elements):
+    """
+    Taille réservée à un en-tête PLY dont les nombres d'éléments ne sont pas
+    encore connus : celle des plus grands nombres, plus la ligne de commentaire
+    """
+    plus_grands = [(nom, 10 ** LARGEUR_COMPTE_PLY - 1, proprietes) for nom, _, proprietes in elements]
+    return len(entete_ply(plus_grands)) + len("comment\n")
+
+def exporter_ply(chemin, triangles=None, centres=None, rayon=None, niveau=NIVEAU_EXPORT, taille_tampon=TAILLE_TAMPON):
+    """
+    Écrit la scène dans un fichier PLY binaire, par blocs de taille fixe
+
+    Les sommets de tous les objets sont écrits d'abord, puis les faces, qui
+    sont recalculées bloc par bloc à partir du gabarit de sphère : les
+    centres ne sont parcourus qu'une fois. Les nombres d'éléments de
+    l'en-tête sont complétés à la fin de l'écriture. rayon est un nombre ou
+    un tableau d'un rayon par sphère.
+
+    Les faces indexent les sommets en uint : au-delà de NOMBRE_MAX_SOMMETS_PLY
+    sommets, l'écriture s'arrête, le fichier est supprimé et ValueError est levée.
+    """
+    triangles = np.empty((0, 3, 3)) if triangles is None else np.asarray(triangles, dtype=float)
+    sommets, _, indices = gabarit_sphere(*niveau)
+    par_bloc = spheres_par_bloc(max(len(sommets), len(indices)), taille_tampon)
+    
+    tampon_sommets = np.zeros(max(3 * taille_tampon, len(sommets)), dtype=DTYPE_PLY_SOMMET)
+    tampon_faces = np.zeros(max(taille_tampon, len(indices)), dtype=DTYPE_PLY_FACE)
+    tampon_faces["n"] = 3
+    
+    def elements(nb_sommets, nb_faces):
+        return [("vertex", nb_sommets, ["float x", "float y", "float z"]),
+                ("face", nb_faces, ["list uchar uint vertex_indices"])]
+    taille_entete = taille_entete_ply(elements(0, 0))
+    
+    def verifier_sommets(nb_sommets):
+        if nb_sommets > NOMBRE_MAX_SOMMETS_PLY:
+            fichier.close()
+            os.remove(chemin)
+            raise ValueError(f"Trop de sommets pour un fichier PLY: plus de {NOMBRE_MAX_SOMMETS_PLY}!")
+    
+    with open(chemin, "wb") as fichier:
+        fichier.write(entete_ply(elements(0, 0), taille_entete))
+        
+        def ecrire_sommets(points):
+            n = len(points)
+            tampon_sommets["x"][:n], tampon_sommets["y"][:n], tampon_sommets["z"][:n] = points.T
+            fichier.write(tampon_sommets[:n].tobytes())
+        
+        # 1. Sommets des murs et sols (trois par triangle), puis des sphères
+        verifier_sommets(3 * len(triangles))
+        for debut in range(0, len(triangles), taille_tampon):
+            ecrire_sommets(triangles[debut:debut + taille_tampon].reshape(-1, 3))
+        nb_spheres = 0
+        if centres is not None:
+            for bloc in blocs_centres(centres, par_bloc):
+                verifier_sommets(3 * len(triangles) + (nb_spheres + len(bloc)) * len(sommets))
+                rayons = rayons_spheres(rayon, nb_spheres, len(bloc))
+                ecrire_sommets((sommets[None] * rayons[:, None, None] + bloc[:, None, :]).reshape(-1, 3))
+                nb_spheres += len(bloc)
+        
+        # 2. Faces, dans le même ordre
+        for debut in range(0, len(triangles), taille_tampon):
+            n = min(taille_tampon, len(triangles) - debut)
+            tampon_faces["sommets"][:n] = 3 * (debut + np.arange(n))[:, None] + np.arange(3)
+            fichier.write(tampon_faces[:n].tobytes())
+        
+        decalage = 3 * len(triangles)
+        for debut in range(0, nb_spheres, par_bloc):
+            k = min(par_bloc, nb_spheres - debut)
+            n = k * len(indices)
+            decalages = decalage + (debut + np.arange(k)) * len(sommets)
+            tampon_faces["sommets"][:n] = (indices[None] + decalages[:, None, None]).reshape(-1, 3)
+            fichier.write(tampon_faces[:n].tobytes())
+        
+        nb_faces = len(triangles) + nb_spheres * len(indices)
+        fichier.seek(0)
+        fichier.write(entete_ply(elements(3 * len(triangles) + nb_spheres * len(sommets), nb_faces), taille_entete))
+    
+    return nb_faces
+
+def exporter_obj(chemin, triangles=None, centres=None, rayon=None, niveau=NIVEAU_EXPORT, taille_tampon=TAILLE_TAMPON):
+    """
+    Écrit la scène dans un fichier OBJ texte, par blocs de taille fixe
+
+    Le format OBJ autorise l'alternance des sommets et des faces : chaque
+    bloc est écrit entièrement avant de passer au suivant. rayon est un
+    nombre ou un tableau d'un rayon par sphère.
+    """
+    triangles = np.empty((0, 3, 3)) if triangles is None else np.asarray(triangles, dtype=float)
+    sommets, _, indices = gabarit_sphere(*niveau)
+    total = 0
+    
+    with open(chemin, "w", encoding="ascii") as fichier:
+        fichier.write("# Test_3d OBJ\n")
+        nb_sommets_ecrits = 0
+        
+        def ecrire_bloc(points, faces):
+            nonlocal nb_sommets_ecrits
+            np.savetxt(fichier, points, fmt="v %.6g %.6g %.6g")
+            np.savetxt(fichier, faces + nb_sommets_ecrits + 1, fmt="f %d %d %d")
+            nb_sommets_ecrits += len(points)
+            return len(faces)
+        
+        for debut in range(0, len(triangles), taille_tampon):
+            bloc = triangles[debut:debut + taille_tampon]
+            total += ecrire_bloc(bloc.reshape(-1, 3), np.arange(3 * len(bloc)).reshape(-1, 3))
+        
+        if centres is not None:
+            par_bloc = spheres_par_bloc(max(len(sommets), len(indices)), taille_tampon)
+            nb_spheres = 0
+            for bloc in blocs_centres(centres, par_bloc):
+                rayons = rayons_spheres(rayon, nb_spheres, len(bloc))
+                points = (sommets[None] * rayons[:, None, None] + bloc[:, None, :]).reshape(-1, 3)
+                faces = (indices[None] + (np.arange(len(bloc)) * len(sommets))[:, None, None]).reshape(-1, 3)
+                total += ecrire_bloc(points, faces)
+                nb_spheres += len(bloc)
+    
+    return total
+
+def exporter_instances(chemin, centres, rayon, niveau=NIVEAU_EXPORT, taille_tampon=TAILLE_TAMPON):
+    """
+    Écrit un fichier PLY instancié : un seul gabarit de sphère unitaire
+    (éléments vertex et face) et la liste des instances (centre et rayon)
+
+    rayon est un nombre ou un tableau d'un rayon par sphère.
+    """
+    sommets, _, indices = gabarit_sphere(*niveau)
+    
+    gabarit = np.zeros(len(sommets), dtype=DTYPE_PLY_SOMMET)
+    gabarit["x"], gabarit["y"], gabarit["z"] = sommets.T
+    faces = np.zeros(len(indices), dtype=DTYPE_PLY_FACE)
+    faces["n"], faces["sommets"] = 3, indices
+    tampon = np.zeros(taille_tampon, dtype=DTYPE_PLY_INSTANCE)
+    
+    def elements(nb_spheres):
+        return [("vertex", len(sommets), ["float x", "float y", "float z"]),
+                ("face", len(indices), ["list uchar uint vertex_indices"]),
+                ("instance", nb_spheres, ["float x", "float y", "float z", "float rayon"])]
+    taille_entete = taille_entete_ply(elements(0))
+    
+    with open(chemin, "wb") as fichier:
+        fichier.write(entete_ply(elements(0), taille_entete))
+        fichier.write(gabarit.tobytes())
+        fichier.write(faces.tobytes())
+        
+        nb_spheres = 0
+        for bloc in blocs_centres(centres, taille_tampon):
+            n = len(bloc)
+            tampon["x"][:n], tampon["y"][:n], tampon["z"][:n] = bloc.T
+            tampon["rayon"][:n] = rayons_spheres(rayon, nb_spheres, n)
+            fichier.write(tampon[:n].tobytes())
+            nb_spheres += n
+        
+        fichier.seek(0)
+        fichier.write(entete_ply(elements(nb_spheres), taille_entete))
+    
+    return nb_spheres
+
+def exporter_scene(chemin, triangles=None, centres=None, rayon=None, niveau=NIVEAU_EXPORT, taille_tampon=TAILLE_TAMPON):
+    """
+    Exporte la scène dans le format donné par l'extension du fichier (.stl, .ply ou .obj)
+
+    centres est un tableau (N, 3) ou un itérable de blocs (n, 3).
+    """
+    extension = os.path.splitext(chemin)[1].lower()
+    exporteurs = {".stl": exporter_stl, ".ply": exporter_ply, ".obj": exporter_obj}
+    if extension not in exporteurs:
+        raise ValueError(f"Format d'export inconnu: {extension!r} (choix: {', '.join(FORMATS_EXPORT)})")
+    if centres is not None and rayon is None:
+        raise ValueError("Le rayon des sphères est nécessaire pour exporter les centres!")
+    
+    return exporteurs[extension](chemin, triangles, centres, rayon, niveau, taille_tampon)
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande de l'export de maillage
+    """
+    parser = argparse.ArgumentParser(description="Export STL/PLY/OBJ des murs, sols et sphères")
+    parser.add_argument("sortie", help="Fichier de sortie (.stl, .ply ou .obj)")
+    parser.add_argument("--mode", default="cubique", choices=MODES_DISPOSITION, help="Mode d'empilement")
+    parser.add_argument("--graine", type=int, default=None, help="Graine du tirage (modes aleatoire et polydisperse)")
+    parser.add_argument("--loi", default=LOI_RAYONS, choices=LOIS_RAYONS, help="Loi des rayons (mode polydisperse)")
+    parser.add_argument("--dispersion", type=float, default=DISPERSION, help="Dispersion relative des rayons (mode polydisperse)")
+    parser.add_argument("--niveau", nargs=2, type=int, default=list(NIVEAU_EXPORT), metavar=("N_U", "N_V"))
+    parser.add_argument("--instances", action="store_true", help="PLY instancié : un gabarit et la liste des centres")
+    sous_parsers = parser.add_subparsers(dest="forme", required=True)
+    
+    parser_boite = sous_parsers.add_parser("boite", help="Parallélépipède rempli de sphères")
+    for nom in ["largeur", "longueur", "hauteur", "rayon_sphere"]:
+        parser_boite.add_argument(nom, type=float)
+    
+    parser_croix = sous_parsers.add_parser("croix", help="Plan en croix avec murs, sol et sphères")
+    for nom in ["largeur_centrale", "longueur_centrale", "largeur_bras", "longueur_bras", "hauteur", "rayon_sphere"]:
+        parser_croix.add_argument(nom, type=float)
+    parser_croix.add_argument("--epaisseur-mur", type=float, default=0.0, help="Épaisseur des murs (0: sol seul, sans murs)")
+    
+    args = parser.parse_args(arguments)
+    
+    # Les réseaux sont parcourus par blocs ; les tirages aléatoires et
+    # polydisperses sont générés (ou relus depuis le cache) d'un seul tenant
+    rayon = args.rayon_sphere
+    if args.forme == "boite":
+        triangles = None
+        if args.mode in MODES_EMPILEMENT:
+            centres = iterer_centres_boite(0, 0, args.largeur, args.longueur, args.hauteur,
+                                           2 * args.rayon_sphere, mode=args.mode)
+        else:
+            from app import disposition_parallelepipede_en_cache
+            centres = disposition_parallelepipede_en_cache(args.largeur, args.longueur, args.hauteur, args.rayon_sphere,
+                                                           args.mode, args.graine, loi=args.loi, dispersion=args.dispersion)
+            rayon = centres.rayon
+    else:
+        from plan_croix_avec_spheres import disposition_croix_en_cache, iterer_spheres_dans_croix
+        dimensions = (args.largeur_centrale, args.longueur_centrale, args.largeur_bras, args.longueur_bras, args.hauteur)
+        triangles = triangles_structure_croix(*dimensions, args.epaisseur_mur)
+        if args.mode in MODES_EMPILEMENT:
+            centres = iterer_spheres_dans_croix(*dimensions, args.rayon_sphere, args.mode)
+        else:
+            centres = disposition_croix_en_cache(*dimensions, args.rayon_sphere, args.mode, args.graine,
+                                                 loi=args.loi, dispersion=args.dispersion)
+            rayon = centres.rayon
+    
+    if args.instances:
+        nombre = exporter_instances(args.sortie, centres, rayon, tuple(args.niveau))
+        print(f"{nombre} instances de sphère écrites dans {args.sortie}")
+    else:
+        nombre = exporter_scene(args.sortie, triangles, centres, rayon, tuple(args.niveau))
+        print(f"{nombre} triangles écrits dans {args.sortie}")
+
+if __name__ == "__main__":
+    main()
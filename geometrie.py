@@ -0,0 +1,99 @@
+import numpy as np
+
+def calculer_nombre_par_axe(largeur, longueur, hauteur, diametre):
+    """
+    Calcule le nombre de sphères pouvant tenir dans chaque dimension
+    """
+    nx = max(1, int(largeur / diametre))
+    ny = max(1, int(longueur / diametre))
+    nz = max(1, int(hauteur / diametre))
+    return nx, ny, nz
+
+def calculer_dimensions_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras):
+    """
+    Calcule les dimensions totales et le centre de la structure en croix
+    """
+    largeur_totale = largeur_centrale + 2 * longueur_bras
+    longueur_totale = longueur_centrale + 2 * longueur_bras
+    return largeur_totale, longueur_totale, largeur_totale / 2, longueur_totale / 2
+
+def decomposer_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras):
+    """
+    Découpe l'emprise de la croix en cinq rectangles (nom, x, y, largeur, longueur)
+    """
+    _, _, centre_x, centre_y = calculer_dimensions_croix(
+        largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    
+    return [
+        ("Partie centrale", centre_x - largeur_centrale/2, centre_y - longueur_centrale/2,
+         largeur_centrale, longueur_centrale),
+        ("Bras gauche", centre_x - largeur_centrale/2 - longueur_bras, centre_y - largeur_bras/2,
+         longueur_bras, largeur_bras),
+        ("Bras droit", centre_x + largeur_centrale/2, centre_y - largeur_bras/2,
+         longueur_bras, largeur_bras),
+        ("Bras haut", centre_x - largeur_bras/2, centre_y + longueur_centrale/2,
+         largeur_bras, longueur_bras),
+        ("Bras bas", centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras,
+         largeur_bras, longueur_bras),
+    ]
+
+def calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur):
+    """
+    Calcule le volume total de la structure en croix
+    """
+    # Volume de la partie centrale
+    volume_central = largeur_centrale * longueur_centrale * hauteur
+    
+    # Volume des 4 bras
+    volume_bras = 4 * (longueur_bras * largeur_bras * hauteur)
+    
+    return volume_central + volume_bras
+
+def faces_sol_croix(centre_x, centre_y, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras):
+    """
+    Calcule les faces du sol de la structure en forme de croix, tableau (5, 4, 3)
+    """
+    # Sol de la partie centrale
+    sol_central = [
+        [centre_x - largeur_centrale/2, centre_y - longueur_centrale/2, 0],
+        [centre_x + largeur_centrale/2, centre_y - longueur_centrale/2, 0],
+        [centre_x + largeur_centrale/2, centre_y + longueur_centrale/2, 0],
+        [centre_x - largeur_centrale/2, centre_y + longueur_centrale/2, 0]
+    ]
+    
+    # Sols des bras
+    sols = [sol_central]
+    
+    # Bras gauche
+    sols.append([
+        [centre_x - largeur_centrale/2 - longueur_bras, centre_y - largeur_bras/2, 0],
+        [centre_x - largeur_centrale/2, centre_y - largeur_bras/2, 0],
+        [centre_x - largeur_centrale/2, centre_y + largeur_bras/2, 0],
+        [centre_x - largeur_centrale/2 - longueur_bras, centre_y + largeur_bras/2, 0]
+    ])
+    
+    # Bras droit
+    sols.append([
+        [centre_x + largeur_centrale/2, centre_y - largeur_bras/2, 0],
+        [centre_x + largeur_centrale/2 + longueur_bras, centre_y - largeur_bras/2, 0],
+        [centre_x + largeur_centrale/2 + longueur_bras, centre_y + largeur_bras/2, 0],
+        [centre_x + largeur_centrale/2, centre_y + largeur_bras/2, 0]
+    ])
+    
+    # Bras haut
+    sols.append([
+        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2, 0],
+        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2, 0],
+        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
+        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0]
+    ])
+    
+    # Bras bas
+    sols.append([
+        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
+        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
+        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2, 0],
+        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2, 0]
+    ])
+    
+    return np.array(sols, dtype=float)
@@ -0,0 +1,276 @@
+import itertools
+
+import numpy as np
+
+# Décalages de la demi-coquille : la cellule elle-même et 13 de ses 26 voisines,
+# chaque paire de cellules voisines n'est ainsi visitée qu'une fois
+DECALAGES_DEMI_COQUILLE = [(0, 0, 0)] + [
+    d for d in itertools.product((-1, 0, 1), repeat=3) if d > (0, 0, 0)
+]
+
+class GrilleSpatiale:
+    """
+    Table de hachage spatiale uniforme sur un ensemble de points (N, 3)
+
+    Les points sont triés par cellule ; chaque cellule occupée est décrite
+    par sa clé linéaire, l'indice de son premier point dans l'ordre trié et
+    son nombre de points. Toutes les recherches sont vectorisées.
+    """
+
+    def __init__(self, points, taille_cellule):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.taille_cellule = float(taille_cellule)
+        if self.taille_cellule <= 0:
+            raise ValueError("La taille de cellule doit être positive!")
+
+        if len(self.points):
+            self.origine = self.points.min(axis=0)
+            cellules = self.cellules_de(self.points)
+            self.dimensions = cellules.max(axis=0) + 1
+        else:
+            self.origine = np.zeros(3)
+            cellules = np.empty((0, 3), dtype=np.int64)
+            self.dimensions = np.ones(3, dtype=np.int64)
+
+        cles = self.cles_de(cellules)
+        self.ordre = np.argsort(cles, kind="stable")
+        self.cles_uniques, self.debuts, self.comptes = np.unique(
+            cles[self.ordre], return_index=True, return_counts=True)
+
+    def cellules_de(self, points):
+        """
+        Indices entiers (N, 3) des cellules contenant les points
+        """
+        return np.floor((points - self.origine) / self.taille_cellule).astype(np.int64)
+
+    def cles_de(self, cellules):
+        """
+        Clés linéaires des cellules (les cellules hors de la grille doivent être filtrées avant)
+        """
+        return (cellules[:, 0] * self.dimensions[1] + cellules[:, 1]) * self.dimensions[2] + cellules[:, 2]
+
+    def cellules_occupees(self):
+        """
+        Indices entiers (C, 3) des cellules occupées, dans l'ordre des clés
+        """
+        cles = self.cles_uniques
+        cz = cles % self.dimensions[2]
+        cy = (cles // self.dimensions[2]) % self.dimensions[1]
+        cx = cles // (self.dimensions[2] * self.dimensions[1])
+        return np.column_stack([cx, cy, cz])
+
+    def chercher_cellules(self, cellules):
+        """
+        Retrouve des cellules dans la grille
+
+        Retourne, pour chaque cellule demandée, le rang de la cellule occupée
+        correspondante et un masque indiquant si elle existe.
+        """
+        dans_grille = np.all((cellules >= 0) & (cellules < self.dimensions), axis=1)
+        if len(self.cles_uniques) == 0:
+            return np.zeros(len(cellules), dtype=np.int64), np.zeros(len(cellules), dtype=bool)
+
+        cles = self.cles_de(np.where(dans_grille[:, None], cellules, 0))
+        rangs = np.minimum(np.searchsorted(self.cles_uniques, cles), len(self.cles_uniques) - 1)
+        trouvees = dans_grille & (self.cles_uniques[rangs] == cles)
+        return rangs, trouvees
+
+    def developper_paires(self, debuts_a, comptes_a, debuts_b, comptes_b):
+        """
+        Développe des couples de blocs (début, compte) de l'ordre trié en
+        toutes les paires de rangs triés (ia, ib) qu'ils contiennent
+        """
+        tailles = comptes_a * comptes_b
+        total = int(tailles.sum())
+        if total == 0:
+            vide = np.empty(0, dtype=np.int64)
+            return vide, vide
+
+        couple = np.repeat(np.arange(len(tailles)), tailles)
+        local = np.arange(total) - np.repeat(np.cumsum(tailles) - tailles, tailles)
+        ia = debuts_a[couple] + local // comptes_b[couple]
+        ib = debuts_b[couple] + local % comptes_b[couple]
+        return ia, ib
+
+    def paires_candidates(self):
+        """
+        Itère sur les paires candidates de points situés dans des cellules
+        voisines, décalage par décalage pour borner la mémoire
+
+        Les paires sont données en rangs dans l'ordre trié (self.ordre donne
+        l'indice d'origine), ce qui garde les accès mémoire localisés.
+        """
+        cellules = self.cellules_occupees()
+        for decalage in DECALAGES_DEMI_COQUILLE:
+            rangs, trouvees = self.chercher_cellules(cellules + np.array(decalage))
+            source = np.flatnonzero(trouvees)
+            voisine = rangs[trouvees]
+            i, j = self.developper_paires(self.debuts[source], self.comptes[source],
+                                          self.debuts[voisine], self.comptes[voisine])
+            if decalage == (0, 0, 0):
+                # Dans une même cellule, chaque paire n'est gardée qu'une fois
+                garder = i < j
+                i, j = i[garder], j[garder]
+            yield i, j
+
+    def paires_proches(self, distance):
+        """
+        Retourne toutes les paires (K, 2) de points à moins de distance l'un
+        de l'autre, ainsi que leurs distances (distance <= taille de cellule)
+        """
+        if distance > self.taille_cellule * (1 + 1e-12):
+            raise ValueError("La distance de recherche dépasse la taille de cellule!")
+
+        points_tries = self.points[self.ordre]
+        distance_carree = distance * distance
+
+        paires, distances = [], []
+        for ia, ib in self.paires_candidates():
+            ecart = points_tries[ia] - points_tries[ib]
+            d2 = np.einsum("ij,ij->i", ecart, ecart)
+            proches = d2 < distance_carree
+            paires.append(np.column_stack([self.ordre[ia[proches]], self.ordre[ib[proches]]]))
+            distances.append(np.sqrt(d2[proches]))
+
+        return np.concatenate(paires), np.concatenate(distances)
+
+    def voisins_de(self, points, distance):
+        """
+        Retourne les couples (K, 2) (indice d'un point cherché, indice d'un
+        point de la grille) à moins de distance l'un de l'autre, ainsi que
+        leurs distances
+
+        distance est un nombre ou un tableau (N,) d'une distance par point
+        cherché, au plus égale à la taille de cellule : seules les 27
+        cellules voisines de chaque point sont examinées.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        distances_max = np.broadcast_to(np.asarray(distance, dtype=float), (len(points),))
+        if len(points) and distances_max.max() > self.taille_cellule * (1 + 1e-12):
+            raise ValueError("La distance de recherche dépasse la taille de cellule!")
+
+        cellules = self.cellules_de(points)
+        points_tries = self.points[self.ordre]
+        un = np.ones(len(points), dtype=np.int64)
+
+        paires, distances = [np.empty((0, 2), dtype=np.int64)], [np.empty(0)]
+        for decalage in itertools.product((-1, 0, 1), repeat=3):
+            rangs, trouvees = self.chercher_cellules(cellules + np.array(decalage))
+            source = np.flatnonzero(trouvees)
+            voisine = rangs[trouvees]
+            i, j = self.developper_paires(source, un[source], self.debuts[voisine], self.comptes[voisine])
+            ecart = points[i] - points_tries[j]
+            d2 = np.einsum("ij,ij->i", ecart, ecart)
+            proches = d2 < distances_max[i] ** 2
+            paires.append(np.column_stack([i[proches], self.ordre[j[proches]]]))
+            distances.append(np.sqrt(d2[proches]))
+
+        return np.concatenate(paires), np.concatenate(distances)
+
+class GrilleChainee:
+    """
+    Grille spatiale uniforme incrémentale de sphères sur une boîte fixée
+
+    Chaque cellule d'un tableau dense pointe sur la dernière sphère insérée
+    dans la cellule, et chaque sphère sur la précédente de sa cellule (listes
+    chaînées). Une insertion coûte O(1) par sphère, sans reconstruire la
+    grille : elle convient aux remplissages qui alternent recherches et
+    insertions. Une bordure de deux cellules évite les cas de bord et admet
+    des points cherchés jusqu'à une cellule hors de la boîte.
+    """
+
+    def __init__(self, bas, haut, taille_cellule, capacite=1024):
+        self.taille_cellule = float(taille_cellule)
+        if self.taille_cellule <= 0:
+            raise ValueError("La taille de cellule doit être positive!")
+
+        self.origine = np.asarray(bas, dtype=float) - 2 * self.taille_cellule
+        dimensions = np.floor((np.asarray(haut, dtype=float) - self.origine) / self.taille_cellule).astype(np.int64) + 4
+        self.dimensions = dimensions
+        self.pas_plats = np.array([dimensions[1] * dimensions[2], dimensions[2], 1])
+        self.tetes = np.full(int(np.prod(dimensions)), -1, dtype=np.int64)
+
+        # 27 cellules voisines, la cellule elle-même puis les plus proches d'abord
+        decalages = np.array(list(itertools.product((-1, 0, 1), repeat=3)))
+        decalages = decalages[np.argsort(np.abs(decalages).sum(axis=1), kind="stable")]
+        self.voisinage = decalages @ self.pas_plats
+
+        self.centres = np.empty((max(int(capacite), 1), 3))
+        self.rayons = np.empty(len(self.centres))
+        self.suivants = np.empty(len(self.centres), dtype=np.int64)
+        self.nombre = 0
+
+    def cellules_de(self, points):
+        """
+        Indices plats des cellules contenant les points, qui doivent être
+        à moins d'une cellule de la boîte donnée à la construction
+        """
+        cellules = np.floor((points - self.origine) / self.taille_cellule).astype(np.int64)
+        return cellules @ self.pas_plats
+
+    def inserer(self, centres, rayons):
+        """
+        Ajoute des sphères (n, 3) de rayons (n,) à la grille, avec les indices
+        nombre, nombre + 1, ...
+        """
+        centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+        if len(centres) == 0:
+            return
+        if self.nombre + len(centres) > len(self.centres):
+            capacite = max(2 * len(self.centres), self.nombre + len(centres))
+            self.centres = np.concatenate([self.centres[:self.nombre], np.empty((capacite - self.nombre, 3))])
+            self.rayons = np.concatenate([self.rayons[:self.nombre], np.empty(capacite - self.nombre)])
+            self.suivants = np.concatenate([self.suivants[:self.nombre], np.empty(capacite - self.nombre, dtype=np.int64)])
+
+        indices = np.arange(self.nombre, self.nombre + len(centres))
+        self.centres[indices] = centres
+        self.rayons[indices] = rayons
+        self.nombre += len(centres)
+
+        # Chaînage des nouvelles sphères d'une même cellule les unes aux autres,
+        # la dernière de chaque cellule pointant sur l'ancienne tête
+        cellules = self.cellules_de(centres)
+        ordre = np.argsort(cellules, kind="stable")
+        cellules, indices = cellules[ordre], indices[ordre]
+        meme = cellules[1:] == cellules[:-1]
+        self.suivants[indices[:-1]] = np.where(meme, indices[1:], self.tetes[cellules[:-1]])
+        self.suivants[indices[-1]] = self.tetes[cellules[-1]]
+        premiers = np.concatenate([[True], ~meme])
+        self.tetes[cellules[premiers]] = indices[premiers]
+
+    def touches(self, points, rayons, demi_cote=0.0, facteur=1.0):
+        """
+        Teste, pour chaque point (n, 3) de rayon donné, s'il est à moins de
+        facteur * (rayon + R) d'une sphère de la grille de rayon R
+
+        Avec demi_cote, c'est tout le cube de ce demi-côté centré sur le point
+        qui doit l'être. rayon + R doit rester au plus égal à la taille de
+        cellule. Le parcours s'arrête pour un point dès la première sphère
+        trouvée : il est rapide quand la plupart des points sont touchés.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        rayons = np.broadcast_to(np.asarray(rayons, dtype=float), (len(points),))
+        touches = np.zeros(len(points), dtype=bool)
+        cellules = self.cellules_de(points)
+        actifs = np.arange(len(points))
+
+        for decalage in self.voisinage:
+            lignes, courants = actifs, self.tetes[cellules[actifs] + decalage]
+
+            # Parcours en parallèle des listes de la cellule voisine, un maillon à la fois
+            while True:
+                occupes = courants >= 0
+                lignes, courants = lignes[occupes], courants[occupes]
+                if len(lignes) == 0:
+                    break
+                ecart = np.abs(self.centres[courants] - points[lignes]) + demi_cote
+                limite = (rayons[lignes] + self.rayons[courants]) * facteur
+                proches = np.einsum("ij,ij->i", ecart, ecart) < limite ** 2
+                touches[lignes[proches]] = True
+                lignes, courants = lignes[~proches], self.suivants[courants[~proches]]
+
+            actifs = actifs[~touches[actifs]]
+            if len(actifs) == 0:
+                break
+
+        return touches
\ No newline at end of file
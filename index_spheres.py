@@ -0,0 +1,549 @@
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    # Sans SciPy, les plus proches voisins passent par la grille de l'index
+    cKDTree = None
+
+from disposition import DispositionSpheres
+from grille_spatiale import GrilleSpatiale
+
+# Nombre moyen de centres par cellule des régions occupées, pour la taille de
+# cellule par défaut
+CENTRES_PAR_CELLULE = 0.25
+
+# Cellules vides ajoutées autour de la grille, pour que les gabarits de
+# recherche n'aient pas à être découpés près des bords
+MARGE_CELLULES = 4
+
+# Nombre maximal de cellules de la table dense de l'index
+NOMBRE_MAX_CELLULES = 1 << 26
+
+# Nombre maximal de candidats examinés ensemble, pour borner la mémoire
+TAILLE_LOT_CANDIDATS = 1 << 22
+
+# Nombre de requêtes de plus proches voisins traitées ensemble
+TAILLE_LOT_REQUETES = 1 << 15
+
+# Modes de sélection des sphères par une boîte
+MODES_BOITE = ("centre", "entiere", "touchee")
+
+def lire_centres(centres, rayon=None):
+    """
+    Centres (N, 3) et rayons (N,) ou None d'une disposition, d'un tableau
+    (N, 3) ou d'un triplet (centres_x, centres_y, centres_z)
+    """
+    if isinstance(centres, DispositionSpheres):
+        rayons = centres.rayons() if rayon is None else None
+        centres = centres.centres
+    elif isinstance(centres, tuple) and len(centres) == 3:
+        centres = np.column_stack([np.asarray(colonne, dtype=float).reshape(-1) for colonne in centres])
+        rayons = None
+    else:
+        rayons = None
+    centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+
+    if rayon is not None:
+        rayons = np.broadcast_to(np.asarray(rayon, dtype=float), (len(centres),))
+    return centres, rayons
+
+def estimer_densite(centres):
+    """
+    Nombre de centres par unité de volume dans la région qu'ils occupent
+
+    Le volume occupé est celui des cellules non vides d'une grille d'environ
+    8 centres par cellule de la boîte englobante.
+    """
+    if len(centres) < 2:
+        return 1.0
+    etendue = np.ptp(centres, axis=0)
+    etendue = np.where(etendue > 0, etendue, etendue.max() if etendue.max() > 0 else 1.0)
+    taille = (np.prod(etendue) * 8 / len(centres)) ** (1 / 3)
+    cellules = np.floor((centres - centres.min(axis=0)) / taille).astype(np.int64)
+    dimensions = cellules.max(axis=0) + 1
+    cles = (cellules[:, 0] * dimensions[1] + cellules[:, 1]) * dimensions[2] + cellules[:, 2]
+    return len(centres) / (len(np.unique(cles)) * taille ** 3)
+
+def decouper_lots(estimations, taille_lot=TAILLE_LOT_CANDIDATS):
+    """
+    Découpe des requêtes en lots consécutifs dont la somme des estimations
+    (nombres de candidats) reste de l'ordre de taille_lot
+    """
+    numeros = (np.cumsum(estimations) - estimations) // taille_lot
+    return np.split(np.arange(len(estimations)), np.flatnonzero(np.diff(numeros)) + 1)
+
+def developper_plages(proprietaires, debuts, comptes):
+    """
+    Développe des plages (début, compte) de rangs en couples (propriétaire,
+    rang), groupés par plage
+    """
+    decalages = np.cumsum(comptes) - comptes
+    proprietaire = np.repeat(proprietaires, comptes)
+    rangs = np.arange(len(proprietaire)) + np.repeat(debuts - decalages, comptes)
+    return proprietaire, rangs
+
+def fusionner_plus_proche(meilleures, indices, comptes, d, j):
+    """
+    Cas k = 1 de fusionner : minimum de chaque groupe de candidates, sans
+    matrice complétée
+    """
+    lignes = np.flatnonzero(comptes)
+    if len(lignes) == 0:
+        return
+    debuts = np.cumsum(comptes) - comptes
+    minimums = np.minimum.reduceat(d, debuts[lignes])
+
+    # Première candidate de chaque groupe atteignant son minimum
+    atteints = np.flatnonzero(d == np.repeat(minimums, comptes[lignes]))
+    groupes = np.repeat(np.arange(len(lignes)), comptes[lignes])[atteints]
+    premieres = atteints[np.concatenate([[True], groupes[1:] != groupes[:-1]])]
+
+    meilleurs = minimums < meilleures[lignes, 0]
+    meilleures[lignes[meilleurs], 0] = minimums[meilleurs]
+    indices[lignes[meilleurs], 0] = j[premieres[meilleurs]]
+
+def fusionner(meilleures, indices, i, d, j):
+    """
+    Garde, pour chaque ligne, les k plus petites distances parmi ses k
+    meilleures et ses nouvelles candidates (d, j), groupées par ligne i croissante
+    """
+    n, k = meilleures.shape
+    comptes = np.bincount(i, minlength=n)
+    if k == 1:
+        fusionner_plus_proche(meilleures, indices, comptes, d, j)
+        return
+    largeur = k + int(comptes.max(initial=0))
+
+    if n * largeur > 4 * (len(i) + n * k):
+        # Candidates très inégalement réparties : tri par ligne puis distance
+        lignes = np.concatenate([np.repeat(np.arange(n), k), i])
+        toutes = np.concatenate([meilleures.reshape(-1), d])
+        tous_indices = np.concatenate([indices.reshape(-1), j])
+        ordre = np.lexsort((toutes, lignes))
+        rang = np.arange(len(ordre)) - np.repeat(np.cumsum(comptes + k) - comptes - k, comptes + k)
+        gardes = ordre[rang < k]
+        meilleures[:] = toutes[gardes].reshape(n, k)
+        indices[:] = tous_indices[gardes].reshape(n, k)
+        return
+
+    colonnes = k + np.arange(len(i)) - np.repeat(np.cumsum(comptes) - comptes, comptes)
+    toutes = np.full((n, largeur), np.inf)
+    tous_indices = np.full((n, largeur), -1, dtype=np.int64)
+    toutes[:, :k] = meilleures
+    tous_indices[:, :k] = indices
+    toutes[i, colonnes] = d
+    tous_indices[i, colonnes] = j
+
+    choix = np.argpartition(toutes, k - 1, axis=1)[:, :k] if largeur > k else np.arange(k)[None, :]
+    meilleures[:] = np.take_along_axis(toutes, choix, axis=1)
+    indices[:] = np.take_along_axis(tous_indices, choix, axis=1)
+
+class IndexSpheres:
+    """
+    Index de requêtes spatiales sur les centres d'une disposition
+
+    Construit une fois par disposition sur une GrilleSpatiale, il répond par
+    lots vectorisés aux requêtes de plus proche voisin, des k plus proches,
+    de rayon et de boîte alignée sur les axes. Les centres peuvent venir
+    d'une DispositionSpheres (empilement de la boîte de app.py), d'un triplet
+    (centres_x, centres_y, centres_z) renvoyé par generer_spheres_dans_croix
+    ou d'un tableau (N, 3).
+
+    Les cellules étant triées par clé, une colonne (x, y) de cellules est une
+    plage contiguë de l'ordre trié : une table dense des débuts de cellules
+    donne chaque plage en temps constant, et une table de sommes cumulées 3D
+    compte les centres de n'importe quel pavé de cellules.
+    """
+
+    def __init__(self, centres, rayon=None, taille_cellule=None):
+        self.centres, self.rayons = lire_centres(centres, rayon)
+
+        self.densite = estimer_densite(self.centres)
+        if taille_cellule is None:
+            # Bornée pour que la table dense reste sous NOMBRE_MAX_CELLULES
+            volume = np.prod(np.ptp(self.centres, axis=0)) if len(self) else 0.0
+            taille_cellule = max((CENTRES_PAR_CELLULE / self.densite) ** (1 / 3),
+                                 (8 * volume / NOMBRE_MAX_CELLULES) ** (1 / 3))
+        self.grille = GrilleSpatiale(self.centres, taille_cellule)
+        self.taille_cellule = self.grille.taille_cellule
+
+        # Grille entourée de MARGE_CELLULES cellules vides de chaque côté
+        self.origine = self.grille.origine - MARGE_CELLULES * self.taille_cellule
+        self.dimensions = self.grille.dimensions + 2 * MARGE_CELLULES
+        nombre_cellules = int(np.prod(self.dimensions))
+        if nombre_cellules > NOMBRE_MAX_CELLULES:
+            raise ValueError("La taille de cellule est trop petite pour l'étendue de la disposition!")
+
+        comptes = np.zeros(nombre_cellules, dtype=np.int64)
+        comptes[self.cles_de(self.grille.cellules_occupees() + MARGE_CELLULES)] = self.grille.comptes
+        self.bornes = np.concatenate([[0], np.cumsum(comptes)])
+        self.cumul = np.zeros(tuple(self.dimensions + 1), dtype=np.int64)
+        self.cumul[1:, 1:, 1:] = comptes.reshape(self.dimensions).cumsum(0).cumsum(1).cumsum(2)
+
+        # Centres et rayons dans l'ordre trié, pour des accès mémoire localisés
+        self.centres_tries = self.centres[self.grille.ordre]
+        self.rayons_tries = None if self.rayons is None else np.asarray(self.rayons)[self.grille.ordre]
+        self.rayon_max = 0.0 if self.rayons is None or len(self) == 0 else float(np.max(self.rayons))
+        self.rayons_egaux = self.rayons is None or len(self) == 0 or float(np.ptp(self.rayons)) == 0.0
+
+        self.gabarits = {}
+        self.arbre = None
+
+    def __len__(self):
+        return len(self.centres)
+
+    def verifier_rayons(self):
+        """
+        Lève une erreur si l'index a été construit sans rayons
+        """
+        if self.rayons is None:
+            raise ValueError("Les rayons des sphères sont nécessaires pour cette requête!")
+
+    def cellules_de(self, points):
+        """
+        Indices entiers (N, 3) des cellules de la grille bordée contenant les points
+        """
+        return np.floor((points - self.origine) / self.taille_cellule).astype(np.int64)
+
+    def cles_de(self, cellules):
+        """
+        Clés linéaires des cellules de la grille bordée
+        """
+        return (cellules[:, 0] * self.dimensions[1] + cellules[:, 1]) * self.dimensions[2] + cellules[:, 2]
+
+    def compter_paves(self, bas, haut):
+        """
+        Nombre de centres dans les pavés de cellules [bas, haut] (P, 3),
+        bornes incluses, découpés à la grille
+        """
+        a = np.clip(bas, 0, self.dimensions)
+        b = np.maximum(np.clip(haut + 1, 0, self.dimensions), a)
+        c = self.cumul
+        return (c[b[:, 0], b[:, 1], b[:, 2]] - c[a[:, 0], b[:, 1], b[:, 2]] - c[b[:, 0], a[:, 1], b[:, 2]]
+                - c[b[:, 0], b[:, 1], a[:, 2]] + c[a[:, 0], a[:, 1], b[:, 2]] + c[a[:, 0], b[:, 1], a[:, 2]]
+                + c[b[:, 0], a[:, 1], a[:, 2]] - c[a[:, 0], a[:, 1], a[:, 2]])
+
+    def colonnes(self, bas, haut):
+        """
+        Énumère les colonnes (x, y) de cellules des pavés [bas, haut] (P, 3)
+        découpés à la grille
+
+        Retourne le numéro du pavé et les indices x et y de chaque colonne.
+        """
+        bas = np.maximum(bas[:, :2], 0)
+        haut = np.minimum(haut[:, :2], self.dimensions[:2] - 1)
+        etendues = np.maximum(haut - bas + 1, 0)
+        nombres = etendues[:, 0] * etendues[:, 1]
+
+        pave = np.repeat(np.arange(len(bas)), nombres)
+        local = np.arange(len(pave)) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+        return pave, bas[pave, 0] + local // etendues[pave, 1], bas[pave, 1] + local % etendues[pave, 1]
+
+    def candidats(self, pave, cx, cy, z_bas, z_haut):
+        """
+        Développe les cellules z_bas..z_haut des colonnes (cx, cy) en couples
+        (numéro du pavé, rang trié d'un centre), groupés par pavé croissant
+        """
+        dimension_z = self.dimensions[2]
+        base = (cx * self.dimensions[1] + cy) * dimension_z
+        debuts = self.bornes[base + np.clip(z_bas, 0, dimension_z - 1)]
+        fins = self.bornes[base + np.clip(z_haut, -1, dimension_z - 1) + 1]
+        comptes = np.where(z_bas <= z_haut, np.maximum(fins - debuts, 0), 0)
+        return developper_plages(pave, debuts, comptes)
+
+    def candidats_boules(self, points, portees):
+        """
+        Parcourt, par lots, les couples (indice d'un point, rang trié d'un
+        centre) couvrant tous les centres à au plus portee de chaque point
+
+        Seules les cellules des colonnes qui rencontrent la boule, et dans
+        chacune la tranche en z qui la coupe, sont examinées.
+        """
+        taille = self.taille_cellule
+        bas = self.cellules_de(points - portees[:, None])
+        haut = self.cellules_de(points + portees[:, None])
+        for lot in decouper_lots(self.compter_paves(bas, haut)):
+            pave, cx, cy = self.colonnes(bas[lot], haut[lot])
+            point = lot[pave]
+
+            # Écart horizontal entre chaque point et sa colonne
+            coins = self.origine[:2] + np.column_stack([cx, cy]) * taille
+            ecart = np.clip(points[point, :2], coins, coins + taille) - points[point, :2]
+            reste = portees[point] ** 2 - np.einsum("ij,ij->i", ecart, ecart)
+            gardees = reste >= 0
+            demi_hauteur = np.sqrt(reste[gardees])
+
+            z = points[point[gardees], 2] - self.origine[2]
+            i, j = self.candidats(pave[gardees], cx[gardees], cy[gardees],
+                                  np.floor((z - demi_hauteur) / taille).astype(np.int64),
+                                  np.floor((z + demi_hauteur) / taille).astype(np.int64))
+            yield lot[i], j
+
+    def gabarit(self, portee):
+        """
+        Gabarit des colonnes de cellules pouvant contenir un centre à au plus
+        portee d'un point de la cellule centrale
+
+        Retourne le demi-côté du gabarit et, pour chaque colonne, les
+        décalages de clé de sa première et de sa dernière cellule. Les
+        colonnes gardées et leurs hauteurs dépendent de portee et non du seul
+        demi-côté : le cache est indexé par portee.
+        """
+        portee = float(portee)
+        if portee not in self.gabarits:
+            demi_cote = int(np.ceil(portee / self.taille_cellule))
+            decalages = np.arange(-demi_cote, demi_cote + 1)
+            dx, dy = [d.reshape(-1) for d in np.meshgrid(decalages, decalages, indexing="ij")]
+
+            # Écart minimal entre la cellule centrale et chaque colonne, puis
+            # demi-hauteur en cellules de la tranche de colonne à examiner
+            ecart = (np.maximum(np.abs(dx) - 1, 0) ** 2 + np.maximum(np.abs(dy) - 1, 0) ** 2) * self.taille_cellule ** 2
+            gardees = ecart <= portee ** 2
+            reste = np.sqrt(portee ** 2 - ecart[gardees]) / self.taille_cellule
+            demi_hauteur = np.minimum(np.floor(reste).astype(np.int64) + 1, demi_cote)
+
+            base = (dx[gardees] * self.dimensions[1] + dy[gardees]) * self.dimensions[2]
+            self.gabarits[portee] = (demi_cote, base - demi_hauteur, base + demi_hauteur)
+        return self.gabarits[portee]
+
+    def candidats_gabarit(self, points, portee):
+        """
+        Couples (indice d'un point, rang trié d'un centre) couvrant tous les
+        centres à au plus portee de chaque point, par un gabarit fixe
+
+        Retourne aussi le masque des points traités : ceux dont le gabarit
+        sortirait de la grille bordée sont laissés aux autres recherches.
+        """
+        demi_cote, premieres, dernieres = self.gabarit(portee)
+        cellules = self.cellules_de(points)
+        traites = np.all((cellules >= demi_cote) & (cellules < self.dimensions - demi_cote), axis=1)
+
+        cles = self.cles_de(cellules[traites])
+        debuts = self.bornes[cles[:, None] + premieres[None, :]]
+        comptes = self.bornes[cles[:, None] + dernieres[None, :] + 1] - debuts
+        i, j = developper_plages(np.repeat(np.flatnonzero(traites), len(premieres)),
+                                 debuts.reshape(-1), comptes.reshape(-1))
+        return i, j, traites
+
+    def distances(self, points, i, j, surface=False):
+        """
+        Distances entre les points i et les centres de rangs triés j, ou
+        jusqu'à la surface des sphères avec surface=True
+        """
+        ecart = np.take(points, i, axis=0) - np.take(self.centres_tries, j, axis=0)
+        d = np.sqrt(np.einsum("ij,ij->i", ecart, ecart))
+        return d - np.take(self.rayons_tries, j) if surface else d
+
+    def plus_proche(self, points, surface=False):
+        """
+        Retourne, pour chaque point (P, 3), l'indice de la sphère la plus
+        proche et sa distance
+
+        Avec surface=True, la distance est mesurée jusqu'à la surface des
+        sphères (négative à l'intérieur d'une sphère).
+        """
+        indices, distances = self.k_plus_proches(points, 1, surface)
+        return indices[:, 0], distances[:, 0]
+
+    def k_plus_proches(self, points, k, surface=False):
+        """
+        Retourne les indices (P, k) des k sphères les plus proches de chaque
+        point et leurs distances (P, k), par distance croissante
+
+        Un gabarit de cellules couvrant une boule qui contient en moyenne un
+        peu plus de k centres règle la plupart des requêtes. Pour les points
+        loin des centres, les sommes cumulées bornent d'abord la k-ième distance.
+        Les points sont traités dans l'ordre de leurs cellules, pour que les
+        candidates de points voisins soient lues ensemble.
+
+        Par la grille, le débit reste loin du million de requêtes par
+        seconde : sur un cœur, avec 10^6 centres, de l'ordre de 0,2 M/s pour
+        k = 1 et 0,1 M/s pour k = 8 (cas plus_proches_voisins de
+        benchmark.py). Quand SciPy est installé, les requêtes sont donc
+        confiées à un cKDTree construit à la première requête : de l'ordre de
+        0,5 M/s par cœur pour k = 1, sur tous les cœurs. Les distances aux
+        surfaces de sphères de rayons différents, dont l'ordre n'est pas celui
+        des centres, restent à la grille.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        k = int(k)
+        if k < 1 or k > len(self):
+            raise ValueError("Le nombre de voisins doit être compris entre 1 et le nombre de sphères!")
+        if surface:
+            self.verifier_rayons()
+
+        cellules = np.clip(self.cellules_de(points), 0, self.dimensions - 1)
+        ordre = np.argsort(self.cles_de(cellules), kind="stable")
+        if cKDTree is not None and (self.rayons_egaux or not surface):
+            return self.k_plus_proches_arbre(points, k, surface, ordre)
+
+        indices = np.empty((len(points), k), dtype=np.int64)
+        distances = np.empty((len(points), k))
+        for debut in range(0, len(points), TAILLE_LOT_REQUETES):
+            lot = ordre[debut:debut + TAILLE_LOT_REQUETES]
+            indices[lot], distances[lot] = self.k_plus_proches_lot(points[lot], k, surface)
+        return indices, distances
+
+    def k_plus_proches_arbre(self, points, k, surface, ordre):
+        """
+        Recherche des k plus proches voisins par un cKDTree des centres, sur
+        tous les cœurs
+
+        Les points sont parcourus dans l'ordre de leurs cellules : des
+        requêtes voisines relisent les mêmes nœuds de l'arbre, ce qui
+        multiplie le débit par quatre environ pour des points tirés au hasard.
+        """
+        if self.arbre is None:
+            self.arbre = cKDTree(self.centres)
+        indices = np.empty((len(points), k), dtype=np.int64)
+        distances = np.empty((len(points), k))
+        trouvees, rangs = self.arbre.query(points[ordre], k=k, workers=-1)
+        distances[ordre] = trouvees.reshape(len(points), k)
+        indices[ordre] = rangs.reshape(len(points), k)
+        if surface:
+            distances -= self.rayon_max
+        return indices, distances
+
+    def k_plus_proches_lot(self, points, k, surface):
+        """
+        Recherche des k plus proches voisins pour un lot de points
+        """
+        meilleures = np.full((len(points), k), np.inf)
+        rangs = np.full((len(points), k), -1, dtype=np.int64)
+        retrait = self.rayon_max if surface else 0.0
+
+        # Boule contenant en moyenne k + 3 sqrt(k) + 3 centres, puis boule
+        # double : les k plus proches sont sûrs dès que la k-ième distance est
+        # dans la boule, et seules les candidates de la boule peuvent en faire partie
+        attendus = k + 3 * np.sqrt(k) + 3
+        portee_attendue = (attendus / (self.densite * 4 / 3 * np.pi)) ** (1 / 3)
+        restants = np.arange(len(points))
+        for portee in (portee_attendue, 2 * portee_attendue):
+            cherches = points[restants]
+            i, j, traites = self.candidats_gabarit(cherches, portee + retrait)
+            d = self.distances(cherches, i, j, surface)
+            dans_boule = d <= portee
+            proches = np.full((len(restants), k), np.inf)
+            rangs_proches = np.full((len(restants), k), -1, dtype=np.int64)
+            fusionner(proches, rangs_proches, i[dans_boule], d[dans_boule], j[dans_boule])
+            meilleures[restants], rangs[restants] = proches, rangs_proches
+            restants = restants[~traites | (proches[:, -1] > portee)]
+
+        if len(restants):
+            meilleures[restants], rangs[restants] = self.k_plus_proches_eloignes(points[restants], k, surface)
+
+        ordre = np.argsort(meilleures, axis=1)
+        return (self.grille.ordre[np.take_along_axis(rangs, ordre, axis=1)],
+                np.take_along_axis(meilleures, ordre, axis=1))
+
+    def k_plus_proches_eloignes(self, points, k, surface):
+        """
+        k plus proches voisins de points loin des centres ou dans une région
+        creuse, non réglés par le gabarit
+
+        Le plus petit cube de cellules contenant au moins k centres autour de
+        la cellule de la région occupée la plus proche de chaque point, trouvé
+        par dichotomie sur la table des sommes cumulées, borne la k-ième
+        distance. Les cellules de la boule de ce rayon sont ensuite toutes
+        examinées.
+        """
+        meilleures = np.full((len(points), k), np.inf)
+        rangs = np.full((len(points), k), -1, dtype=np.int64)
+        premiere = MARGE_CELLULES
+        derniere = MARGE_CELLULES + self.grille.dimensions - 1
+        centrales = np.clip(self.cellules_de(points), premiere, derniere)
+
+        # Dichotomie sur le demi-côté du cube : il couvre tous les centres à max(dimensions)
+        demi_min = np.zeros(len(points), dtype=np.int64)
+        demi_max = np.full(len(points), int(self.grille.dimensions.max()), dtype=np.int64)
+        while np.any(demi_min < demi_max):
+            milieu = (demi_min + demi_max) // 2
+            assez = self.compter_paves(centrales - milieu[:, None], centrales + milieu[:, None]) >= k
+            demi_max = np.where(assez, milieu, demi_max)
+            demi_min = np.where(assez, demi_min, milieu + 1)
+
+        # La k-ième distance est au plus celle du coin le plus éloigné du cube
+        # découpé à la région occupée
+        coins_bas = self.origine + np.maximum(centrales - demi_max[:, None], premiere) * self.taille_cellule
+        coins_haut = self.origine + (np.minimum(centrales + demi_max[:, None], derniere) + 1) * self.taille_cellule
+        ecart = np.maximum(np.abs(points - coins_bas), np.abs(points - coins_haut))
+        portees = np.sqrt(np.einsum("ij,ij->i", ecart, ecart))
+
+        for i, j in self.candidats_boules(points, portees + (self.rayon_max if surface else 0.0)):
+            d = self.distances(points, i, j, surface)
+            dans_boule = d <= portees[i]
+            fusionner(meilleures, rangs, i[dans_boule], d[dans_boule], j[dans_boule])
+        return meilleures, rangs
+
+    def dans_rayon(self, points, rayon, surface=False):
+        """
+        Retourne les couples (K, 2) (indice d'un point cherché, indice d'une
+        sphère) à au plus rayon l'un de l'autre, ainsi que leurs distances
+
+        rayon est un nombre ou un tableau (P,) d'un rayon par point. Avec
+        surface=True, une sphère est retenue dès qu'elle touche la boule de
+        recherche. Les couples sont groupés par point cherché. Comme pour
+        k_plus_proches, le débit reste loin du million de requêtes par seconde.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        rayons_recherche = np.broadcast_to(np.asarray(rayon, dtype=float), (len(points),))
+        if len(points) and rayons_recherche.min() < 0:
+            raise ValueError("Le rayon de recherche doit être positif!")
+        if surface:
+            self.verifier_rayons()
+
+        couples, distances = [np.empty((0, 2), dtype=np.int64)], [np.empty(0)]
+        portees = rayons_recherche + (self.rayon_max if surface else 0.0)
+        for i, j in self.candidats_boules(points, portees):
+            d = self.distances(points, i, j)
+            retenus = d <= rayons_recherche[i] + (self.rayons_tries[j] if surface else 0.0)
+            couples.append(np.column_stack([i[retenus], self.grille.ordre[j[retenus]]]))
+            distances.append(d[retenus])
+
+        return np.concatenate(couples), np.concatenate(distances)
+
+    def dans_boite(self, bas, haut, mode="centre"):
+        """
+        Retourne les couples (K, 2) (indice d'une boîte, indice d'une sphère)
+        des sphères sélectionnées par des boîtes alignées sur les axes
+
+        bas et haut sont les coins (B, 3) des boîtes. Le mode "centre" retient
+        les sphères dont le centre est dans la boîte, "entiere" celles qui y
+        sont entièrement contenues et "touchee" celles qui la rencontrent.
+        Les couples sont groupés par boîte.
+        """
+        if mode not in MODES_BOITE:
+            raise ValueError(f"Mode de boîte inconnu : {mode}!")
+        bas = np.asarray(bas, dtype=float).reshape(-1, 3)
+        haut = np.asarray(haut, dtype=float).reshape(-1, 3)
+        if bas.shape != haut.shape:
+            raise ValueError("Les coins bas et haut doivent décrire le même nombre de boîtes!")
+        if np.any(bas > haut):
+            raise ValueError("Le coin bas d'une boîte dépasse son coin haut!")
+        if mode != "centre":
+            self.verifier_rayons()
+
+        marge = self.rayon_max if mode == "touchee" else 0.0
+        cellule_bas = self.cellules_de(bas - marge)
+        cellule_haut = self.cellules_de(haut + marge)
+
+        couples = [np.empty((0, 2), dtype=np.int64)]
+        for lot in decouper_lots(self.compter_paves(cellule_bas, cellule_haut)):
+            pave, cx, cy = self.colonnes(cellule_bas[lot], cellule_haut[lot])
+            boite = lot[pave]
+            i, j = self.candidats(pave, cx, cy, cellule_bas[boite, 2], cellule_haut[boite, 2])
+            i = lot[i]
+
+            centres = self.centres_tries[j]
+            if mode == "centre":
+                retenus = np.all((centres >= bas[i]) & (centres <= haut[i]), axis=1)
+            elif mode == "entiere":
+                r = self.rayons_tries[j][:, None]
+                retenus = np.all((centres - r >= bas[i]) & (centres + r <= haut[i]), axis=1)
+            else:
+                ecart = np.clip(centres, bas[i], haut[i]) - centres
+                retenus = np.einsum("ij,ij->i", ecart, ecart) <= self.rayons_tries[j] ** 2
+            couples.append(np.column_stack([i[retenus], self.grille.ordre[j[retenus]]]))
+
+        return np.concatenate(couples)
\ No newline at end of file
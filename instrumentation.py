@@ -0,0 +1,248 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Instrumentation à la demande : TEST3D_PROFIL=1 affiche le rapport,
+# TEST3D_PROFIL=trace.json l'affiche et écrit en plus une trace Chrome
+VARIABLE_PROFIL = "TEST3D_PROFIL"
+
+# TEST3D_PROFIL_MEMOIRE=0 désactive le suivi des allocations, qui ralentit
+# fortement le rendu matplotlib et majore donc les durées mesurées
+VARIABLE_PROFIL_MEMOIRE = "TEST3D_PROFIL_MEMOIRE"
+
+class Instrumentation:
+    """
+    Enregistre la durée et les allocations de phases imbriquées, ainsi que
+    des compteurs (sphères, facettes, artistes, appels de dessin)
+    """
+
+    def __init__(self, memoire=True):
+        self.memoire = memoire
+        self.origine = time.perf_counter_ns()
+        self.phases = []
+        self.compteurs = {}
+        self.pile = []
+
+    def debut_phase(self, nom):
+        cadre = {"nom": nom, "debut": time.perf_counter_ns(), "pic_enfants": 0, "memoire_debut": 0}
+        if self.memoire and tracemalloc.is_tracing():
+            courant, pic = tracemalloc.get_traced_memory()
+            # Le pic est remis à zéro pour la phase : celui du parent est conservé dans sa pile
+            if self.pile:
+                self.pile[-1]["pic_enfants"] = max(self.pile[-1]["pic_enfants"], pic)
+            tracemalloc.reset_peak()
+            cadre["memoire_debut"] = courant
+        self.pile.append(cadre)
+
+    def fin_phase(self):
+        cadre = self.pile.pop()
+        fin = time.perf_counter_ns()
+        phase = {"nom": cadre["nom"], "profondeur": len(self.pile),
+                 "debut": (cadre["debut"] - self.origine) / 1e9, "duree": (fin - cadre["debut"]) / 1e9}
+
+        if self.memoire and tracemalloc.is_tracing():
+            courant, pic = tracemalloc.get_traced_memory()
+            pic = max(pic, cadre["pic_enfants"])
+            phase["memoire_pic"] = pic - cadre["memoire_debut"]
+            phase["memoire_nette"] = courant - cadre["memoire_debut"]
+            if self.pile:
+                self.pile[-1]["pic_enfants"] = max(self.pile[-1]["pic_enfants"], pic)
+
+        self.phases.append(phase)
+        return phase
+
+    def compter(self, nom, valeur=1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + valeur
+
+    def rapport(self):
+        """
+        Retourne le rapport structuré : phases dans l'ordre de début et compteurs
+        """
+        return {"memoire": self.memoire,
+                "phases": sorted(self.phases, key=lambda phase: phase["debut"]),
+                "compteurs": dict(self.compteurs)}
+
+    def trace_chrome(self):
+        """
+        Retourne le rapport au format Trace Event (chrome://tracing, Perfetto)
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        evenements = []
+        for phase in self.phases:
+            arguments = {cle: valeur for cle, valeur in phase.items() if cle.startswith("memoire")}
+            evenements.append({"name": phase["nom"], "ph": "X", "pid": pid, "tid": tid,
+                               "ts": phase["debut"] * 1e6, "dur": phase["duree"] * 1e6, "args": arguments})
+        fin = max((phase["debut"] + phase["duree"] for phase in self.phases), default=0.0)
+        evenements.append({"name": "compteurs", "ph": "C", "pid": pid, "tid": tid,
+                           "ts": fin * 1e6, "args": dict(self.compteurs)})
+        return {"traceEvents": evenements, "displayTimeUnit": "ms"}
+
+# Instrumentation active, None tant qu'elle n'est pas demandée
+_instrumentation = None
+_demarre_tracemalloc = False
+
+def activer_instrumentation(memoire=True):
+    """
+    Active l'instrumentation ; memoire=True suit aussi les allocations (tracemalloc)
+    """
+    global _instrumentation, _demarre_tracemalloc
+    if memoire and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _demarre_tracemalloc = True
+    _instrumentation = Instrumentation(memoire)
+    return _instrumentation
+
+def activer_depuis_environnement():
+    """
+    Active l'instrumentation si la variable TEST3D_PROFIL est définie
+    """
+    if os.environ.get(VARIABLE_PROFIL):
+        desactiver_instrumentation()
+        activer_instrumentation(memoire=os.environ.get(VARIABLE_PROFIL_MEMOIRE, "1") != "0")
+    return _instrumentation
+
+def desactiver_instrumentation():
+    """
+    Désactive l'instrumentation et retourne celle qui était active
+    """
+    global _instrumentation, _demarre_tracemalloc
+    instrumentation, _instrumentation = _instrumentation, None
+    if _demarre_tracemalloc:
+        tracemalloc.stop()
+        _demarre_tracemalloc = False
+    return instrumentation
+
+def instrumentation_active():
+    """
+    Indique si l'instrumentation est active
+    """
+    return _instrumentation is not None
+
+@contextlib.contextmanager
+def phase(nom):
+    """
+    Mesure une phase (durée et allocations) ; sans effet si l'instrumentation est inactive
+    """
+    instrumentation = _instrumentation
+    if instrumentation is None:
+        yield
+        return
+
+    instrumentation.debut_phase(nom)
+    try:
+        yield
+    finally:
+        instrumentation.fin_phase()
+
+def compter(nom, valeur=1):
+    """
+    Incrémente un compteur ; sans effet si l'instrumentation est inactive
+    """
+    if _instrumentation is not None:
+        _instrumentation.compter(nom, valeur)
+
+def instrumenter_figure(fig):
+    """
+    Compte les artistes d'une figure et mesure ses rendus
+
+    Chaque appel de dessin de la figure est compté, et le tri en profondeur
+    des collections 3D (do_3d_projection) est mesuré comme une phase.
+    """
+    if _instrumentation is None:
+        return
+
+    for ax in fig.axes:
+        artistes = list(ax.collections) + list(ax.lines) + list(ax.patches)
+        compter("artistes", len(artistes))
+        for artiste in artistes:
+            if hasattr(artiste, "do_3d_projection"):
+                artiste.do_3d_projection = envelopper_projection(artiste.do_3d_projection)
+
+    fig.canvas.mpl_connect("draw_event", lambda evenement: compter("appels_dessin"))
+
+def envelopper_projection(projection):
+    def projection_mesuree(*args, **kwargs):
+        with phase("tri_profondeur"):
+            return projection(*args, **kwargs)
+    return projection_mesuree
+
+def rendre_figure(fig):
+    """
+    Effectue un premier rendu mesuré de la figure, avant son affichage
+    """
+    if _instrumentation is None:
+        return
+
+    instrumenter_figure(fig)
+    with phase("rendu"):
+        fig.canvas.draw()
+
+def afficher_rapport_instrumentation(rapport):
+    """
+    Affiche le rapport d'instrumentation, une ligne par phase
+
+    Les phases consécutives de même nom et de même profondeur (par exemple
+    le tri en profondeur de chaque collection) sont cumulées sur une ligne.
+    """
+    print("\n=== Instrumentation ===")
+    if rapport["memoire"]:
+        print("(suivi des allocations actif : les durées sont majorées)")
+
+    lignes = []
+    for etape in rapport["phases"]:
+        if lignes and (lignes[-1]["nom"], lignes[-1]["profondeur"]) == (etape["nom"], etape["profondeur"]):
+            precedente = lignes[-1]
+            precedente["duree"] += etape["duree"]
+            precedente["appels"] += 1
+            if "memoire_pic" in etape:
+                precedente["memoire_pic"] = max(precedente["memoire_pic"], etape["memoire_pic"])
+        else:
+            lignes.append({**etape, "appels": 1})
+
+    for etape in lignes:
+        nom = etape["nom"] if etape["appels"] == 1 else f"{etape['nom']} (x{etape['appels']})"
+        ligne = f"{'  ' * etape['profondeur']}{nom:<{30 - 2 * etape['profondeur']}} {etape['duree'] * 1000:10.1f} ms"
+        if "memoire_pic" in etape:
+            ligne += f"  pic {etape['memoire_pic'] / 2 ** 20:8.1f} Mio"
+        print(ligne)
+    for nom, valeur in rapport["compteurs"].items():
+        print(f"{nom}: {valeur}")
+
+def terminer_instrumentation(chemin_trace=None):
+    """
+    Désactive l'instrumentation, affiche le rapport et écrit la trace Chrome
+
+    Sans chemin explicite, la trace est écrite dans le fichier désigné par
+    TEST3D_PROFIL lorsqu'il se termine par .json.
+    """
+    instrumentation = desactiver_instrumentation()
+    if instrumentation is None:
+        return None
+
+    rapport = instrumentation.rapport()
+    afficher_rapport_instrumentation(rapport)
+
+    if chemin_trace is None and os.environ.get(VARIABLE_PROFIL, "").endswith(".json"):
+        chemin_trace = os.environ[VARIABLE_PROFIL]
+    if chemin_trace:
+        with open(chemin_trace, "w", encoding="utf-8") as fichier:
+            json.dump(instrumentation.trace_chrome(), fichier)
+        print(f"Trace Chrome écrite dans {chemin_trace}")
+
+    return rapport
+
+@contextlib.contextmanager
+def session_instrumentation():
+    """
+    Active l'instrumentation selon l'environnement le temps d'un bloc ou
+    d'une fonction, et la termine même si elle s'arrête sur une saisie
+    invalide ou une exception
+    """
+    activer_depuis_environnement()
+    try:
+        yield
+    finally:
+        terminer_instrumentation()
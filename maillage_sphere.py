@@ -0,0 +1,97 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Nombre de niveaux de tessellation gardés en mémoire par type de gabarit
+TAILLE_CACHE_GABARITS = 16
+
+def figer(*tableaux):
+    """
+    Rend des tableaux partagés par le cache accessibles en lecture seule
+    """
+    for tableau in tableaux:
+        tableau.setflags(write=False)
+    return tableaux if len(tableaux) > 1 else tableaux[0]
+
+@lru_cache(maxsize=TAILLE_CACHE_GABARITS)
+def _facettes_sphere(n_u, n_v):
+    # Les sommets sont ceux du gabarit indexé : point (i, j) de la grille
+    # (longitude, latitude), pôles partagés et méridien 2pi ramené sur 0
+    sommets, _, _ = _gabarit_sphere(n_u, n_v)
+    nb_longitudes = n_u - 1
+    i = np.arange(n_u)[:, None] % nb_longitudes
+    j = np.arange(n_v)[None, :]
+    grille = np.where(j == 0, 0, np.where(j == n_v - 1, len(sommets) - 1, 1 + (j - 1) * nb_longitudes + i))
+
+    # Chaque facette relie (i, j), (i+1, j), (i+1, j+1), (i, j+1)
+    indices = np.stack([grille[:-1, :-1], grille[1:, :-1], grille[1:, 1:], grille[:-1, 1:]], axis=2)
+    return figer(sommets[indices.reshape(-1, 4)])
+
+def generer_facettes_sphere(n_u, n_v):
+    """
+    Retourne les facettes quadrilatères d'une sphère unitaire, tableau (F, 4, 3)
+
+    La paramétrisation est celle de l'ancien dessin par plot_surface :
+    n_u points en longitude sur [0, 2pi] et n_v points en latitude sur [0, pi].
+    Les sommets sont lus dans gabarit_sphere, seule source de la géométrie.
+    Le résultat est mis en cache par niveau et partagé : il est en lecture seule.
+    """
+    return _facettes_sphere(int(n_u), int(n_v))
+
+@lru_cache(maxsize=TAILLE_CACHE_GABARITS)
+def _gabarit_sphere(n_u, n_v):
+    nb_longitudes = n_u - 1
+    u = np.linspace(0, 2 * np.pi, n_u)[:-1]
+    v = np.linspace(0, np.pi, n_v)[1:-1]
+    
+    # Pôle nord, anneaux de latitude, pôle sud
+    anneaux = np.stack([
+        np.outer(np.sin(v), np.cos(u)), np.outer(np.sin(v), np.sin(u)), np.outer(np.cos(v), np.ones(nb_longitudes))
+    ], axis=-1).reshape(-1, 3)
+    sommets = np.concatenate([[[0.0, 0.0, 1.0]], anneaux, [[0.0, 0.0, -1.0]]])
+    sud = len(sommets) - 1
+    
+    i = np.arange(nb_longitudes)
+    suivant = (i + 1) % nb_longitudes
+    
+    # Calottes : éventails autour des pôles
+    calotte_nord = np.column_stack([np.zeros_like(i), 1 + i, 1 + suivant])
+    dernier = 1 + (len(v) - 1) * nb_longitudes
+    calotte_sud = np.column_stack([np.full_like(i, sud), dernier + suivant, dernier + i])
+    
+    # Bandes entre anneaux consécutifs, deux triangles par quadrilatère
+    j = np.arange(len(v) - 1)[:, None]
+    haut_i, haut_s = 1 + j * nb_longitudes + i, 1 + j * nb_longitudes + suivant
+    bas_i, bas_s = haut_i + nb_longitudes, haut_s + nb_longitudes
+    bandes = np.concatenate([
+        np.stack([haut_i, bas_i, bas_s], axis=-1).reshape(-1, 3),
+        np.stack([haut_i, bas_s, haut_s], axis=-1).reshape(-1, 3),
+    ])
+    
+    triangles = np.concatenate([calotte_nord, bandes, calotte_sud]).astype(np.int64)
+    return figer(sommets, sommets.copy(), triangles)
+
+def gabarit_sphere(n_u, n_v):
+    """
+    Retourne le maillage indexé d'une sphère unitaire
+
+    Retourne les sommets (V, 3), les normales (V, 3) et les triangles (T, 3)
+    d'indices de sommets. Les pôles sont partagés et le méridien de raccord
+    n'est pas dupliqué, ce qui donne un maillage fermé sans triangle dégénéré.
+    Le résultat est mis en cache par niveau et partagé : il est en lecture seule.
+    """
+    return _gabarit_sphere(int(n_u), int(n_v))
+
+def vider_cache_gabarits():
+    """
+    Vide le cache des gabarits de sphère
+    """
+    _facettes_sphere.cache_clear()
+    _gabarit_sphere.cache_clear()
+
+def statistiques_cache_gabarits():
+    """
+    Retourne les statistiques (succès, échecs, taille) des caches de gabarits
+    """
+    return {nom: fonction.cache_info()._asdict()
+            for nom, fonction in [("facettes", _facettes_sphere), ("gabarit", _gabarit_sphere)]}
@@ -1,39 +1,72 @@
+import importlib.util
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from empreinte import decaler_polygone, faces_murs_prisme, polygone_croix
+from geometrie import faces_sol_croix
+from instrumentation import compter, phase, rendre_figure, session_instrumentation
 
+@session_instrumentation()
 def creer_plan_3d():
     """
     Génère une version 3D du plan architectural en forme de croix
     """
+    import matplotlib.pyplot as plt
+
     print("=== Générateur de Plan 3D ===")
     
-    # Saisie des paramètres
-    try:
-        # Dimensions de la structure en croix
-        largeur_centrale = float(input("Entrez la largeur de la partie centrale: "))
-        longueur_centrale = float(input("Entrez la longueur de la partie centrale: "))
-        largeur_bras = float(input("Entrez la largeur des bras de la croix: "))
-        longueur_bras = float(input("Entrez la longueur des bras de la croix: "))
-        hauteur = float(input("Entrez la hauteur du bâtiment: "))
-        epaisseur_mur = float(input("Entrez l'épaisseur des murs: "))
+    with phase("saisie"):
+        # Saisie des paramètres
+        try:
+            # Dimensions de la structure en croix
+            largeur_centrale = float(input("Entrez la largeur de la partie centrale: "))
+            longueur_centrale = float(input("Entrez la longueur de la partie centrale: "))
+            largeur_bras = float(input("Entrez la largeur des bras de la croix: "))
+            longueur_bras = float(input("Entrez la longueur des bras de la croix: "))
+            hauteur = float(input("Entrez la hauteur du bâtiment: "))
         
-        if any(val <= 0 for val in [largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur]):
-            print("Erreur: Toutes les valeurs doivent être positives!")
-            return
+            if any(val <= 0 for val in [largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur]):
+                print("Erreur: Toutes les valeurs doivent être positives!")
+                return
             
-    except ValueError:
-        print("Erreur: Veuillez entrer des nombres valides!")
-        return
-    
+        except ValueError:
+            print("Erreur: Veuillez entrer des nombres valides!")
+            return
+        
+        # L'épaisseur des murs est redemandée tant que les murs ne tiennent pas dans la croix
+        polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+        while True:
+            try:
+                epaisseur_mur = float(input("Entrez l'épaisseur des murs: "))
+            except ValueError:
+                print("Erreur: Veuillez entrer un nombre valide!")
+                continue
+            try:
+                decaler_polygone(polygone, epaisseur_mur)
+                break
+            except ValueError as erreur:
+                print(f"Erreur: {erreur}")
+    
+    # Construction de la scène puis affichage
+    with phase("construction"):
+        fig = construire_figure_plan_3d(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, epaisseur_mur)
+    rendre_figure(fig)
+    with phase("affichage"):
+        plt.show()
+
+def construire_figure_plan_3d(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, epaisseur_mur):
+    """
+    Construit la figure du plan 3D sans l'afficher
+    """
+    import matplotlib.pyplot as plt
+
     # Création de la figure 3D
     fig = plt.figure(figsize=(15, 12))
     ax = fig.add_subplot(111, projection='3d')
     
     # Générer la structure 3D
-    generer_structure_croix(ax, largeur_centrale, longueur_centrale, 
-                           largeur_bras, longueur_bras, hauteur, epaisseur_mur)
+    with phase("murs_sols"):
+        generer_structure_croix(ax, largeur_centrale, longueur_centrale, 
+                               largeur_bras, longueur_bras, hauteur, epaisseur_mur)
     
     # Configuration de l'affichage
     ax.set_xlabel('X (Largeur)')
@@ -50,8 +83,8 @@ def creer_plan_3d():
     # Améliorer la vue
     ax.view_init(elev=30, azim=45)
     
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return fig
 
 def generer_structure_croix(ax, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, epaisseur_mur):
     """
@@ -70,142 +103,42 @@ def generer_structure_croix(ax, largeur_centrale, longueur_centrale, largeur_bra
     centre_x = largeur_totale / 2
     centre_y = longueur_totale / 2
     
-    # 1. PARTIE CENTRALE (rectangle central)
-    # Murs extérieurs de la partie centrale
-    dessiner_rectangle_3d(ax, 
-                         centre_x - largeur_centrale/2, centre_y - longueur_centrale/2,
-                         largeur_centrale, longueur_centrale, hauteur, epaisseur_mur,
-                         couleur_mur_ext, "Partie centrale")
-    
-    # 2. BRAS HORIZONTAL (gauche et droite)
-    # Bras gauche
-    dessiner_rectangle_3d(ax,
-                         centre_x - largeur_centrale/2 - longueur_bras, centre_y - largeur_bras/2,
-                         longueur_bras, largeur_bras, hauteur, epaisseur_mur,
-                         couleur_mur_ext, "Bras gauche")
-    
-    # Bras droit
-    dessiner_rectangle_3d(ax,
-                         centre_x + largeur_centrale/2, centre_y - largeur_bras/2,
-                         longueur_bras, largeur_bras, hauteur, epaisseur_mur,
-                         couleur_mur_ext, "Bras droit")
+    # 1. MURS : contour extérieur de toute la croix, sans mur aux jonctions
+    # entre la partie centrale et les bras, qui communiquent
+    polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras,
+                              centre=(centre_x, centre_y))
+    dessiner_murs_polygone(ax, polygone, hauteur, epaisseur_mur, couleur_mur_ext)
     
-    # 3. BRAS VERTICAL (haut et bas)
-    # Bras haut
-    dessiner_rectangle_3d(ax,
-                         centre_x - largeur_bras/2, centre_y + longueur_centrale/2,
-                         largeur_bras, longueur_bras, hauteur, epaisseur_mur,
-                         couleur_mur_ext, "Bras haut")
-    
-    # Bras bas
-    dessiner_rectangle_3d(ax,
-                         centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras,
-                         largeur_bras, longueur_bras, hauteur, epaisseur_mur,
-                         couleur_mur_ext, "Bras bas")
-    
-    # 4. SOL de toute la structure
+    # 2. SOL de toute la structure
     dessiner_sol_croix(ax, centre_x, centre_y, largeur_centrale, longueur_centrale,
                        largeur_bras, longueur_bras, couleur_sol)
 
-def dessiner_rectangle_3d(ax, x, y, largeur, longueur, hauteur, epaisseur_mur, couleur, nom):
+def dessiner_murs_polygone(ax, polygone, hauteur, epaisseur_mur, couleur):
     """
-    Dessine un rectangle 3D avec des murs d'épaisseur donnée
+    Dessine les murs d'épaisseur donnée le long du contour d'un polygone
+
+    Toutes les faces forment une seule collection, dont la taille suit la
+    longueur du contour.
     """
-    # Mur extérieur
-    vertices_ext = [
-        [x, y, 0], [x + largeur, y, 0], [x + largeur, y + longueur, 0], [x, y + longueur, 0],  # base
-        [x, y, hauteur], [x + largeur, y, hauteur], [x + largeur, y + longueur, hauteur], [x, y + longueur, hauteur]  # sommet
-    ]
-    
-    # Mur intérieur (plus petit)
-    vertices_int = [
-        [x + epaisseur_mur, y + epaisseur_mur, 0], 
-        [x + largeur - epaisseur_mur, y + epaisseur_mur, 0], 
-        [x + largeur - epaisseur_mur, y + longueur - epaisseur_mur, 0], 
-        [x + epaisseur_mur, y + longueur - epaisseur_mur, 0],  # base intérieure
-        [x + epaisseur_mur, y + epaisseur_mur, hauteur], 
-        [x + largeur - epaisseur_mur, y + epaisseur_mur, hauteur], 
-        [x + largeur - epaisseur_mur, y + longueur - epaisseur_mur, hauteur], 
-        [x + epaisseur_mur, y + longueur - epaisseur_mur, hauteur]  # sommet intérieur
-    ]
-    
-    # Faces des murs (entre mur extérieur et intérieur)
-    faces = []
-    
-    # Mur avant (y minimum)
-    faces.append([vertices_ext[0], vertices_ext[1], vertices_ext[5], vertices_ext[4]])
-    faces.append([vertices_int[1], vertices_int[0], vertices_int[4], vertices_int[5]])
-    faces.append([vertices_ext[0], vertices_int[0], vertices_int[1], vertices_ext[1]])
-    faces.append([vertices_ext[4], vertices_ext[5], vertices_int[5], vertices_int[4]])
-    
-    # Mur arrière (y maximum)
-    faces.append([vertices_ext[2], vertices_ext[3], vertices_ext[7], vertices_ext[6]])
-    faces.append([vertices_int[3], vertices_int[2], vertices_int[6], vertices_int[7]])
-    faces.append([vertices_ext[2], vertices_ext[3], vertices_int[3], vertices_int[2]])
-    faces.append([vertices_ext[6], vertices_int[6], vertices_int[7], vertices_ext[7]])
-    
-    # Mur gauche (x minimum)
-    faces.append([vertices_ext[0], vertices_ext[4], vertices_ext[7], vertices_ext[3]])
-    faces.append([vertices_int[0], vertices_int[3], vertices_int[7], vertices_int[4]])
-    faces.append([vertices_ext[0], vertices_ext[3], vertices_int[3], vertices_int[0]])
-    faces.append([vertices_ext[4], vertices_int[4], vertices_int[7], vertices_ext[7]])
-    
-    # Mur droit (x maximum)
-    faces.append([vertices_ext[1], vertices_ext[2], vertices_ext[6], vertices_ext[5]])
-    faces.append([vertices_int[2], vertices_int[1], vertices_int[5], vertices_int[6]])
-    faces.append([vertices_ext[1], vertices_int[1], vertices_int[2], vertices_ext[2]])
-    faces.append([vertices_ext[5], vertices_ext[6], vertices_int[6], vertices_int[5]])
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    # Faces des murs (entre contour extérieur et contour intérieur)
+    faces = faces_murs_prisme(polygone, hauteur, epaisseur_mur)
+    compter("facettes", len(faces))
     
     # Ajouter les faces à l'affichage
     collection = Poly3DCollection(faces, alpha=0.7, facecolor=couleur, edgecolor='black')
     ax.add_collection3d(collection)
+    return collection
 
 def dessiner_sol_croix(ax, centre_x, centre_y, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, couleur):
     """
     Dessine le sol de la structure en forme de croix
     """
-    # Sol de la partie centrale
-    sol_central = [
-        [centre_x - largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        [centre_x + largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        [centre_x + largeur_centrale/2, centre_y + longueur_centrale/2, 0],
-        [centre_x - largeur_centrale/2, centre_y + longueur_centrale/2, 0]
-    ]
-    
-    # Sols des bras
-    sols = [sol_central]
-    
-    # Bras gauche
-    sols.append([
-        [centre_x - largeur_centrale/2 - longueur_bras, centre_y - largeur_bras/2, 0],
-        [centre_x - largeur_centrale/2, centre_y - largeur_bras/2, 0],
-        [centre_x - largeur_centrale/2, centre_y + largeur_bras/2, 0],
-        [centre_x - largeur_centrale/2 - longueur_bras, centre_y + largeur_bras/2, 0]
-    ])
-    
-    # Bras droit
-    sols.append([
-        [centre_x + largeur_centrale/2, centre_y - largeur_bras/2, 0],
-        [centre_x + largeur_centrale/2 + longueur_bras, centre_y - largeur_bras/2, 0],
-        [centre_x + largeur_centrale/2 + longueur_bras, centre_y + largeur_bras/2, 0],
-        [centre_x + largeur_centrale/2, centre_y + largeur_bras/2, 0]
-    ])
-    
-    # Bras haut
-    sols.append([
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0]
-    ])
-    
-    # Bras bas
-    sols.append([
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2, 0],
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2, 0]
-    ])
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    sols = faces_sol_croix(centre_x, centre_y, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    compter("facettes", len(sols))
     
     # Dessiner tous les sols
     collection = Poly3DCollection(sols, alpha=0.5, facecolor=couleur, edgecolor='darkgray')
@@ -233,12 +166,9 @@ def menu_principal():
             print("Choix invalide! Veuillez entrer 1 ou 2.")
 
 if __name__ == "__main__":
-    # Vérifier que matplotlib est disponible
-    try:
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import Axes3D
-        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-        menu_principal()
-    except ImportError:
+    # Vérifier que matplotlib est disponible, sans l'importer avant le premier dessin
+    if importlib.util.find_spec("matplotlib") is None:
         print("Erreur: matplotlib n'est pas installé!")
-        print("Installez-le avec: pip install matplotlib")
\ No newline at end of file
+        print("Installez-le avec: pip install matplotlib")
+    else:
+        menu_principal()
@@ -1,12 +1,15 @@
+import importlib.util
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from empreinte import polygone_croix
+from rendu_contours import dessiner_contour_prisme
 
 def creer_plan_3d():
     """
     Génère une version 3D du plan architectural en forme de croix
     """
+    import matplotlib.pyplot as plt
+
     print("=== Générateur de Plan 3D ===")
     
     # Saisie des paramètres
@@ -26,6 +29,16 @@ def creer_plan_3d():
         print("Erreur: Veuillez entrer des nombres valides!")
         return
     
+    # Construction de la scène puis affichage
+    construire_figure_plan_3d(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
+    plt.show()
+
+def construire_figure_plan_3d(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur):
+    """
+    Construit la figure du plan 3D sans l'afficher
+    """
+    import matplotlib.pyplot as plt
+
     # Création de la figure 3D
     fig = plt.figure(figsize=(15, 12))
     ax = fig.add_subplot(111, projection='3d')
@@ -49,8 +62,8 @@ def creer_plan_3d():
     # Améliorer la vue
     ax.view_init(elev=30, azim=45)
     
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return fig
 
 def generer_structure_croix(ax, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur):
     """
@@ -72,83 +85,10 @@ def dessiner_contour_croix(ax, centre_x, centre_y, largeur_centrale, longueur_ce
     """
     Dessine uniquement le contour extérieur de la forme en croix (plan vide à l'intérieur)
     """
-    # Définir tous les points du contour extérieur de la croix
-    # En partant du coin inférieur gauche et en tournant dans le sens horaire
-    
-    # Points de base (z=0) du contour extérieur
-    points_base = []
-    
-    # Partir du coin inférieur gauche du bras gauche
-    x_start = centre_x - largeur_centrale/2 - longueur_bras
-    y_start = centre_y - largeur_bras/2
-    
-    # Contour extérieur de la croix (base z=0)
-    points_base = [
-        # Bras gauche - partie basse
-        [x_start, y_start, 0],
-        [x_start + longueur_bras, y_start, 0],
-        
-        # Partie centrale - côté gauche bas
-        [centre_x - largeur_centrale/2, y_start, 0],
-        [centre_x - largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        
-        # Bras bas
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2, 0],
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2, 0],
-        
-        # Partie centrale - côté droit bas
-        [centre_x + largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        [centre_x + largeur_centrale/2, y_start, 0],
-        
-        # Bras droit - partie basse
-        [centre_x + largeur_centrale/2 + longueur_bras, y_start, 0],
-        [centre_x + largeur_centrale/2 + longueur_bras, y_start + largeur_bras, 0],
-        
-        # Bras droit - partie haute
-        [centre_x + largeur_centrale/2, y_start + largeur_bras, 0],
-        [centre_x + largeur_centrale/2, centre_y + longueur_centrale/2, 0],
-        
-        # Bras haut
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        
-        # Partie centrale - côté gauche haut
-        [centre_x - largeur_centrale/2, centre_y + longueur_centrale/2, 0],
-        [centre_x - largeur_centrale/2, y_start + largeur_bras, 0],
-        
-        # Retour au point de départ
-        [x_start, y_start + largeur_bras, 0]
-    ]
-    
-    # Créer les points du sommet (même contour mais à z=hauteur)
-    points_sommet = [[p[0], p[1], hauteur] for p in points_base]
-    
-    # Dessiner le contour de base (z=0)
-    for i in range(len(points_base)):
-        j = (i + 1) % len(points_base)
-        ax.plot3D([points_base[i][0], points_base[j][0]], 
-                  [points_base[i][1], points_base[j][1]], 
-                  [points_base[i][2], points_base[j][2]], 
-                  color='black', linewidth=2)
-    
-    # Dessiner le contour du sommet (z=hauteur)
-    for i in range(len(points_sommet)):
-        j = (i + 1) % len(points_sommet)
-        ax.plot3D([points_sommet[i][0], points_sommet[j][0]], 
-                  [points_sommet[i][1], points_sommet[j][1]], 
-                  [points_sommet[i][2], points_sommet[j][2]], 
-                  color='black', linewidth=2)
-    
-    # Dessiner les arêtes verticales
-    for i in range(len(points_base)):
-        ax.plot3D([points_base[i][0], points_sommet[i][0]], 
-                  [points_base[i][1], points_sommet[i][1]], 
-                  [points_base[i][2], points_sommet[i][2]], 
-                  color='black', linewidth=2)
+    # Contour extérieur de la croix, en partant du coin inférieur gauche du bras gauche
+    polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras,
+                              centre=(centre_x, centre_y))
+    dessiner_contour_prisme(ax, polygone, hauteur)
 
 def menu_principal():
     """
@@ -172,12 +112,9 @@ def menu_principal():
             print("Choix invalide! Veuillez entrer 1 ou 2.")
 
 if __name__ == "__main__":
-    # Vérifier que matplotlib est disponible
-    try:
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import Axes3D
-        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-        menu_principal()
-    except ImportError:
+    # Vérifier que matplotlib est disponible, sans l'importer avant le premier dessin
+    if importlib.util.find_spec("matplotlib") is None:
         print("Erreur: matplotlib n'est pas installé!")
-        print("Installez-le avec: pip install matplotlib")
\ No newline at end of file
+        print("Installez-le avec: pip install matplotlib")
+    else:
+        menu_principal()
@@ -1,50 +1,129 @@
+import importlib.util
+import math
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+from cache_dispositions import disposition_en_cache
+from disposition import DispositionSpheres
+from empilement_aleatoire import (DISPERSION, LOI_RAYONS, LOIS_RAYONS, MODE_ALEATOIRE, MODE_POLYDISPERSE,
+                                  MODES_DISPOSITION, generer_centres_aleatoires, remplir_polydisperse)
+from empreinte import polygone_croix
+from geometrie import calculer_volume_croix, decomposer_croix
+from instrumentation import compter, phase, rendre_figure, session_instrumentation
+from rendu_contours import dessiner_contour_prisme
+from rendu_spheres import dessiner_spheres_lod
+from reseau_spheres import MODES_EMPILEMENT, TAILLE_BLOC, calculer_nombre_par_axe, generer_centres_boite, generer_centres_grille, iterer_centres_regions
+from solveur_rayon import afficher_solutions, resoudre_croix, saisir_objectifs
+from statistiques import afficher_statistiques, statistiques_croix, statistiques_disposition
+from validation import afficher_rapport, valider_disposition
 
+@session_instrumentation()
 def creer_plan_croix_avec_spheres():
     """
     Génère un plan 3D en forme de croix rempli de sphères
     """
+    import matplotlib.pyplot as plt
+    
     print("=== Générateur de Plan en Croix avec Sphères ===")
     
-    # Saisie des paramètres
-    try:
-        # Dimensions de la structure en croix
-        largeur_centrale = float(input("Entrez la largeur de la partie centrale: "))
-        longueur_centrale = float(input("Entrez la longueur de la partie centrale: "))
-        largeur_bras = float(input("Entrez la largeur des bras de la croix: "))
-        longueur_bras = float(input("Entrez la longueur des bras de la croix: "))
-        hauteur = float(input("Entrez la hauteur du bâtiment: "))
-        rayon_sphere = float(input("Entrez le rayon des sphères: "))
+    with phase("saisie"):
+        # Saisie des paramètres
+        try:
+            # Dimensions de la structure en croix
+            largeur_centrale = float(input("Entrez la largeur de la partie centrale: "))
+            longueur_centrale = float(input("Entrez la longueur de la partie centrale: "))
+            largeur_bras = float(input("Entrez la largeur des bras de la croix: "))
+            longueur_bras = float(input("Entrez la longueur des bras de la croix: "))
+            hauteur = float(input("Entrez la hauteur du bâtiment: "))
+            rayon_sphere = float(input("Entrez le rayon des sphères: "))
+            mode = input("Mode d'empilement (cubique/cfc/hc/aleatoire/polydisperse) [cubique]: ").strip().lower() or "cubique"
+            
+            if mode not in MODES_DISPOSITION:
+                print("Erreur: Mode d'empilement inconnu!")
+                return
+            
+            graine, loi, dispersion = None, LOI_RAYONS, DISPERSION
+            if mode == MODE_POLYDISPERSE:
+                loi = input(f"Loi des rayons ({'/'.join(LOIS_RAYONS)}) [{LOI_RAYONS}]: ").strip().lower() or LOI_RAYONS
+                saisie = input(f"Dispersion relative des rayons [{DISPERSION}]: ").strip()
+                dispersion = float(saisie) if saisie else DISPERSION
+                
+                if loi not in LOIS_RAYONS:
+                    print("Erreur: Loi des rayons inconnue!")
+                    return
+            if mode in (MODE_ALEATOIRE, MODE_POLYDISPERSE):
+                saisie = input("Graine du tirage (vide = tirage libre): ").strip()
+                graine = int(saisie) if saisie else None
+            
+            valeurs = [largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere]
+            if not all(math.isfinite(val) for val in valeurs + [dispersion]):
+                print("Erreur: Toutes les valeurs doivent être des nombres finis!")
+                return
+            if any(val <= 0 for val in valeurs) or dispersion < 0:
+                print("Erreur: Toutes les valeurs doivent être positives!")
+                return
         
-        if any(val <= 0 for val in [largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere]):
-            print("Erreur: Toutes les valeurs doivent être positives!")
+        except ValueError:
+            print("Erreur: Veuillez entrer des nombres valides!")
             return
-            
-    except ValueError:
-        print("Erreur: Veuillez entrer des nombres valides!")
-        return
+    
+    # Statistiques analytiques, sans attendre le rendu de la scène
+    # (en mode aléatoire ou polydisperse, elles ne sont connues qu'après le tirage)
+    if mode in MODES_EMPILEMENT:
+        with phase("statistiques"):
+            stats = statistiques_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode)
+        afficher_statistiques(stats, "Volume de la structure en croix")
+    
+    # Construction de la scène puis affichage
+    with phase("construction"):
+        fig = construire_figure_croix_avec_spheres(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode, graine,
+                                                    loi=loi, dispersion=dispersion)
+    rendre_figure(fig)
+    with phase("affichage"):
+        plt.show()
+
+def construire_figure_croix_avec_spheres(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique", graine=None, nombre=None,
+                                         rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION):
+    """
+    Construit la figure du plan en croix rempli de sphères, sans l'afficher
+
+    En mode aléatoire, graine rend le tirage reproductible et nombre borne
+    le nombre de sphères (saturation par défaut). En mode polydisperse, les
+    rayons sont donnés (rayons) ou tirés selon loi autour de rayon_sphere.
+    """
+    import matplotlib.pyplot as plt
     
     # Création de la figure 3D
     fig = plt.figure(figsize=(15, 12))
     ax = fig.add_subplot(111, projection='3d')
     
-    # Générer la structure avec sphères
-    centres_x, centres_y, centres_z = generer_spheres_dans_croix(
-        largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere)
+    # Générer la structure avec sphères (ou la relire depuis le cache)
+    disposition = disposition_croix_en_cache(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur,
+                                             rayon_sphere, mode, graine, nombre, rayons, loi, dispersion)
+    compter("spheres", len(disposition))
+    
+    if mode not in MODES_EMPILEMENT:
+        volume_croix = calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
+        afficher_statistiques(statistiques_disposition(disposition.centres, disposition.rayon, volume_croix, mode, "Croix"),
+                              "Volume de la structure en croix")
+    
+    # Vérifier l'absence de chevauchement, y compris aux jonctions centre/bras
+    polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    with phase("validation"):
+        afficher_rapport(valider_disposition(disposition, disposition.rayon, polygone, hauteur))
     
     # Dessiner le contour de la croix
-    dessiner_contour_croix_3d(ax, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
+    with phase("dessin_contour"):
+        dessiner_contour_croix_3d(ax, largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
     
     # Dessiner les sphères
-    dessiner_spheres(ax, centres_x, centres_y, centres_z, rayon_sphere)
+    with phase("dessin_spheres"):
+        dessiner_spheres(ax, disposition)
     
     # Configuration de l'affichage
     ax.set_xlabel('X (Largeur)')
     ax.set_ylabel('Y (Longueur)')
     ax.set_zlabel('Z (Hauteur)')
-    ax.set_title(f'Plan en Croix avec {len(centres_x)} sphères (r={rayon_sphere})')
+    ax.set_title(f'Plan en Croix avec {len(disposition)} sphères (r={rayon_sphere})')
     
     # Égaliser les échelles des axes
     largeur_totale = largeur_centrale + 2 * longueur_bras
@@ -57,109 +136,110 @@ def creer_plan_croix_avec_spheres():
     # Améliorer la vue
     ax.view_init(elev=30, azim=45)
     
-    # Statistiques
-    volume_croix = calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
-    volume_sphere = (4/3) * np.pi * rayon_sphere**3
-    volume_total_spheres = len(centres_x) * volume_sphere
-    taux_remplissage = (volume_total_spheres / volume_croix) * 100
-    
-    print(f"\n=== Statistiques ===")
-    print(f"Volume de la structure en croix: {volume_croix:.2f}")
-    print(f"Volume d'une sphère: {volume_sphere:.2f}")
-    print(f"Volume total des sphères: {volume_total_spheres:.2f}")
-    print(f"Taux de remplissage: {taux_remplissage:.1f}%")
-    
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    return fig
 
-def generer_spheres_dans_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere):
+def disposition_croix_en_cache(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique", graine=None, nombre=None,
+                               rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION):
     """
-    Génère les positions des sphères dans les différentes parties de la croix
+    Retourne la disposition des sphères de la croix, depuis le cache si possible
     """
-    centres_x = []
-    centres_y = []
-    centres_z = []
-    
-    # Calcul des dimensions totales
-    largeur_totale = largeur_centrale + 2 * longueur_bras
-    longueur_totale = longueur_centrale + 2 * longueur_bras
-    
-    # Centre de la structure
-    centre_x = largeur_totale / 2
-    centre_y = longueur_totale / 2
+    parametres = {"largeur_centrale": largeur_centrale, "longueur_centrale": longueur_centrale,
+                  "largeur_bras": largeur_bras, "longueur_bras": longueur_bras,
+                  "hauteur": hauteur, "rayon": rayon_sphere, "mode": mode}
+    if mode == MODE_ALEATOIRE:
+        parametres.update(graine=graine, nombre=nombre)
+    elif mode == MODE_POLYDISPERSE:
+        parametres.update(graine=graine, loi=loi, dispersion=dispersion,
+                          rayons=None if rayons is None else np.asarray(rayons, dtype=float).tolist())
+    
+    def generer():
+        disposition = generer_disposition_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur,
+                                                rayon_sphere, mode, graine, nombre, rayons, loi, dispersion)
+        # En mode polydisperse, centres et rayons sont mis en cache ensemble, dans un tableau (N, 4)
+        if mode == MODE_POLYDISPERSE:
+            return np.column_stack([disposition.centres, disposition.rayon])
+        return disposition.centres
+    
+    with phase("generation_centres"):
+        # Un tirage sans graine n'est pas reproductible : inutile de le garder en cache
+        if mode not in MODES_EMPILEMENT and graine is None:
+            centres = generer()
+        else:
+            centres = disposition_en_cache("croix", parametres, generer)
+    if mode == MODE_POLYDISPERSE:
+        return DispositionSpheres(centres[:, :3], centres[:, 3])
+    return DispositionSpheres(centres, rayon_sphere)
+
+def generer_disposition_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique", graine=None, nombre=None,
+                              rayons=None, loi=LOI_RAYONS, dispersion=DISPERSION):
+    """
+    Génère la disposition des sphères de la croix, avec le numéro de la
+    partie (centre, bras) de chaque sphère
+
+    En mode aléatoire ou polydisperse, la croix est remplie d'un seul tenant
+    (sans parties), jonctions comprises.
+    """
+    if mode in (MODE_ALEATOIRE, MODE_POLYDISPERSE):
+        polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+        if mode == MODE_ALEATOIRE:
+            disposition = DispositionSpheres(generer_centres_aleatoires(polygone, hauteur, rayon_sphere, nombre, graine=graine),
+                                             rayon_sphere)
+        else:
+            disposition = DispositionSpheres(*remplir_polydisperse(polygone, hauteur, rayon_sphere, rayons, loi, dispersion, graine))
+        print(f"Nombre total de sphères générées: {len(disposition)}")
+        return disposition
     
     diametre = 2 * rayon_sphere
+    parties = decomposer_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
     
-    # 1. PARTIE CENTRALE
-    centres_partie = generer_spheres_rectangle(
-        centre_x - largeur_centrale/2, centre_y - longueur_centrale/2,
-        largeur_centrale, longueur_centrale, hauteur, diametre
-    )
-    centres_x.extend([c[0] for c in centres_partie])
-    centres_y.extend([c[1] for c in centres_partie])
-    centres_z.extend([c[2] for c in centres_partie])
-    
-    # 2. BRAS GAUCHE
-    centres_bras = generer_spheres_rectangle(
-        centre_x - largeur_centrale/2 - longueur_bras, centre_y - largeur_bras/2,
-        longueur_bras, largeur_bras, hauteur, diametre
-    )
-    centres_x.extend([c[0] for c in centres_bras])
-    centres_y.extend([c[1] for c in centres_bras])
-    centres_z.extend([c[2] for c in centres_bras])
-    
-    # 3. BRAS DROIT
-    centres_bras = generer_spheres_rectangle(
-        centre_x + largeur_centrale/2, centre_y - largeur_bras/2,
-        longueur_bras, largeur_bras, hauteur, diametre
-    )
-    centres_x.extend([c[0] for c in centres_bras])
-    centres_y.extend([c[1] for c in centres_bras])
-    centres_z.extend([c[2] for c in centres_bras])
-    
-    # 4. BRAS HAUT
-    centres_bras = generer_spheres_rectangle(
-        centre_x - largeur_bras/2, centre_y + longueur_centrale/2,
-        largeur_bras, longueur_bras, hauteur, diametre
-    )
-    centres_x.extend([c[0] for c in centres_bras])
-    centres_y.extend([c[1] for c in centres_bras])
-    centres_z.extend([c[2] for c in centres_bras])
+    # Partie centrale puis les quatre bras (gauche, droit, haut, bas)
+    blocs = [
+        generer_spheres_rectangle(x, y, largeur, longueur, hauteur, diametre, mode)
+        for _, x, y, largeur, longueur in parties
+    ]
     
-    # 5. BRAS BAS
-    centres_bras = generer_spheres_rectangle(
-        centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras,
-        largeur_bras, longueur_bras, hauteur, diametre
-    )
-    centres_x.extend([c[0] for c in centres_bras])
-    centres_y.extend([c[1] for c in centres_bras])
-    centres_z.extend([c[2] for c in centres_bras])
+    # Assemblage des cinq blocs en un seul tableau contigu
+    disposition = DispositionSpheres.depuis_blocs(blocs, rayon_sphere, [nom for nom, *_ in parties])
     
-    print(f"Nombre total de sphères générées: {len(centres_x)}")
+    print(f"Nombre total de sphères générées: {len(disposition)}")
     
-    return centres_x, centres_y, centres_z
+    return disposition
+
+def generer_spheres_dans_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique", graine=None):
+    """
+    Génère les positions des sphères dans les différentes parties de la croix
+
+    Retourne des vues (centres_x, centres_y, centres_z) sur un seul tableau.
+    """
+    return generer_disposition_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras,
+                                     hauteur, rayon_sphere, mode, graine).colonnes()
+
+def iterer_spheres_dans_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique", taille_bloc=TAILLE_BLOC):
+    """
+    Génère les positions des sphères de la croix par blocs (n, 3), par
+    tranches de z puis par partie de la croix, avec une mémoire bornée
+    """
+    regions = [(x, y, largeur, longueur) for _, x, y, largeur, longueur in decomposer_croix(
+        largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)]
+    return iterer_centres_regions(regions, hauteur, 2 * rayon_sphere, mode, taille_bloc=taille_bloc)
 
-def generer_spheres_rectangle(x_start, y_start, largeur, longueur, hauteur, diametre):
+def generer_spheres_rectangle(x_start, y_start, largeur, longueur, hauteur, diametre, mode="cubique"):
     """
     Génère les positions des sphères dans un rectangle donné
     """
-    centres = []
-    
-    # Calcul du nombre de sphères par dimension
-    nx = max(1, int(largeur / diametre))
-    ny = max(1, int(longueur / diametre))
-    nz = max(1, int(hauteur / diametre))
-    
-    print(f"Rectangle ({largeur:.1f}x{longueur:.1f}x{hauteur:.1f}): {nx}x{ny}x{nz} = {nx*ny*nz} sphères")
+    if mode == "cubique":
+        # Calcul du nombre de sphères par dimension
+        nx, ny, nz = calculer_nombre_par_axe(largeur, longueur, hauteur, diametre)
+        
+        print(f"Rectangle ({largeur:.1f}x{longueur:.1f}x{hauteur:.1f}): {nx}x{ny}x{nz} = {nx*ny*nz} sphères")
+        
+        # Génération des positions centrées dans chaque sous-volume, tableau (N, 3)
+        return generer_centres_grille(x_start, y_start, 0, largeur, longueur, hauteur, nx, ny, nz)
     
-    # Génération des positions centrées dans chaque sous-volume
-    for i in range(nx):
-        for j in range(ny):
-            for k in range(nz):
-                x = x_start + (i + 0.5) * (largeur / nx)
-                y = y_start + (j + 0.5) * (longueur / ny)
-                z = (k + 0.5) * (hauteur / nz)
-                centres.append([x, y, z])
+    # Réseau compact découpé aux limites du rectangle
+    centres = generer_centres_boite(x_start, y_start, largeur, longueur, hauteur, diametre, mode=mode)
+    print(f"Rectangle ({largeur:.1f}x{longueur:.1f}x{hauteur:.1f}): {len(centres)} sphères (empilement {mode})")
     
     return centres
 
@@ -167,128 +247,62 @@ def dessiner_contour_croix_3d(ax, largeur_centrale, longueur_centrale, largeur_b
     """
     Dessine le contour 3D de la structure en croix
     """
-    # Calcul des dimensions totales
-    largeur_totale = largeur_centrale + 2 * longueur_bras
-    longueur_totale = longueur_centrale + 2 * longueur_bras
-    
-    # Centre de la structure
-    centre_x = largeur_totale / 2
-    centre_y = longueur_totale / 2
-    
-    # Définir tous les points du contour extérieur de la croix
-    x_start = centre_x - largeur_centrale/2 - longueur_bras
-    y_start = centre_y - largeur_bras/2
-    
-    # Points de base (z=0) du contour extérieur
-    points_base = [
-        # Bras gauche - partie basse
-        [x_start, y_start, 0],
-        [x_start + longueur_bras, y_start, 0],
-        
-        # Partie centrale - côté gauche bas
-        [centre_x - largeur_centrale/2, y_start, 0],
-        [centre_x - largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        
-        # Bras bas
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2, 0],
-        [centre_x - largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2 - longueur_bras, 0],
-        [centre_x + largeur_bras/2, centre_y - longueur_centrale/2, 0],
-        
-        # Partie centrale - côté droit bas
-        [centre_x + largeur_centrale/2, centre_y - longueur_centrale/2, 0],
-        [centre_x + largeur_centrale/2, y_start, 0],
-        
-        # Bras droit - partie basse
-        [centre_x + largeur_centrale/2 + longueur_bras, y_start, 0],
-        [centre_x + largeur_centrale/2 + longueur_bras, y_start + largeur_bras, 0],
-        
-        # Bras droit - partie haute
-        [centre_x + largeur_centrale/2, y_start + largeur_bras, 0],
-        [centre_x + largeur_centrale/2, centre_y + longueur_centrale/2, 0],
-        
-        # Bras haut
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        [centre_x + largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2 + longueur_bras, 0],
-        [centre_x - largeur_bras/2, centre_y + longueur_centrale/2, 0],
-        
-        # Partie centrale - côté gauche haut
-        [centre_x - largeur_centrale/2, centre_y + longueur_centrale/2, 0],
-        [centre_x - largeur_centrale/2, y_start + largeur_bras, 0],
-        
-        # Retour au point de départ
-        [x_start, y_start + largeur_bras, 0]
-    ]
-    
-    # Créer les points du sommet (même contour mais à z=hauteur)
-    points_sommet = [[p[0], p[1], hauteur] for p in points_base]
-    
-    # Dessiner le contour de base (z=0)
-    for i in range(len(points_base)):
-        j = (i + 1) % len(points_base)
-        ax.plot3D([points_base[i][0], points_base[j][0]], 
-                  [points_base[i][1], points_base[j][1]], 
-                  [points_base[i][2], points_base[j][2]], 
-                  color='black', linewidth=2)
-    
-    # Dessiner le contour du sommet (z=hauteur)
-    for i in range(len(points_sommet)):
-        j = (i + 1) % len(points_sommet)
-        ax.plot3D([points_sommet[i][0], points_sommet[j][0]], 
-                  [points_sommet[i][1], points_sommet[j][1]], 
-                  [points_sommet[i][2], points_sommet[j][2]], 
-                  color='black', linewidth=2)
-    
-    # Dessiner les arêtes verticales
-    for i in range(len(points_base)):
-        ax.plot3D([points_base[i][0], points_sommet[i][0]], 
-                  [points_base[i][1], points_sommet[i][1]], 
-                  [points_base[i][2], points_sommet[i][2]], 
-                  color='black', linewidth=2)
+    # Contour extérieur de la croix, extrudé de z=0 à z=hauteur
+    polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    dessiner_contour_prisme(ax, polygone, hauteur)
 
-def dessiner_spheres(ax, centres_x, centres_y, centres_z, rayon):
+def dessiner_spheres(ax, disposition):
     """
-    Dessine les sphères dans le repère 3D
+    Dessine les sphères d'une disposition dans le repère 3D
     """
-    # Créer une sphère unitaire
-    u = np.linspace(0, 2 * np.pi, 15)
-    v = np.linspace(0, np.pi, 10)
-    x_sphere = np.outer(np.cos(u), np.sin(v))
-    y_sphere = np.outer(np.sin(u), np.sin(v))
-    z_sphere = np.outer(np.ones(np.size(u)), np.cos(v))
-    
-    # Dessiner chaque sphère avec une couleur basée sur la hauteur
-    z_min, z_max = min(centres_z), max(centres_z)
-    
-    for i, (cx, cy, cz) in enumerate(zip(centres_x, centres_y, centres_z)):
-        # Adapter la taille et la position de la sphère
-        x = rayon * x_sphere + cx
-        y = rayon * y_sphere + cy
-        z = rayon * z_sphere + cz
-        
-        # Couleur basée sur la hauteur
+    # Couleur portée par la disposition, ou basée sur la hauteur
+    valeurs_couleur = disposition.valeurs
+    if valeurs_couleur is None:
+        z = disposition.z
+        z_min, z_max = z.min(), z.max()
         if z_max > z_min:
-            color_intensity = (cz - z_min) / (z_max - z_min)
+            valeurs_couleur = (z - z_min) / (z_max - z_min)
         else:
-            color_intensity = 0.5
-        
-        color = plt.cm.viridis(color_intensity)
-        
-        # Dessiner la sphère
-        ax.plot_surface(x, y, z, color=color, alpha=0.7, linewidth=0)
+            valeurs_couleur = np.full(len(disposition), 0.5)
+    
+    # Niveau de détail adapté au nombre de sphères et à leur taille à l'écran
+    dessiner_spheres_lod(ax, disposition.centres, disposition.rayon, valeurs_couleur)
 
-def calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur):
+def rechercher_rayon_croix():
     """
-    Calcule le volume total de la structure en croix
+    Cherche le rayon et le mode d'empilement qui atteignent un objectif de
+    remplissage, sans générer ni afficher la scène
     """
-    # Volume de la partie centrale
-    volume_central = largeur_centrale * longueur_centrale * hauteur
+    print("=== Recherche du Rayon des Sphères ===")
     
-    # Volume des 4 bras
-    volume_bras = 4 * (longueur_bras * largeur_bras * hauteur)
+    try:
+        largeur_centrale = float(input("Entrez la largeur de la partie centrale: "))
+        longueur_centrale = float(input("Entrez la longueur de la partie centrale: "))
+        largeur_bras = float(input("Entrez la largeur des bras de la croix: "))
+        longueur_bras = float(input("Entrez la longueur des bras de la croix: "))
+        hauteur = float(input("Entrez la hauteur du bâtiment: "))
+        taux, nombre, jeu = saisir_objectifs()
+    except ValueError:
+        print("Erreur: Veuillez entrer des nombres valides!")
+        return
+    
+    valeurs = [largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur]
+    if not all(math.isfinite(val) for val in valeurs):
+        print("Erreur: Toutes les valeurs doivent être des nombres finis!")
+        return
+    if any(val <= 0 for val in valeurs):
+        print("Erreur: Toutes les valeurs doivent être positives!")
+        return
     
-    return volume_central + volume_bras
+    try:
+        with phase("recherche"):
+            resultat = resoudre_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur,
+                                      taux, nombre, jeu)
+    except ValueError as erreur:
+        print(f"Erreur: {erreur}")
+        return
+    
+    afficher_solutions(resultat)
 
 def menu_principal():
     """
@@ -299,24 +313,30 @@ def menu_principal():
         print("    GÉNÉRATEUR DE PLAN EN CROIX AVEC SPHÈRES")
         print("="*60)
         print("1. Générer un plan en croix rempli de sphères")
-        print("2. Quitter")
+        print("2. Explorer le plan en croix avec des curseurs")
+        print("3. Rechercher le rayon pour un objectif de remplissage")
+        print("4. Quitter")
         
-        choix = input("\nVotre choix (1-2): ").strip()
+        choix = input("\nVotre choix (1-4): ").strip()
         
         if choix == "1":
             creer_plan_croix_avec_spheres()
         elif choix == "2":
+            # Import différé : le module interactif dépend de celui-ci
+            from plan_croix_interactif import explorer_plan_croix
+            explorer_plan_croix()
+        elif choix == "3":
+            rechercher_rayon_croix()
+        elif choix == "4":
             print("Au revoir!")
             break
         else:
-            print("Choix invalide! Veuillez entrer 1 ou 2.")
+            print("Choix invalide! Veuillez entrer 1, 2, 3 ou 4.")
 
 if __name__ == "__main__":
-    # Vérifier que matplotlib est disponible
-    try:
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import Axes3D
-        menu_principal()
-    except ImportError:
+    # Vérifier que matplotlib est disponible, sans l'importer avant le premier dessin
+    if importlib.util.find_spec("matplotlib") is None:
         print("Erreur: matplotlib n'est pas installé!")
         print("Installez-le avec: pip install matplotlib")
+    else:
+        menu_principal()
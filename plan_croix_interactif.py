@@ -0,0 +1,402 @@
+import contextlib
+import io
+import math
+
+import numpy as np
+
+from empilement_aleatoire import MODES_DISPOSITION
+from empreinte import aire_polygone, aretes_prisme, points_dans_polygone_epars, points_loin_des_aretes, polygone_croix
+from geometrie import calculer_dimensions_croix, calculer_volume_croix, decomposer_croix
+from instrumentation import compter, phase
+from plan_croix_avec_spheres import generer_disposition_croix
+from rendu_contours import dessiner_aretes
+from rendu_spheres import choisir_niveau_detail, couleurs_facettes, estimer_rayon_ecran, facettes_spheres
+from reseau_spheres import MODES_EMPILEMENT, generer_centres_boite
+from statistiques import statistiques_croix, statistiques_disposition, volume_sphere
+
+# Délai (ms) pendant lequel les mouvements des curseurs sont regroupés avant un rafraîchissement
+DELAI_RAFRAICHISSEMENT = 80
+
+# Délai (ms) sans mouvement des curseurs après lequel toutes les sphères
+# dessinées en marqueurs sont réaffichées (comme au relâchement du bouton)
+DELAI_AFFICHAGE_COMPLET = 400
+
+# Budget de facettes réduit : le dessin de la scène doit rester bien sous la seconde
+BUDGET_FACETTES_INTERACTIF = 20000
+
+# Nombre de marqueurs dessinés pendant un glissement de curseur : au-delà,
+# seule une sphère sur deux, trois, ... est montrée jusqu'au relâchement
+MARQUEURS_APERCU = BUDGET_FACETTES_INTERACTIF
+
+# Nombre maximal de marqueurs dessinés une fois le curseur relâché (le dessin
+# coûte de l'ordre de 10 µs par marqueur) ; le titre donne le nombre réel
+MARQUEURS_MAX = 2 * MARQUEURS_APERCU
+
+# Compacité attendue des modes aléatoire et polydisperse, pour leurs aperçus
+COMPACITE_ALEATOIRE = 0.38
+
+# Au-delà de ce nombre de sphères attendues, les modes aléatoire et
+# polydisperse (plusieurs secondes de tirage) restent en aperçu
+NOMBRE_MAX_ALEATOIRE = 3000
+
+# Paramètres de départ de l'exploration
+PARAMETRES_INITIAUX = {"largeur_centrale": 10.0, "longueur_centrale": 8.0, "largeur_bras": 4.0,
+                       "longueur_bras": 6.0, "hauteur": 5.0, "rayon_sphere": 0.5}
+
+# Curseurs : paramètre -> libellé ; chaque curseur va de 20 % à 300 % de sa valeur de départ
+CURSEURS = {
+    "largeur_centrale": "Largeur centrale",
+    "longueur_centrale": "Longueur centrale",
+    "largeur_bras": "Largeur des bras",
+    "longueur_bras": "Longueur des bras",
+    "hauteur": "Hauteur",
+    "rayon_sphere": "Rayon des sphères",
+}
+
+class SceneCroixInteractive:
+    """
+    Scène du plan en croix avec sphères, mise à jour sur place
+
+    Le contour est une seule Line3DCollection dont les segments sont
+    remplacés. Les sphères de chaque partie de la croix (centre, bras)
+    forment un artiste séparé : une partie dont la forme n'a pas changé
+    n'est pas régénérée, seulement translatée si son origine a bougé. En
+    mode aléatoire ou polydisperse, la croix forme une seule partie.
+
+    En aperçu, les parties dessinées en marqueurs n'en montrent qu'environ
+    MARQUEURS_APERCU en tout, et les modes aléatoire et polydisperse ne sont
+    pas tirés : des centres uniformes à la densité attendue en tiennent lieu.
+    afficher_tout affiche ensuite jusqu'à MARQUEURS_MAX marqueurs et tire le
+    remplissage s'il compte au plus NOMBRE_MAX_ALEATOIRE sphères.
+    """
+
+    def __init__(self, ax, parametres, mode="cubique", graine=0, budget_facettes=BUDGET_FACETTES_INTERACTIF):
+        self.ax = ax
+        self.parametres = dict(parametres)
+        self.mode = mode
+        self.graine = graine
+        self.budget_facettes = budget_facettes
+        self.contour = None
+        self.parties = {}
+        self.etendue = None
+        self.mettre_a_jour()
+
+    def decouper(self, apercu=False):
+        """
+        Retourne les parties à remplir : (nom, x, y, clé de forme, fonction de génération)
+
+        La fonction de génération retourne les centres (N, 3) et les rayons,
+        relatifs à l'origine (x, y) de la partie. La clé de forme d'un aperçu
+        commence par "apercu".
+        """
+        p = self.parametres
+        if self.mode not in MODES_EMPILEMENT:
+            forme = (self.mode, self.graine) + tuple(sorted(p.items()))
+            if apercu or self.nombre_aleatoire() > NOMBRE_MAX_ALEATOIRE:
+                return [("Croix", 0.0, 0.0, ("apercu",) + forme, self.generer_apercu)]
+            
+            def generer():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    disposition = generer_disposition_croix(p["largeur_centrale"], p["longueur_centrale"], p["largeur_bras"],
+                                                            p["longueur_bras"], p["hauteur"], p["rayon_sphere"],
+                                                            self.mode, self.graine)
+                return disposition.centres, disposition.rayon
+            return [("Croix", 0.0, 0.0, forme, generer)]
+        
+        parties = []
+        for nom, x, y, largeur, longueur in decomposer_croix(p["largeur_centrale"], p["longueur_centrale"],
+                                                             p["largeur_bras"], p["longueur_bras"]):
+            forme = (self.mode, largeur, longueur, p["hauteur"], p["rayon_sphere"])
+            generer = lambda largeur=largeur, longueur=longueur: (
+                generer_centres_boite(0, 0, largeur, longueur, p["hauteur"], 2 * p["rayon_sphere"], mode=self.mode),
+                p["rayon_sphere"])
+            parties.append((nom, x, y, forme, generer))
+        return parties
+
+    def nombre_aleatoire(self):
+        """
+        Nombre de sphères attendu d'un remplissage aléatoire de la croix
+        """
+        p = self.parametres
+        volume = calculer_volume_croix(p["largeur_centrale"], p["longueur_centrale"], p["largeur_bras"],
+                                       p["longueur_bras"], p["hauteur"])
+        return int(COMPACITE_ALEATOIRE * volume / volume_sphere(p["rayon_sphere"]))
+
+    def generer_apercu(self):
+        """
+        Aperçu d'un remplissage aléatoire : centres (N, 3) tirés uniformément
+        dans le prisme de la croix, sans test de chevauchement, à la densité
+        attendue et au plus MARQUEURS_APERCU
+        """
+        p = self.parametres
+        rayon = p["rayon_sphere"]
+        polygone = polygone_croix(p["largeur_centrale"], p["longueur_centrale"], p["largeur_bras"], p["longueur_bras"])
+        nombre = min(self.nombre_aleatoire(), MARQUEURS_APERCU)
+        if nombre == 0 or p["hauteur"] < 2 * rayon:
+            return np.empty((0, 3)), rayon
+        
+        # Tirage dans la boîte englobante, en surnombre pour compenser les
+        # points hors de l'empreinte
+        bas, haut = polygone.min(axis=0), polygone.max(axis=0)
+        surplus = 1.5 * np.prod(haut - bas) / aire_polygone(polygone)
+        generateur = np.random.default_rng(self.graine)
+        plan = generateur.uniform(bas, haut, (int(nombre * surplus) + 1, 2))
+        plan = plan[points_dans_polygone_epars(polygone, plan)]
+        plan = plan[points_loin_des_aretes(polygone, plan, rayon)][:nombre]
+        return np.column_stack([plan, generateur.uniform(rayon, p["hauteur"] - rayon, len(plan))]), rayon
+
+    def statistiques(self):
+        """
+        Statistiques de la scène : analytiques pour les réseaux, sur les sphères dessinées sinon
+        """
+        p = self.parametres
+        if self.mode in MODES_EMPILEMENT:
+            return statistiques_croix(**p, mode=self.mode)
+        
+        centres, rayons = self.parties["Croix"]["centres"], self.parties["Croix"]["rayons"]
+        volume = calculer_volume_croix(p["largeur_centrale"], p["longueur_centrale"], p["largeur_bras"],
+                                       p["longueur_bras"], p["hauteur"])
+        return statistiques_disposition(centres, rayons, volume, self.mode, "Croix")
+
+    def mettre_a_jour(self, mode=None, apercu=False, **parametres):
+        """
+        Applique des paramètres modifiés et met à jour les artistes sur place
+
+        Avec apercu, les sphères dessinées en marqueurs sont sous-échantillonnées.
+        Retourne le nombre de parties régénérées et de parties seulement translatées.
+        """
+        if mode is not None:
+            self.mode = mode
+        self.parametres.update(parametres)
+        p = self.parametres
+        
+        # Contour : mêmes arêtes, nouvelles coordonnées
+        aretes = aretes_prisme(polygone_croix(p["largeur_centrale"], p["longueur_centrale"],
+                                              p["largeur_bras"], p["longueur_bras"]), p["hauteur"])
+        if self.contour is None:
+            self.contour = dessiner_aretes(self.ax, aretes, linewidth=2)
+        else:
+            self.contour.set_segments(aretes)
+        
+        # Niveau de détail commun à toutes les parties, d'après le nombre total de sphères
+        # (estimé par le réseau cubique en mode aléatoire ou polydisperse)
+        largeur_totale, longueur_totale, _, _ = calculer_dimensions_croix(
+            p["largeur_centrale"], p["longueur_centrale"], p["largeur_bras"], p["longueur_bras"])
+        self.etendue = max(largeur_totale, longueur_totale, p["hauteur"])
+        parties = self.decouper(apercu)
+        mode_estimation = self.mode if self.mode in MODES_EMPILEMENT else "cubique"
+        nombre_estime = statistiques_croix(**p, mode=mode_estimation)["nombre_total"]
+        rayon_ecran = estimer_rayon_ecran(self.ax, p["rayon_sphere"], self.etendue)
+        niveau = choisir_niveau_detail(nombre_estime, rayon_ecran, self.budget_facettes)
+        pas = max(1, math.ceil(nombre_estime / (MARQUEURS_APERCU if apercu else MARQUEURS_MAX)))
+        
+        regenerees = translatees = 0
+        noms = set()
+        for nom, x, y, forme, generer in parties:
+            noms.add(nom)
+            partie = self.parties.get(nom)
+            origine = np.array([x, y, 0.0])
+            if partie is not None and partie["forme"] == forme and partie["niveau"] == niveau:
+                if not np.array_equal(partie["origine"], origine):
+                    self.translater(partie, origine, pas)
+                    translatees += 1
+                elif niveau is None:
+                    # La taille des marqueurs suit l'étendue de la scène
+                    self.placer_marqueurs(partie, pas)
+                continue
+            
+            with phase("regeneration_partie"):
+                centres, rayons = generer()
+                self.parties[nom] = self.dessiner_partie(partie, centres, rayons, origine, niveau, pas)
+                self.parties[nom]["forme"] = forme
+            regenerees += 1
+        
+        # Parties disparues (changement de mode)
+        for nom in set(self.parties) - noms:
+            self.parties.pop(nom)["artiste"].remove()
+        
+        nombre = sum(len(partie["centres"]) for partie in self.parties.values())
+        compter("spheres", nombre)
+        if self.en_apercu():
+            titre = f"Plan en Croix, aperçu du mode {self.mode} (r={p['rayon_sphere']:.2f}, ~{self.nombre_aleatoire()} sphères"
+            if self.nombre_aleatoire() > NOMBRE_MAX_ALEATOIRE:
+                titre += f", tirage interactif limité à {NOMBRE_MAX_ALEATOIRE}"
+            self.ax.set_title(titre + ")")
+        else:
+            stats = self.statistiques()
+            self.ax.set_title(f"Plan en Croix avec {nombre} sphères (r={p['rayon_sphere']:.2f}, "
+                              f"{self.mode}), remplissage {stats['taux_remplissage']:.1f}%")
+        
+        max_dim = max(largeur_totale, longueur_totale, p["hauteur"])
+        self.ax.set_xlim([0, max_dim])
+        self.ax.set_ylim([0, max_dim])
+        self.ax.set_zlim([0, p["hauteur"]])
+        
+        return {"regenerees": regenerees, "translatees": translatees}
+
+    def tailles_marqueurs(self, rayons, nombre):
+        """
+        Taille (points au carré) des marqueurs d'une partie dessinée en scatter
+        """
+        points_par_pixel = 72.0 / self.ax.figure.dpi
+        diametre = np.maximum(2.0 * estimer_rayon_ecran(self.ax, np.asarray(rayons, dtype=float), self.etendue)
+                              * points_par_pixel, 1.0)
+        return np.broadcast_to(diametre ** 2, (nombre,))
+
+    def placer_marqueurs(self, partie, pas=1):
+        """
+        Met à jour le scatter d'une partie avec une sphère sur pas, à sa position courante
+        """
+        visibles = slice(None, None, pas)
+        positions = partie["centres"][visibles] + partie["origine"]
+        rayons = partie["rayons"] if np.ndim(partie["rayons"]) == 0 else np.asarray(partie["rayons"])[visibles]
+        artiste = partie["artiste"]
+        artiste.set_offsets(positions[:, :2])
+        artiste.set_sizes(self.tailles_marqueurs(rayons, len(positions)))
+        artiste.set_facecolor(partie["couleurs"][visibles])
+        artiste.set_3d_properties(positions[:, 2], "z")
+        partie["pas"] = pas
+
+    def en_apercu(self):
+        """
+        Indique si la croix est dessinée par un aperçu de remplissage aléatoire
+        """
+        return any(partie["forme"][0] == "apercu" for partie in self.parties.values())
+
+    def afficher_tout(self):
+        """
+        Termine un aperçu : tire le remplissage aléatoire s'il n'est pas trop
+        grand et réaffiche jusqu'à MARQUEURS_MAX marqueurs, retourne True si
+        la scène a changé
+        """
+        if self.en_apercu() and self.mettre_a_jour()["regenerees"]:
+            return True
+        
+        nombre = sum(len(partie["centres"]) for partie in self.parties.values())
+        pas = max(1, math.ceil(nombre / MARQUEURS_MAX))
+        reduites = [partie for partie in self.parties.values() if partie.get("pas", 1) > pas]
+        for partie in reduites:
+            self.placer_marqueurs(partie, pas)
+        return bool(reduites)
+
+    def dessiner_partie(self, partie, centres, rayons, origine, niveau, pas=1):
+        """
+        Dessine les sphères d'une partie, en réutilisant son artiste s'il est du même type
+
+        En marqueurs, seule une sphère sur pas est dessinée.
+        """
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+        
+        centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+        valeurs_couleur = np.clip(centres[:, 2] / self.parametres["hauteur"], 0, 1)
+        artiste = None if partie is None else partie["artiste"]
+        nouvelle = {"centres": centres, "rayons": rayons, "origine": origine, "niveau": niveau}
+        
+        if niveau is not None:
+            # Facettes relatives à l'origine de la partie, gardées pour les translations
+            nouvelle["relatif"] = facettes_spheres(centres, rayons, *niveau)
+            couleurs = couleurs_facettes(valeurs_couleur, *niveau)
+            compter("facettes", len(nouvelle["relatif"]))
+            if isinstance(artiste, Poly3DCollection):
+                artiste.set_verts(nouvelle["relatif"] + origine)
+                artiste.set_facecolor(couleurs)
+            else:
+                if artiste is not None:
+                    artiste.remove()
+                artiste = Poly3DCollection(nouvelle["relatif"] + origine, facecolors=couleurs, linewidths=0)
+                self.ax.add_collection3d(artiste)
+        else:
+            # Couleurs gardées pour tout l'ensemble, les marqueurs montrés en sont un sous-ensemble
+            nouvelle["couleurs"] = plt.cm.viridis(valeurs_couleur)
+            if artiste is None or isinstance(artiste, Poly3DCollection):
+                if artiste is not None:
+                    artiste.remove()
+                artiste = self.ax.scatter([], [], [], alpha=0.7, edgecolors='none', depthshade=True)
+        
+        nouvelle["artiste"] = artiste
+        if niveau is None:
+            self.placer_marqueurs(nouvelle, pas)
+        return nouvelle
+
+    def translater(self, partie, origine, pas=1):
+        """
+        Déplace les sphères d'une partie sans les régénérer (une sur pas en marqueurs)
+        """
+        partie["origine"] = origine
+        if partie["niveau"] is not None:
+            partie["artiste"].set_verts(partie["relatif"] + origine)
+        else:
+            self.placer_marqueurs(partie, pas)
+
+def explorer_plan_croix(parametres=None, mode="cubique", graine=0):
+    """
+    Affiche le plan en croix avec des curseurs pour chaque dimension et
+    des boutons pour le mode d'empilement
+
+    Les mouvements des curseurs sont regroupés pendant DELAI_RAFRAICHISSEMENT
+    millisecondes, puis seuls les artistes concernés sont mis à jour, en
+    aperçu : toutes les sphères ne sont réaffichées qu'au relâchement du
+    bouton ou après DELAI_AFFICHAGE_COMPLET millisecondes sans mouvement. En
+    mode aléatoire ou polydisperse, le remplissage n'est tiré qu'à ce moment,
+    et seulement jusqu'à NOMBRE_MAX_ALEATOIRE sphères ; la graine reste fixe :
+    la scène ne change qu'avec les paramètres.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import RadioButtons, Slider
+    
+    parametres = dict(PARAMETRES_INITIAUX, **(parametres or {}))
+    
+    fig = plt.figure(figsize=(15, 12))
+    ax = fig.add_axes([0.05, 0.3, 0.7, 0.65], projection='3d')
+    ax.set_xlabel('X (Largeur)')
+    ax.set_ylabel('Y (Longueur)')
+    ax.set_zlabel('Z (Hauteur)')
+    ax.view_init(elev=30, azim=45)
+    scene = SceneCroixInteractive(ax, parametres, mode, graine)
+    
+    # Un curseur par dimension, empilés sous la scène
+    curseurs = {}
+    for i, (nom, libelle) in enumerate(CURSEURS.items()):
+        axe_curseur = fig.add_axes([0.2, 0.22 - i * 0.035, 0.5, 0.025])
+        curseurs[nom] = Slider(axe_curseur, libelle, 0.2 * parametres[nom], 3 * parametres[nom], valinit=parametres[nom])
+    boutons = RadioButtons(fig.add_axes([0.8, 0.05, 0.15, 0.2]), MODES_DISPOSITION, active=MODES_DISPOSITION.index(mode))
+    
+    # Les changements s'accumulent, le minuteur les applique en une seule mise à
+    # jour en aperçu ; le second minuteur ou le relâchement du bouton complète
+    en_attente = {}
+    minuteur = fig.canvas.new_timer(interval=DELAI_RAFRAICHISSEMENT)
+    minuteur.single_shot = True
+    minuteur_complet = fig.canvas.new_timer(interval=DELAI_AFFICHAGE_COMPLET)
+    minuteur_complet.single_shot = True
+    
+    def appliquer():
+        minuteur.stop()
+        if en_attente:
+            changements = dict(en_attente)
+            en_attente.clear()
+            scene.mettre_a_jour(apercu=True, **changements)
+            fig.canvas.draw_idle()
+            minuteur_complet.stop()
+            minuteur_complet.start()
+    
+    def completer(_evenement=None):
+        appliquer()
+        minuteur_complet.stop()
+        if scene.afficher_tout():
+            fig.canvas.draw_idle()
+    
+    def planifier(nom, valeur):
+        en_attente[nom] = valeur
+        minuteur.stop()
+        minuteur.start()
+    
+    minuteur.add_callback(appliquer)
+    minuteur_complet.add_callback(completer)
+    fig.canvas.mpl_connect('button_release_event', completer)
+    for nom, curseur in curseurs.items():
+        curseur.on_changed(lambda valeur, nom=nom: planifier(nom, valeur))
+    boutons.on_clicked(lambda choix: planifier("mode", choix))
+    
+    plt.show()
+    return scene
\ No newline at end of file
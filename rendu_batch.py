@@ -0,0 +1,162 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Dimensions d'un plan en croix
+DIMENSIONS_CROIX = ("largeur_centrale", "longueur_centrale", "largeur_bras", "longueur_bras", "hauteur")
+
+# Scènes disponibles, partagées avec service_http : nom -> (module, fonction
+# de construction de la figure, dimensions attendues, scène avec sphères)
+SCENES = {
+    "plan_3d": ("plan_3d", "construire_figure_plan_3d", DIMENSIONS_CROIX + ("epaisseur_mur",), False),
+    "plan_3d_contour": ("plan_3d_contour", "construire_figure_plan_3d", DIMENSIONS_CROIX, False),
+    "croix_spheres": ("plan_croix_avec_spheres", "construire_figure_croix_avec_spheres",
+                      DIMENSIONS_CROIX + ("rayon_sphere",), True),
+    "boite_spheres": ("app", "construire_figure_parallelepipede", ("largeur", "longueur", "hauteur", "rayon_sphere"), True),
+}
+
+FORMATS = ("png", "svg")
+
+def initialiser_processus():
+    """
+    Initialise un processus de rendu : rendu sans fenêtre, le backend doit
+    être fixé avant tout import de pyplot
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+def verifier_configuration(config):
+    """
+    Vérifie qu'une configuration désigne une scène connue avec des paramètres positifs
+    """
+    if config.get("scene") not in SCENES:
+        raise ValueError(f"Scène inconnue: {config.get('scene')!r} (choix: {', '.join(SCENES)})")
+
+    parametres = config.get("parametres", {})
+    if any(val <= 0 for val in parametres.values() if isinstance(val, (int, float))):
+        raise ValueError("Toutes les valeurs doivent être positives!")
+
+def construire_figure(scene, parametres):
+    """
+    Construit la figure d'une scène sans l'afficher
+    """
+    module, fonction, _, _ = SCENES[scene]
+    return getattr(importlib.import_module(module), fonction)(**parametres)
+
+def rendre_configuration(index, config, dossier_sortie, formats=("png",), dpi=100):
+    """
+    Construit et enregistre la figure d'une configuration, retourne son entrée de manifeste
+    """
+    import matplotlib.pyplot as plt
+
+    # Une configuration incomplète doit finir en erreur dans le manifeste,
+    # pas interrompre tout le lot
+    nom = config.get("nom") or f"{index:04d}_{config.get('scene')}"
+    entree = {"index": index, "nom": nom, "scene": config.get("scene"),
+              "parametres": config.get("parametres", {}), "fichiers": [], "durees": {}, "erreur": None}
+
+    debut = time.perf_counter()
+    fig = None
+    try:
+        verifier_configuration(config)
+
+        # Les scripts affichent leur progression, inutile en traitement par lot
+        with contextlib.redirect_stdout(io.StringIO()):
+            fig = construire_figure(config["scene"], entree["parametres"])
+        entree["durees"]["construction"] = time.perf_counter() - debut
+
+        debut_sauvegarde = time.perf_counter()
+        for fmt in formats:
+            chemin = os.path.join(dossier_sortie, f"{nom}.{fmt}")
+            fig.savefig(chemin, format=fmt, dpi=dpi)
+            entree["fichiers"].append(chemin)
+        entree["durees"]["sauvegarde"] = time.perf_counter() - debut_sauvegarde
+
+    except Exception as erreur:
+        entree["erreur"] = f"{type(erreur).__name__}: {erreur}"
+
+    finally:
+        # Les processus du pool sont réutilisés : une figure non fermée y resterait en mémoire
+        if fig is not None:
+            plt.close(fig)
+
+    entree["durees"]["total"] = time.perf_counter() - debut
+    return entree
+
+def rendre_lot(configurations, dossier_sortie, formats=("png",), processus=None, dpi=100):
+    """
+    Rend une liste de configurations en parallèle et écrit le manifeste
+
+    Chaque configuration est un dictionnaire {"scene", "parametres", "nom"
+    (optionnel)}. Le travail est réparti sur un ProcessPoolExecutor (tous les
+    cœurs par défaut) et le manifeste des fichiers et des durées est écrit
+    dans dossier_sortie/manifeste.json.
+    """
+    formats = tuple(formats)
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Format inconnu: {fmt!r} (choix: {', '.join(FORMATS)})")
+
+    os.makedirs(dossier_sortie, exist_ok=True)
+    processus = processus or os.cpu_count() or 1
+
+    debut = time.perf_counter()
+    rendus = []
+    with ProcessPoolExecutor(max_workers=processus, initializer=initialiser_processus) as executeur:
+        futures = [executeur.submit(rendre_configuration, index, config, dossier_sortie, formats, dpi)
+                   for index, config in enumerate(configurations)]
+        for future in as_completed(futures):
+            rendus.append(future.result())
+
+    rendus.sort(key=lambda entree: entree["index"])
+    manifeste = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "processus": processus,
+        "formats": list(formats),
+        "duree_totale": time.perf_counter() - debut,
+        "nombre_erreurs": sum(entree["erreur"] is not None for entree in rendus),
+        "rendus": rendus,
+    }
+
+    with open(os.path.join(dossier_sortie, "manifeste.json"), "w", encoding="utf-8") as fichier:
+        json.dump(manifeste, fichier, indent=2, ensure_ascii=False)
+
+    return manifeste
+
+def charger_configurations(chemin):
+    """
+    Charge une liste de configurations depuis un fichier JSON
+    """
+    with open(chemin, encoding="utf-8") as fichier:
+        donnees = json.load(fichier)
+
+    if isinstance(donnees, dict):
+        donnees = donnees.get("configurations", [])
+    return donnees
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande du rendu par lot
+    """
+    parser = argparse.ArgumentParser(description="Rendu par lot, sans interface, des plans 3D")
+    parser.add_argument("configurations", help="Fichier JSON contenant la liste des configurations")
+    parser.add_argument("--sortie", default="rendus", help="Dossier de sortie (défaut: rendus)")
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=FORMATS)
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut: tous les cœurs)")
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args(arguments)
+
+    manifeste = rendre_lot(charger_configurations(args.configurations), args.sortie,
+                           args.formats, args.processus, args.dpi)
+
+    print(f"{len(manifeste['rendus'])} rendus en {manifeste['duree_totale']:.1f} s "
+          f"({manifeste['nombre_erreurs']} erreurs), manifeste: {os.path.join(args.sortie, 'manifeste.json')}")
+    return 1 if manifeste["nombre_erreurs"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+from empreinte import aretes_prisme
+
+def dessiner_aretes(ax, aretes, color='black', linewidth=2, alpha=None):
+    """
+    Dessine un ensemble d'arêtes (E, 2, 3) en une seule Line3DCollection
+
+    Les limites des axes sont étendues aux arêtes, comme le ferait plot3D.
+    Retourne la collection ajoutée aux axes.
+    """
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+    collection = Line3DCollection(aretes, colors=color, linewidths=linewidth, alpha=alpha)
+    ax.add_collection3d(collection)
+
+    points = aretes.reshape(-1, 3)
+    ax.auto_scale_xyz(points[:, 0], points[:, 1], points[:, 2], had_data=ax.has_data())
+
+    return collection
+
+def dessiner_contour_prisme(ax, polygone, hauteur, color='black', linewidth=2, alpha=None):
+    """
+    Dessine les arêtes du prisme extrudé d'un polygone (base, sommet et verticales)
+
+    Toutes les arêtes forment un seul artiste, quel que soit le nombre de sommets.
+    """
+    return dessiner_aretes(ax, aretes_prisme(polygone, hauteur), color, linewidth, alpha)
\ No newline at end of file
@@ -0,0 +1,174 @@
+from functools import lru_cache
+
+import numpy as np
+
+from instrumentation import compter, phase
+from maillage_sphere import TAILLE_CACHE_GABARITS, figer, generer_facettes_sphere
+
+# Direction de la lumière utilisée pour l'ombrage des facettes
+DIRECTION_LUMIERE = np.array([-1.0, -1.0, 1.0]) / np.sqrt(3.0)
+
+# Niveaux de détail (n_u, n_v), du plus grossier au plus fin
+NIVEAUX_DETAIL = [(6, 4), (8, 5), (10, 7), (15, 10), (20, 15), (28, 20)]
+
+# Nombre maximal de facettes toutes sphères confondues
+BUDGET_FACETTES = 300000
+
+# En dessous de ce rayon apparent (pixels), une sphère est dessinée comme un point
+RAYON_ECRAN_MIN = 3.0
+
+def calculer_ombrage(facettes):
+    """
+    Calcule un facteur d'éclairage par facette à partir de sa normale
+    """
+    # Sur une sphère unitaire centrée, la normale est la direction du barycentre
+    normales = facettes.mean(axis=1)
+    normes = np.linalg.norm(normales, axis=1, keepdims=True)
+    normales = normales / np.where(normes > 0, normes, 1)
+
+    intensite = np.clip(normales @ DIRECTION_LUMIERE, 0, 1)
+    return 0.45 + 0.55 * intensite
+
+@lru_cache(maxsize=TAILLE_CACHE_GABARITS)
+def ombrage_sphere(n_u, n_v):
+    """
+    Facteur d'éclairage des facettes de la sphère unitaire, mis en cache par niveau
+    """
+    return figer(calculer_ombrage(generer_facettes_sphere(n_u, n_v)))
+
+def facettes_spheres(centres, rayon, n_u=20, n_v=15):
+    """
+    Calcule en une passe vectorisée les facettes (M, 4, 3) de toutes les sphères
+
+    rayon est un nombre ou un tableau (N,) d'un rayon par sphère.
+    """
+    centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+    facettes = generer_facettes_sphere(n_u, n_v)
+
+    # Translation et mise à l'échelle de la sphère unitaire pour tous les centres
+    rayons = np.asarray(rayon, dtype=float).reshape(-1, 1, 1, 1)
+    polygones = rayons * facettes[None, :, :, :] + centres[:, None, None, :]
+    return polygones.reshape(-1, 4, 3)
+
+def couleurs_facettes(valeurs_couleur, n_u=20, n_v=15, alpha=0.7, cmap=None):
+    """
+    Couleur (M, 4) de chaque facette : couleur de sa sphère, modulée par l'ombrage
+    """
+    import matplotlib.pyplot as plt
+
+    palette = cmap if cmap is not None else plt.cm.viridis
+    couleurs_spheres = palette(np.asarray(valeurs_couleur, dtype=float).reshape(-1))
+    ombrage = ombrage_sphere(n_u, n_v)
+    couleurs = np.repeat(couleurs_spheres, len(ombrage), axis=0)
+    couleurs[:, :3] *= np.tile(ombrage, len(couleurs_spheres))[:, None]
+    couleurs[:, 3] = alpha
+    return couleurs
+
+def dessiner_spheres_groupees(ax, centres, rayon, valeurs_couleur, n_u=20, n_v=15, alpha=0.7, cmap=None):
+    """
+    Dessine toutes les sphères dans une seule Poly3DCollection
+
+    Les facettes de toutes les sphères sont calculées en une seule passe
+    vectorisée, avec une couleur par facette issue de la palette viridis.
+    rayon est un nombre ou un tableau (N,) d'un rayon par sphère.
+    Retourne la collection ajoutée aux axes.
+    """
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    polygones = facettes_spheres(centres, rayon, n_u, n_v)
+    compter("facettes", len(polygones))
+
+    # Couleur de chaque sphère, modulée par l'ombrage de chaque facette
+    couleurs = couleurs_facettes(valeurs_couleur, n_u, n_v, alpha, cmap)
+
+    collection = Poly3DCollection(polygones, facecolors=couleurs, linewidths=0)
+    ax.add_collection3d(collection)
+
+    return collection
+
+def nombre_facettes(niveau):
+    """
+    Nombre de facettes d'une sphère pour un niveau de détail (n_u, n_v)
+    """
+    n_u, n_v = niveau
+    return (n_u - 1) * (n_v - 1)
+
+def estimer_rayon_ecran(ax, rayon, etendue):
+    """
+    Estime le rayon apparent d'une sphère en pixels
+
+    La boîte 3D occupe environ 60 % du plus petit côté des axes pour la
+    plus grande dimension de la scène (etendue).
+    """
+    boite = ax.get_window_extent()
+    cote_pixels = min(boite.width, boite.height)
+    return rayon / max(etendue, 1e-12) * cote_pixels * 0.6
+
+def choisir_niveau_detail(nb_spheres, rayon_ecran, budget_facettes=BUDGET_FACETTES):
+    """
+    Choisit la tessellation selon le nombre de sphères et leur taille à l'écran
+
+    Retourne un niveau (n_u, n_v), ou None si les sphères doivent être
+    dessinées comme de simples marqueurs.
+    """
+    if nb_spheres == 0 or rayon_ecran < RAYON_ECRAN_MIN:
+        return None
+
+    # Inutile d'avoir plus de segments en longitude que de pixels sur le contour
+    segments_utiles = max(2.0 * np.pi * rayon_ecran / 2.0, NIVEAUX_DETAIL[0][0])
+
+    choix = None
+    for niveau in NIVEAUX_DETAIL:
+        if nb_spheres * nombre_facettes(niveau) > budget_facettes:
+            break
+        choix = niveau
+        if niveau[0] >= segments_utiles:
+            break
+
+    return choix
+
+def dessiner_spheres_marqueurs(ax, centres, rayon_ecran, valeurs_couleur, alpha=0.7, cmap=None):
+    """
+    Dessine les sphères comme des marqueurs dont la taille suit le rayon apparent
+
+    rayon_ecran est un nombre ou un tableau (N,) d'un rayon apparent par sphère.
+    """
+    import matplotlib.pyplot as plt
+
+    palette = cmap if cmap is not None else plt.cm.viridis
+    couleurs = palette(np.asarray(valeurs_couleur, dtype=float))
+    compter("marqueurs", len(centres))
+
+    # La taille d'un marqueur scatter s'exprime en points au carré
+    points_par_pixel = 72.0 / ax.figure.dpi
+    diametre_points = np.maximum(2.0 * np.asarray(rayon_ecran, dtype=float) * points_par_pixel, 1.0)
+
+    return ax.scatter(centres[:, 0], centres[:, 1], centres[:, 2],
+                      s=diametre_points ** 2, c=couleurs, alpha=alpha,
+                      edgecolors='none', depthshade=True)
+
+def dessiner_spheres_lod(ax, centres, rayon, valeurs_couleur, budget_facettes=BUDGET_FACETTES, etendue=None, alpha=0.7, cmap=None):
+    """
+    Dessine les sphères avec un niveau de détail adapté à la scène
+
+    Le niveau est choisi d'après le nombre total de sphères, leur rayon
+    apparent (moyen, si rayon est un tableau d'un rayon par sphère) et le
+    budget de facettes. Les petites sphères ou les très grands empilements
+    sont dessinés par un scatter, les autres par des maillages.
+    """
+    centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+    if len(centres) == 0:
+        return None
+
+    if etendue is None:
+        etendue = np.ptp(centres, axis=0).max() + 2 * np.max(rayon)
+
+    rayon_ecran = estimer_rayon_ecran(ax, rayon, etendue)
+    niveau = choisir_niveau_detail(len(centres), float(np.mean(rayon_ecran)), budget_facettes)
+
+    if niveau is None:
+        return dessiner_spheres_marqueurs(ax, centres, rayon_ecran, valeurs_couleur, alpha, cmap)
+
+    n_u, n_v = niveau
+    with phase("tessellation"):
+        return dessiner_spheres_groupees(ax, centres, rayon, valeurs_couleur, n_u, n_v, alpha, cmap)
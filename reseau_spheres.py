@@ -0,0 +1,276 @@
+import math
+
+import numpy as np
+
+from geometrie import calculer_nombre_par_axe
+
+# Modes d'empilement disponibles
+# - cubique : grille simple, une sphère au centre de chaque sous-volume (~52 %)
+# - cfc : cubique à faces centrées, couches carrées décalées (~74 %)
+# - hc : hexagonal compact, couches triangulaires ABAB (~74 %)
+MODES_EMPILEMENT = ("cubique", "cfc", "hc")
+
+# Tolérance relative pour les comptes de sphères en bord de région
+TOLERANCE = 1e-9
+
+# Nombre maximal de centres par bloc pour la génération en flux
+TAILLE_BLOC = 1 << 20
+
+def verifier_mode(mode):
+    """
+    Vérifie que le mode d'empilement est connu
+    """
+    if mode not in MODES_EMPILEMENT:
+        raise ValueError(f"Mode d'empilement inconnu: {mode!r} (choix: {', '.join(MODES_EMPILEMENT)})")
+
+def produit_axes(xs, ys, zs):
+    """
+    Combine trois axes de coordonnées en un tableau (N, 3) par diffusion (broadcasting)
+
+    L'ordre est celui de boucles imbriquées sur x, puis y, puis z.
+    """
+    centres = np.empty((len(xs), len(ys), len(zs), 3))
+    centres[..., 0] = xs[:, None, None]
+    centres[..., 1] = ys[None, :, None]
+    centres[..., 2] = zs[None, None, :]
+
+    return centres.reshape(-1, 3)
+
+def generer_centres_grille(x_start, y_start, z_start, largeur, longueur, hauteur, nx, ny, nz):
+    """
+    Génère les centres d'une grille nx x ny x nz sous forme d'un tableau (N, 3)
+
+    Chaque sphère est placée au centre de gravité de son sous-volume. L'ordre
+    est celui des anciennes boucles imbriquées (i, puis j, puis k).
+    """
+    xs = x_start + (np.arange(nx) + 0.5) * (largeur / nx)
+    ys = y_start + (np.arange(ny) + 0.5) * (longueur / ny)
+    zs = z_start + (np.arange(nz) + 0.5) * (hauteur / nz)
+
+    return produit_axes(xs, ys, zs)
+
+def parametres_reseau(mode, diametre):
+    """
+    Retourne les pas d'un réseau compact : (pas des rangées, pas des couches,
+    décalage en y d'une couche, décalage en x d'une rangée)
+
+    Les décalages sont des fonctions de la parité de la couche (t) et de la
+    rangée (q). Dans une rangée, les sphères sont espacées d'un diamètre.
+    """
+    if mode == "cfc":
+        # Couches carrées, la couche impaire se loge dans les creux de la précédente
+        return (diametre, diametre / math.sqrt(2),
+                lambda t: t * diametre / 2,
+                lambda t, q: t * diametre / 2)
+
+    # hc : couches triangulaires, rangées décalées d'un rayon, empilement ABAB
+    return (diametre * math.sqrt(3) / 2, diametre * math.sqrt(2 / 3),
+            lambda t: t * diametre * math.sqrt(3) / 6,
+            lambda t, q: ((t + q) % 2) * diametre / 2)
+
+def compter_axe(debut, pas, fin):
+    """
+    Compte les positions debut + i * pas comprises dans [debut, fin]
+    """
+    if fin < debut - TOLERANCE * max(abs(fin), pas):
+        return 0
+    return int(math.floor((fin - debut) / pas + TOLERANCE)) + 1
+
+def compter_axe_tableau(debut, pas, fin):
+    """
+    Version vectorisée de compter_axe, pour des tableaux de positions
+    """
+    nombre = np.floor((fin - debut) / pas + TOLERANCE).astype(np.int64) + 1
+    return np.where(fin < debut - TOLERANCE * np.maximum(np.abs(fin), pas), 0, nombre)
+
+def decomposer_reseau_compact(largeur, longueur, hauteur, diametre, mode):
+    """
+    Décompose un réseau compact en sous-grilles régulières selon la parité
+    des couches et des rangées
+
+    Retourne la liste des (x0, y0, z0, pas_y, pas_z, nx, ny, nz) de chaque
+    sous-grille, en coordonnées relatives au coin de la région. Toutes les
+    sphères restent entièrement dans la région.
+    """
+    rayon = diametre / 2
+    pas_rangee, pas_couche, decalage_y, decalage_x = parametres_reseau(mode, diametre)
+
+    nb_couches = compter_axe(rayon, pas_couche, hauteur - rayon)
+    sous_grilles = []
+    for t in (0, 1):
+        nz = (nb_couches - t + 1) // 2
+        nb_rangees = compter_axe(rayon + decalage_y(t), pas_rangee, longueur - rayon)
+        for q in (0, 1):
+            ny = (nb_rangees - q + 1) // 2
+            x0 = rayon + decalage_x(t, q)
+            nx = compter_axe(x0, diametre, largeur - rayon)
+            if nx and ny and nz:
+                sous_grilles.append((x0, rayon + decalage_y(t) + q * pas_rangee, rayon + t * pas_couche,
+                                     2 * pas_rangee, 2 * pas_couche, nx, ny, nz))
+
+    return sous_grilles
+
+def compter_centres_boite(largeur, longueur, hauteur, diametre, mode="cubique"):
+    """
+    Compte en O(1) les sphères d'un parallélépipède pour un mode d'empilement
+    """
+    verifier_mode(mode)
+    if mode == "cubique":
+        nx, ny, nz = calculer_nombre_par_axe(largeur, longueur, hauteur, diametre)
+        return nx * ny * nz
+
+    return sum(nx * ny * nz for *_, nx, ny, nz in
+               decomposer_reseau_compact(largeur, longueur, hauteur, diametre, mode))
+
+def nombre_par_axe_tableau(dimension, diametres):
+    """
+    Version vectorisée de calculer_nombre_par_axe, pour une dimension et un
+    tableau de diamètres
+    """
+    return np.maximum(1, (dimension / diametres).astype(np.int64))
+
+def compter_centres_boite_tableau(largeur, longueur, hauteur, diametres, mode="cubique"):
+    """
+    Compte les sphères d'un parallélépipède pour tout un tableau de diamètres
+
+    Donne, diamètre par diamètre, le même résultat que compter_centres_boite.
+    """
+    verifier_mode(mode)
+    diametres = np.asarray(diametres, dtype=float)
+    if mode == "cubique":
+        return (nombre_par_axe_tableau(largeur, diametres) * nombre_par_axe_tableau(longueur, diametres)
+                * nombre_par_axe_tableau(hauteur, diametres))
+
+    rayons = diametres / 2
+    pas_rangee, pas_couche, decalage_y, decalage_x = parametres_reseau(mode, diametres)
+
+    nb_couches = compter_axe_tableau(rayons, pas_couche, hauteur - rayons)
+    nombre = np.zeros(diametres.shape, dtype=np.int64)
+    for t in (0, 1):
+        nz = (nb_couches - t + 1) // 2
+        nb_rangees = compter_axe_tableau(rayons + decalage_y(t), pas_rangee, longueur - rayons)
+        for q in (0, 1):
+            ny = (nb_rangees - q + 1) // 2
+            nx = compter_axe_tableau(rayons + decalage_x(t, q), diametres, largeur - rayons)
+            nombre += nx * ny * nz
+
+    return nombre
+
+def axes_reseau_boite(x_start, y_start, largeur, longueur, hauteur, diametre, z_start=0.0, mode="cubique"):
+    """
+    Retourne les axes (xs, ys, zs) des sous-grilles régulières qui composent
+    le réseau d'un parallélépipède
+
+    En mode cfc ou hc, le réseau est centré dans le plan horizontal et posé
+    sur le sol de la région.
+    """
+    verifier_mode(mode)
+    if mode == "cubique":
+        nx, ny, nz = calculer_nombre_par_axe(largeur, longueur, hauteur, diametre)
+        return [(x_start + (np.arange(nx) + 0.5) * (largeur / nx),
+                 y_start + (np.arange(ny) + 0.5) * (longueur / ny),
+                 z_start + (np.arange(nz) + 0.5) * (hauteur / nz))]
+
+    sous_grilles = decomposer_reseau_compact(largeur, longueur, hauteur, diametre, mode)
+    if not sous_grilles:
+        return []
+
+    # Répartition de l'espace restant de part et d'autre en x et en y
+    x_max = max(x0 + (nx - 1) * diametre for x0, _, _, _, _, nx, _, _ in sous_grilles)
+    y_max = max(y0 + (ny - 1) * pas_y for _, y0, _, pas_y, _, _, ny, _ in sous_grilles)
+    marge_x = (largeur - diametre / 2 - x_max) / 2
+    marge_y = (longueur - diametre / 2 - y_max) / 2
+
+    return [(x_start + marge_x + x0 + np.arange(nx) * diametre,
+             y_start + marge_y + y0 + np.arange(ny) * pas_y,
+             z_start + z0 + np.arange(nz) * pas_z)
+            for x0, y0, z0, pas_y, pas_z, nx, ny, nz in sous_grilles]
+
+def generer_centres_boite(x_start, y_start, largeur, longueur, hauteur, diametre, z_start=0.0, mode="cubique"):
+    """
+    Génère les centres des sphères d'un parallélépipède sous forme d'un tableau (N, 3)
+    """
+    blocs = [produit_axes(xs, ys, zs) for xs, ys, zs in
+             axes_reseau_boite(x_start, y_start, largeur, longueur, hauteur, diametre, z_start, mode)]
+    if not blocs:
+        return np.empty((0, 3))
+
+    return np.concatenate(blocs)
+
+def tranches_z(couches, taille_bloc=TAILLE_BLOC):
+    """
+    Regroupe des couches en tranches de z croissant d'au plus taille_bloc centres
+
+    couches est une liste de (zs, nombre de centres par couche), une entrée
+    par sous-grille. Retourne les bornes (z_min, z_max) de chaque tranche ;
+    une couche plus grande que taille_bloc forme une tranche à elle seule.
+    Dans une tranche de plusieurs couches, chaque sous-grille tient donc
+    dans un seul bloc.
+    """
+    couches = [(np.asarray(zs, dtype=float), nombre) for zs, nombre in couches if len(zs) and nombre]
+    if not couches:
+        return []
+    
+    # Nombre de centres de chaque hauteur de couche distincte, toutes sous-grilles confondues
+    hauteurs = np.unique(np.concatenate([zs for zs, _ in couches]))
+    poids = np.zeros(len(hauteurs), dtype=np.int64)
+    for zs, nombre in couches:
+        np.add.at(poids, np.searchsorted(hauteurs, zs), nombre)
+    
+    tranches = []
+    debut, cumul = 0, 0
+    for i, poids_couche in enumerate(poids):
+        if cumul and cumul + poids_couche > taille_bloc:
+            tranches.append((hauteurs[debut], hauteurs[i - 1]))
+            debut, cumul = i, 0
+        cumul += poids_couche
+    tranches.append((hauteurs[debut], hauteurs[-1]))
+    
+    return tranches
+
+def decouper_grille(xs, ys, zs, taille_bloc=TAILLE_BLOC):
+    """
+    Génère les centres d'une sous-grille par blocs (n, 3) d'au plus taille_bloc centres
+    """
+    if len(xs) * len(ys) * len(zs) <= taille_bloc:
+        if len(xs) and len(ys) and len(zs):
+            yield produit_axes(xs, ys, zs)
+        return
+    
+    # Couche par couche, découpée en rangées si elle ne tient pas dans un bloc
+    nb_x = min(len(xs), taille_bloc)
+    nb_y = max(1, taille_bloc // len(xs))
+    for z in zs:
+        for debut_y in range(0, len(ys), nb_y):
+            for debut_x in range(0, len(xs), nb_x):
+                yield produit_axes(xs[debut_x:debut_x + nb_x], ys[debut_y:debut_y + nb_y], np.array([z]))
+
+def iterer_centres_regions(regions, hauteur, diametre, mode="cubique", z_start=0.0, taille_bloc=TAILLE_BLOC):
+    """
+    Génère les centres de plusieurs régions rectangulaires (x, y, largeur,
+    longueur) par blocs (n, 3) d'au plus taille_bloc centres
+
+    Les blocs sont produits tranche de z par tranche de z, puis région par
+    région : le z minimal des blocs ne décroît jamais, ce qui permet aux
+    consommateurs (validation en flux) de ne garder que les centres proches
+    du bloc courant.
+    L'ensemble des blocs contient les mêmes centres que generer_centres_boite
+    appliqué à chaque région, dans un autre ordre.
+    """
+    verifier_mode(mode)
+    grilles = [axes for x, y, largeur, longueur in regions
+               for axes in axes_reseau_boite(x, y, largeur, longueur, hauteur, diametre, z_start, mode)]
+    
+    for z_min, z_max in tranches_z([(zs, len(xs) * len(ys)) for xs, ys, zs in grilles], taille_bloc):
+        morceaux = [(xs, ys, zs[(zs >= z_min) & (zs <= z_max)]) for xs, ys, zs in grilles]
+        morceaux = [morceau for morceau in morceaux if len(morceau[2])]
+        # Sous-grilles de la tranche par première couche croissante
+        for xs, ys, zs in sorted(morceaux, key=lambda morceau: morceau[2][0]):
+            yield from decouper_grille(xs, ys, zs, taille_bloc)
+
+def iterer_centres_boite(x_start, y_start, largeur, longueur, hauteur, diametre, z_start=0.0, mode="cubique", taille_bloc=TAILLE_BLOC):
+    """
+    Génère les centres des sphères d'un parallélépipède par blocs (n, 3), par tranches de z
+    """
+    return iterer_centres_regions([(x_start, y_start, largeur, longueur)], hauteur, diametre,
+                                  mode, z_start, taille_bloc)
\ No newline at end of file
@@ -0,0 +1,410 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from empilement_aleatoire import DISPERSION, LOI_RAYONS, LOIS_RAYONS, MODES_DISPOSITION, bornes_rayons
+from rendu_batch import SCENES, construire_figure, initialiser_processus
+from reseau_spheres import MODES_EMPILEMENT
+
+# Le service n'écoute que sur la boucle locale
+HOTE = "127.0.0.1"
+PORT = 8765
+
+# Taille maximale (octets) des résultats gardés en mémoire, éviction LRU
+TAILLE_MAX_RESULTATS = 256 * 1024 * 1024
+
+# Délai maximal (secondes) de lecture d'une requête
+DELAI_LECTURE = 10.0
+
+# Nombre maximal de sphères d'une scène, au-delà un processus de calcul
+# risquerait de manquer de mémoire
+NOMBRE_MAX_SPHERES = 2_000_000
+
+# Résolution maximale d'un rendu
+DPI_MAX = 600
+
+# Options des scènes avec sphères : nom -> conversion
+OPTIONS = {"mode": str, "graine": int, "nombre": int, "loi": str, "dispersion": float}
+
+# Ressources : nom -> type MIME de la réponse
+RESSOURCES = {"statistiques": "application/json", "centres": "application/octet-stream", "rendu": "image/png"}
+
+STATUTS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+def lire_parametres(scene, requete):
+    """
+    Convertit et vérifie les paramètres d'une requête pour une scène
+
+    requete est le dictionnaire issu de parse_qs. Retourne un dictionnaire
+    de paramètres prêt à être passé aux fonctions de construction, ainsi que
+    le dpi demandé pour un rendu.
+    """
+    if scene not in SCENES:
+        raise ValueError(f"Scène inconnue: {scene!r} (choix: {', '.join(SCENES)})")
+    _, _, dimensions, avec_spheres = SCENES[scene]
+    options = OPTIONS if avec_spheres else {}
+    
+    inconnus = set(requete) - set(dimensions) - set(options) - {"dpi"}
+    if inconnus:
+        raise ValueError(f"Paramètres inconnus: {', '.join(sorted(inconnus))}")
+    manquants = [nom for nom in dimensions if nom not in requete]
+    if manquants:
+        raise ValueError(f"Paramètres manquants: {', '.join(manquants)}")
+    
+    try:
+        parametres = {nom: float(requete[nom][-1]) for nom in dimensions}
+        parametres.update((nom, conversion(requete[nom][-1])) for nom, conversion in options.items() if nom in requete)
+        dpi = int(requete["dpi"][-1]) if "dpi" in requete else 100
+    except (ValueError, OverflowError):
+        raise ValueError("Veuillez entrer des nombres valides!") from None
+    
+    if not all(math.isfinite(val) for val in parametres.values() if isinstance(val, float)):
+        raise ValueError("Toutes les valeurs doivent être des nombres finis!")
+    if any(val <= 0 for val in parametres.values() if isinstance(val, float)) or parametres.get("nombre", 1) <= 0 or dpi <= 0:
+        raise ValueError("Toutes les valeurs doivent être positives!")
+    if parametres.get("mode", "cubique") not in MODES_DISPOSITION:
+        raise ValueError(f"Mode d'empilement inconnu: {parametres['mode']!r} (choix: {', '.join(MODES_DISPOSITION)})")
+    if parametres.get("loi", LOIS_RAYONS[0]) not in LOIS_RAYONS:
+        raise ValueError(f"Loi de rayons inconnue: {parametres['loi']!r} (choix: {', '.join(LOIS_RAYONS)})")
+    if dpi > DPI_MAX:
+        raise ValueError(f"Résolution trop grande: {dpi} dpi (maximum: {DPI_MAX})!")
+    if avec_spheres:
+        nombre = estimer_nombre_spheres(scene, parametres)
+        if nombre > NOMBRE_MAX_SPHERES:
+            raise ValueError(f"Scène trop grande: environ {nombre} sphères (maximum: {NOMBRE_MAX_SPHERES})!")
+    
+    return parametres, dpi
+
+def estimer_nombre_spheres(scene, parametres):
+    """
+    Estime en O(1) le nombre de sphères d'une scène, sans la générer
+
+    Le compte est exact pour les réseaux. En mode aléatoire ou polydisperse,
+    c'est le compte d'un réseau cfc, le plus dense, avec le rayon donné (la
+    grille des tirages est dimensionnée d'après le rayon), ou le nombre
+    demandé s'il est plus grand. En mode polydisperse, le rayon est le plus
+    petit que la loi puisse tirer : les petites sphères comblent les vides
+    des grandes, et une grande dispersion multiplie leur nombre.
+    """
+    from statistiques import statistiques_boite, statistiques_croix
+    
+    mode = parametres.get("mode", "cubique")
+    aleatoire = mode not in MODES_EMPILEMENT
+    
+    dimensions = {nom: parametres[nom] for nom in SCENES[scene][2]}
+    if mode == "polydisperse":
+        dimensions["rayon_sphere"], _ = bornes_rayons(parametres["rayon_sphere"], parametres.get("dispersion", DISPERSION),
+                                                      parametres.get("loi", LOI_RAYONS))
+    if scene == "boite_spheres":
+        nombre = statistiques_boite(**dimensions, mode="cfc" if aleatoire else mode)["nombre_total"]
+    else:
+        nombre = statistiques_croix(**dimensions, mode="cfc" if aleatoire else mode)["nombre_total"]
+    
+    return max(nombre, parametres.get("nombre", 0)) if aleatoire else nombre
+
+def disposition_scene(scene, parametres):
+    """
+    Retourne la disposition des sphères d'une scène, depuis le cache disque si possible
+    """
+    if scene == "boite_spheres":
+        from app import disposition_parallelepipede_en_cache
+        return disposition_parallelepipede_en_cache(**parametres)
+    
+    from plan_croix_avec_spheres import disposition_croix_en_cache
+    return disposition_croix_en_cache(**parametres)
+
+def calculer_statistiques(scene, parametres):
+    """
+    Calcule les statistiques d'une scène, encodées en JSON
+
+    Elles sont analytiques pour les réseaux et calculées sur la disposition
+    générée en mode aléatoire ou polydisperse.
+    """
+    from geometrie import calculer_volume_croix
+    from statistiques import statistiques_boite, statistiques_croix, statistiques_disposition
+    
+    mode = parametres.get("mode", "cubique")
+    dimensions = {nom: parametres[nom] for nom in SCENES[scene][2]}
+    if mode in MODES_EMPILEMENT:
+        if scene == "boite_spheres":
+            stats = statistiques_boite(**dimensions, mode=mode)
+        else:
+            stats = statistiques_croix(**dimensions, mode=mode)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            disposition = disposition_scene(scene, parametres)
+        if scene == "boite_spheres":
+            volume = dimensions["largeur"] * dimensions["longueur"] * dimensions["hauteur"]
+        else:
+            volume = calculer_volume_croix(*(dimensions[nom] for nom in SCENES[scene][2][:5]))
+        nom = "Boite" if scene == "boite_spheres" else "Croix"
+        stats = statistiques_disposition(disposition.centres, disposition.rayon, volume, mode, nom)
+    
+    return json.dumps(stats, ensure_ascii=False).encode("utf-8")
+
+def calculer_centres(scene, parametres):
+    """
+    Génère les centres d'une scène, encodés au format .npy
+
+    Le tableau est (N, 3), ou (N, 4) avec le rayon de chaque sphère en
+    dernière colonne en mode polydisperse.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        disposition = disposition_scene(scene, parametres)
+    
+    centres = disposition.centres
+    if np.ndim(disposition.rayon):
+        centres = np.column_stack([centres, disposition.rayon])
+    
+    tampon = io.BytesIO()
+    np.save(tampon, np.ascontiguousarray(centres, dtype=float))
+    return tampon.getvalue()
+
+def rendre_png(scene, parametres, dpi=100):
+    """
+    Construit la figure d'une scène et l'encode en PNG
+    """
+    import matplotlib.pyplot as plt
+    
+    # Les scripts affichent leur progression, inutile pour le service
+    with contextlib.redirect_stdout(io.StringIO()):
+        fig = construire_figure(scene, parametres)
+    
+    tampon = io.BytesIO()
+    try:
+        fig.savefig(tampon, format="png", dpi=dpi)
+    finally:
+        plt.close(fig)
+    return tampon.getvalue()
+
+class ServiceRendu:
+    """
+    Service HTTP local de statistiques, de centres et de rendus des scènes
+
+    Les calculs sont confiés à un ProcessPoolExecutor. Les requêtes
+    identiques en cours de calcul partagent le même calcul, et les
+    résultats terminés sont gardés dans un cache LRU borné en octets. Un
+    tirage aléatoire sans graine n'est jamais gardé en cache. Si un
+    processus de calcul meurt, le pool est recréé à la requête suivante.
+    """
+
+    def __init__(self, processus=None, taille_max=TAILLE_MAX_RESULTATS):
+        self.processus = processus or os.cpu_count() or 1
+        self.taille_max = taille_max
+        self.executeur = None
+        self.port = None
+        self.en_cours = {}
+        self.resultats = OrderedDict()
+        self.taille = 0
+        self.statistiques = {"requetes": 0, "calculs": 0, "partages": 0, "cache": 0}
+
+    def demarrer(self):
+        """
+        Crée le pool de processus de calcul
+
+        Les processus sont lancés par spawn : un fork hériterait des sockets
+        des connexions ouvertes, qui ne seraient alors jamais fermées.
+        """
+        if self.executeur is None:
+            self.executeur = ProcessPoolExecutor(max_workers=self.processus, initializer=initialiser_processus,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+
+    def arreter(self):
+        """
+        Arrête le pool de processus et vide les résultats en mémoire
+        """
+        if self.executeur is not None:
+            self.executeur.shutdown(cancel_futures=True)
+            self.executeur = None
+        self.resultats.clear()
+        self.taille = 0
+
+    def abandonner(self, executeur):
+        """
+        Abandonne un pool dont un processus est mort, il sera recréé à la
+        requête suivante
+        """
+        if self.executeur is executeur:
+            executeur.shutdown(wait=False, cancel_futures=True)
+            self.executeur = None
+
+    def garder(self, cle, corps):
+        """
+        Garde un résultat dans le cache puis évince les moins récemment utilisés
+        """
+        if len(corps) > self.taille_max:
+            return
+        self.resultats[cle] = corps
+        self.taille += len(corps)
+        while self.taille > self.taille_max:
+            _, ancien = self.resultats.popitem(last=False)
+            self.taille -= len(ancien)
+
+    async def resultat(self, ressource, scene, parametres, dpi=100):
+        """
+        Retourne le corps de la réponse d'une ressource, calculé au plus une
+        fois pour des requêtes identiques simultanées
+        """
+        self.statistiques["requetes"] += 1
+        cle = (ressource, scene, dpi if ressource == "rendu" else None, tuple(sorted(parametres.items())))
+        if cle in self.resultats:
+            self.statistiques["cache"] += 1
+            self.resultats.move_to_end(cle)
+            return self.resultats[cle]
+        
+        future = self.en_cours.get(cle)
+        if future is None:
+            self.demarrer()
+            executeur = self.executeur
+            if ressource == "statistiques":
+                appel = (calculer_statistiques, scene, parametres)
+            elif ressource == "centres":
+                appel = (calculer_centres, scene, parametres)
+            else:
+                appel = (rendre_png, scene, parametres, dpi)
+            try:
+                future = asyncio.get_running_loop().run_in_executor(executeur, *appel)
+            except BrokenProcessPool:
+                self.abandonner(executeur)
+                raise
+            self.en_cours[cle] = future
+            self.statistiques["calculs"] += 1
+            
+            reproductible = parametres.get("mode", "cubique") in MODES_EMPILEMENT or "graine" in parametres
+            
+            def terminer(future):
+                self.en_cours.pop(cle, None)
+                if future.cancelled():
+                    return
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self.abandonner(executeur)
+                elif reproductible and future.exception() is None:
+                    self.garder(cle, future.result())
+            
+            future.add_done_callback(terminer)
+        else:
+            self.statistiques["partages"] += 1
+        
+        # Une connexion interrompue ne doit pas annuler le calcul partagé
+        return await asyncio.shield(future)
+
+    async def traiter(self, methode, chemin):
+        """
+        Traite une requête et retourne (statut, type MIME, corps)
+        """
+        if methode != "GET":
+            return reponse_erreur(405, "Seule la méthode GET est acceptée!")
+        
+        url = urlsplit(chemin)
+        morceaux = [morceau for morceau in url.path.split("/") if morceau]
+        if morceaux == ["scenes"]:
+            scenes = {nom: {"dimensions": list(dimensions), "spheres": avec_spheres}
+                      for nom, (_, _, dimensions, avec_spheres) in SCENES.items()}
+            return reponse_json(200, {"scenes": scenes, "modes": list(MODES_DISPOSITION), "ressources": list(RESSOURCES)})
+        if morceaux == ["etat"]:
+            return reponse_json(200, dict(self.statistiques, en_cours=len(self.en_cours),
+                                          resultats=len(self.resultats), octets=self.taille))
+        if len(morceaux) != 2 or morceaux[0] not in RESSOURCES:
+            return reponse_erreur(404, f"Ressource inconnue: {url.path}")
+        
+        ressource, scene = morceaux
+        try:
+            parametres, dpi = lire_parametres(scene, parse_qs(url.query, keep_blank_values=True))
+            if ressource != "rendu" and not SCENES[scene][3]:
+                raise ValueError(f"La scène {scene!r} ne contient pas de sphères!")
+            corps = await self.resultat(ressource, scene, parametres, dpi)
+        except (ValueError, OverflowError) as erreur:
+            return reponse_erreur(400, str(erreur))
+        except Exception as erreur:
+            return reponse_erreur(500, f"{type(erreur).__name__}: {erreur}")
+        
+        return 200, RESSOURCES[ressource], corps
+
+    async def connexion(self, lecteur, ecrivain):
+        """
+        Lit une requête HTTP/1.1 sur une connexion, y répond puis la ferme
+        """
+        try:
+            try:
+                ligne = await asyncio.wait_for(lecteur.readline(), DELAI_LECTURE)
+                methode, chemin, _ = ligne.decode("latin-1").split()
+                # En-têtes ignorés, jusqu'à la ligne vide
+                while (await asyncio.wait_for(lecteur.readline(), DELAI_LECTURE)).strip():
+                    pass
+            except (asyncio.TimeoutError, ValueError, UnicodeDecodeError):
+                statut, type_mime, corps = reponse_erreur(400, "Requête HTTP invalide!")
+            else:
+                statut, type_mime, corps = await self.traiter(methode, chemin)
+            
+            entetes = (f"HTTP/1.1 {statut} {STATUTS[statut]}\r\n"
+                       f"Content-Type: {type_mime}\r\n"
+                       f"Content-Length: {len(corps)}\r\n"
+                       "Connection: close\r\n\r\n")
+            ecrivain.write(entetes.encode("latin-1") + corps)
+            await ecrivain.drain()
+        except ConnectionError:
+            pass
+        finally:
+            ecrivain.close()
+
+    async def servir(self, port=PORT, pret=None):
+        """
+        Sert les requêtes sur la boucle locale jusqu'à l'annulation de la tâche
+
+        pret, s'il est donné, est un asyncio.Event levé une fois le port ouvert.
+        """
+        self.demarrer()
+        serveur = await asyncio.start_server(self.connexion, HOTE, port)
+        self.port = serveur.sockets[0].getsockname()[1]
+        if pret is not None:
+            pret.set()
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            self.arreter()
+
+def reponse_json(statut, donnees):
+    """
+    Réponse (statut, type MIME, corps) contenant un document JSON
+    """
+    return statut, "application/json", json.dumps(donnees, ensure_ascii=False).encode("utf-8")
+
+def reponse_erreur(statut, message):
+    """
+    Réponse d'erreur JSON {"erreur": message}
+    """
+    return reponse_json(statut, {"erreur": message})
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande du service HTTP local
+    """
+    parser = argparse.ArgumentParser(description="Service HTTP local de statistiques, de centres et de rendus")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port d'écoute sur {HOTE} (défaut: {PORT})")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut: tous les cœurs)")
+    parser.add_argument("--cache", type=int, default=TAILLE_MAX_RESULTATS // (1024 * 1024),
+                        help="Taille maximale des résultats en mémoire, en Mo")
+    args = parser.parse_args(arguments)
+    
+    service = ServiceRendu(args.processus, args.cache * 1024 * 1024)
+    print(f"Service à l'écoute sur http://{HOTE}:{args.port}/ (Ctrl+C pour arrêter)")
+    try:
+        asyncio.run(service.servir(args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
\ No newline at end of file
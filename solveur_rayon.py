@@ -0,0 +1,272 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from geometrie import calculer_volume_croix, decomposer_croix
+from reseau_spheres import MODES_EMPILEMENT, compter_centres_boite_tableau, nombre_par_axe_tableau, parametres_reseau, verifier_mode
+from statistiques import volume_sphere
+
+# Nombre de sphères au-delà duquel on ne cherche plus de rayon plus petit
+NOMBRE_MAX_SPHERES = 10**7
+
+# Compacité maximale d'un empilement de sphères égales (cfc ou hc, ~74 %)
+COMPACITE_MAX = math.pi / (3 * math.sqrt(2))
+
+# Écart relatif sous un rayon critique, pour tomber du bon côté du saut de compte
+ECART_CRITIQUE = 1e-12
+
+# Nombre de lignes du front de Pareto affichées par défaut
+LIGNES_AFFICHEES = 15
+
+def pas_critiques(mode):
+    """
+    Retourne, pour chaque axe (0 = x, 1 = y, 2 = z), les couples (décalage, pas)
+    exprimés en diamètres qui font varier le compte de sphères le long de l'axe
+
+    Le long d'un axe de longueur L, le compte saute pour les rayons
+    r = L / (2 * (1 + décalage + pas * n)), n entier positif ou nul.
+    """
+    if mode == "cubique":
+        return {0: [(0.0, 1.0)], 1: [(0.0, 1.0)], 2: [(0.0, 1.0)]}
+
+    pas_rangee, pas_couche, decalage_y, decalage_x = parametres_reseau(mode, 1.0)
+    return {0: sorted({(decalage_x(t, q), 1.0) for t in (0, 1) for q in (0, 1)}),
+            1: sorted({(decalage_y(t), pas_rangee) for t in (0, 1)}),
+            2: [(0.0, pas_couche)]}
+
+def rayons_critiques(regions, hauteur, mode, rayon_min, rayon_max):
+    """
+    Rayons de [rayon_min, rayon_max] auxquels le compte de sphères d'au moins
+    une région change, triés par ordre décroissant
+
+    Entre deux rayons critiques le compte est constant : le taux de
+    remplissage y croît avec le rayon et atteint son maximum au rayon
+    critique supérieur.
+    """
+    rayons = [np.array([rayon_max])]
+    pas = pas_critiques(mode)
+    for largeur, longueur in regions:
+        for axe, dimension in enumerate((largeur, longueur, hauteur)):
+            for decalage, pas_axe in pas[axe]:
+                n_max = math.floor((dimension / (2 * rayon_min) - 1 - decalage) / pas_axe)
+                if n_max >= 0:
+                    rayons.append(dimension / (2 * (1 + decalage + pas_axe * np.arange(n_max + 1))))
+
+    rayons = np.concatenate(rayons)
+    rayons = rayons[(rayons >= rayon_min) & (rayons <= rayon_max)]
+    return np.unique(rayons)[::-1]
+
+def evaluer_rayons(regions, hauteur, volume, rayons, mode):
+    """
+    Évalue pour un tableau de rayons le nombre de sphères, le taux de
+    remplissage (%) et le jeu entre sphères voisines
+
+    Le jeu est l'espace libre entre deux sphères voisines, le double de
+    l'écart à la paroi. Il n'est non nul qu'en mode cubique, où chaque
+    sphère est centrée dans son sous-volume : en cfc et hc, les sphères
+    voisines se touchent.
+    """
+    diametres = 2 * rayons
+    nombres = sum(compter_centres_boite_tableau(largeur, longueur, hauteur, diametres, mode)
+                  for largeur, longueur in regions)
+
+    jeux = np.zeros(len(rayons))
+    if mode == "cubique":
+        cellules = [dimension / nombre_par_axe_tableau(dimension, diametres)
+                    for largeur, longueur in regions for dimension in (largeur, longueur)]
+        cellules.append(hauteur / nombre_par_axe_tableau(hauteur, diametres))
+        jeux = np.min(cellules, axis=0) - diametres
+
+    return nombres, nombres * volume_sphere(rayons) / volume * 100, jeux
+
+def rayons_candidats(regions, hauteur, mode, rayon_min, rayon_max, jeu):
+    """
+    Meilleur rayon de chaque intervalle à compte constant
+
+    Sans jeu imposé, c'est le rayon critique qui borne l'intervalle par le
+    haut, juste en dessous du saut de compte. En mode cubique avec un jeu,
+    le rayon est réduit jusqu'à laisser ce jeu entre les sphères.
+    """
+    rayons = rayons_critiques(regions, hauteur, mode, rayon_min, rayon_max)
+
+    # Un rayon critique calculé peut tomber juste après le saut : on garde
+    # le rayon exact si le compte y est déjà celui de l'intervalle
+    inferieurs = rayons * (1 - ECART_CRITIQUE)
+    exacts, _, _ = evaluer_rayons(regions, hauteur, 1.0, rayons, mode)
+    nombres, _, jeux = evaluer_rayons(regions, hauteur, 1.0, inferieurs, mode)
+    rayons = np.where(exacts == nombres, rayons, inferieurs)
+
+    if jeu > 0 and mode == "cubique":
+        rayons = np.minimum(rayons, (jeux + 2 * inferieurs - jeu) / 2)
+        rayons = rayons[rayons > 0]
+
+    return rayons
+
+def verifier_objectifs(taux, nombre, jeu):
+    """
+    Vérifie les objectifs de la recherche
+    """
+    if taux is not None and not 0 < taux < 100:
+        raise ValueError("Le taux de remplissage visé doit être compris entre 0 et 100%!")
+    if nombre is not None and nombre < 1:
+        raise ValueError("Le nombre de sphères visé doit être au moins 1!")
+    if jeu < 0:
+        raise ValueError("Le jeu minimal ne peut pas être négatif!")
+
+def resoudre_regions(regions, hauteur, volume, taux=None, nombre=None, jeu=0.0, modes=MODES_EMPILEMENT):
+    """
+    Cherche le rayon et le mode d'empilement qui atteignent les objectifs
+    sur une structure découpée en régions (largeur, longueur) de même hauteur
+
+    Les objectifs sont un taux de remplissage minimal (%), un nombre minimal
+    de sphères et un jeu minimal entre sphères voisines. L'optimum est le
+    plus grand rayon qui les respecte ; si seul le jeu est imposé, c'est la
+    solution de plus fort taux de remplissage.
+
+    Retourne un dictionnaire avec l'optimum (None si aucune solution) et le
+    front de Pareto des solutions admissibles (rayon et taux maximaux), trié
+    par rayon décroissant. Chaque solution est un dictionnaire (mode,
+    rayon_sphere, nombre_total, taux_remplissage, jeu).
+    """
+    verifier_objectifs(taux, nombre, jeu)
+    for mode in modes:
+        verifier_mode(mode)
+
+    # Les sphères doivent tenir dans chaque région ; en dessous de rayon_min,
+    # le compte dépasserait NOMBRE_MAX_SPHERES (ou le nombre visé)
+    rayon_max = min(min(min(region) for region in regions), hauteur) / 2
+    nombre_max = max(NOMBRE_MAX_SPHERES, nombre or 0)
+    rayon_min = min((COMPACITE_MAX * volume / (nombre_max * volume_sphere(1.0))) ** (1 / 3), rayon_max)
+
+    colonnes = []
+    for mode in modes:
+        rayons = rayons_candidats(regions, hauteur, mode, rayon_min, rayon_max, jeu)
+        nombres, taux_remplissage, jeux = evaluer_rayons(regions, hauteur, volume, rayons, mode)
+
+        admissibles = jeux >= jeu - ECART_CRITIQUE * 2 * rayons
+        if taux is not None:
+            admissibles &= taux_remplissage >= taux
+        if nombre is not None:
+            admissibles &= nombres >= nombre
+        colonnes.append((np.full(admissibles.sum(), mode), rayons[admissibles], nombres[admissibles],
+                         taux_remplissage[admissibles], jeux[admissibles]))
+
+    modes_solutions, rayons, nombres, taux_remplissage, jeux = (np.concatenate(colonne) for colonne in zip(*colonnes))
+
+    # Front de Pareto : par rayon décroissant, on ne garde que les solutions
+    # qui améliorent le meilleur taux déjà rencontré
+    ordre = np.lexsort((-taux_remplissage, -rayons))
+    meilleur_avant = np.concatenate([[-np.inf], np.maximum.accumulate(taux_remplissage[ordre])[:-1]])
+    front = ordre[taux_remplissage[ordre] > meilleur_avant]
+
+    pareto = [{"mode": str(modes_solutions[i]), "rayon_sphere": float(rayons[i]), "nombre_total": int(nombres[i]),
+               "taux_remplissage": float(taux_remplissage[i]), "jeu": float(jeux[i])} for i in front]
+
+    optimum = None
+    if pareto:
+        optimum = pareto[0] if taux is not None or nombre is not None else pareto[-1]
+
+    return {"optimum": optimum, "pareto": pareto}
+
+def resoudre_boite(largeur, longueur, hauteur, taux=None, nombre=None, jeu=0.0, modes=MODES_EMPILEMENT):
+    """
+    Cherche le rayon et le mode d'empilement optimaux pour un parallélépipède
+    """
+    return resoudre_regions([(largeur, longueur)], hauteur, largeur * longueur * hauteur,
+                            taux, nombre, jeu, modes)
+
+def resoudre_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, taux=None, nombre=None, jeu=0.0, modes=MODES_EMPILEMENT):
+    """
+    Cherche le rayon et le mode d'empilement optimaux pour le plan en croix
+    """
+    regions = [(largeur, longueur) for _, _, _, largeur, longueur in
+               decomposer_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)]
+    volume = calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
+    return resoudre_regions(regions, hauteur, volume, taux, nombre, jeu, modes)
+
+def afficher_solutions(resultat, lignes=LIGNES_AFFICHEES):
+    """
+    Affiche l'optimum puis le front de Pareto sous forme de tableau
+    """
+    optimum = resultat["optimum"]
+    if optimum is None:
+        print("\nAucune solution ne respecte ces objectifs!")
+        return
+
+    print("\n=== Solution optimale ===")
+    print(f"Mode d'empilement: {optimum['mode']}")
+    print(f"Rayon des sphères: {optimum['rayon_sphere']:.4f}")
+    print(f"Nombre de sphères: {optimum['nombre_total']}")
+    print(f"Taux de remplissage: {optimum['taux_remplissage']:.1f}%")
+    print(f"Jeu entre sphères voisines: {optimum['jeu']:.4f}")
+
+    pareto = resultat["pareto"]
+    print(f"\n=== Alternatives (front de Pareto rayon / taux, {len(pareto)} solutions) ===")
+    print(f"  {'Mode':<8} {'Rayon':>10} {'Sphères':>10} {'Taux':>7} {'Jeu':>9}")
+    for solution in pareto[:lignes]:
+        marque = "*" if solution is optimum else " "
+        print(f"{marque} {solution['mode']:<8} {solution['rayon_sphere']:>10.4f} {solution['nombre_total']:>10} "
+              f"{solution['taux_remplissage']:>6.1f}% {solution['jeu']:>9.4f}")
+    if len(pareto) > lignes:
+        print(f"  ... {len(pareto) - lignes} autres solutions")
+
+def saisir_objectifs():
+    """
+    Demande les objectifs de la recherche, une saisie vide laissant l'objectif libre
+    """
+    saisie = input("Taux de remplissage visé en % (vide = libre): ").strip()
+    taux = float(saisie) if saisie else None
+    saisie = input("Nombre minimal de sphères (vide = libre): ").strip()
+    nombre = int(saisie) if saisie else None
+    saisie = input("Jeu minimal entre sphères voisines [0]: ").strip()
+    jeu = float(saisie) if saisie else 0.0
+    return taux, nombre, jeu
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande, affiche l'optimum et le front de Pareto
+    """
+    parser = argparse.ArgumentParser(description="Recherche du rayon et du mode d'empilement pour un objectif de remplissage")
+    parser.add_argument("--mode", action="append", choices=MODES_EMPILEMENT,
+                        help="Mode d'empilement à explorer (répétable, tous par défaut)")
+    parser.add_argument("--taux", type=float, help="Taux de remplissage minimal visé (%%)")
+    parser.add_argument("--nombre", type=int, help="Nombre minimal de sphères")
+    parser.add_argument("--jeu", type=float, default=0.0, help="Jeu minimal entre sphères voisines")
+    parser.add_argument("--lignes", type=int, default=LIGNES_AFFICHEES, help="Nombre de lignes du front affichées")
+    parser.add_argument("--json", action="store_true", help="Affiche le résultat complet en JSON")
+    sous_parsers = parser.add_subparsers(dest="forme", required=True)
+
+    parser_boite = sous_parsers.add_parser("boite", help="Parallélépipède")
+    for nom in ["largeur", "longueur", "hauteur"]:
+        parser_boite.add_argument(nom, type=float)
+
+    parser_croix = sous_parsers.add_parser("croix", help="Plan en croix")
+    for nom in ["largeur_centrale", "longueur_centrale", "largeur_bras", "longueur_bras", "hauteur"]:
+        parser_croix.add_argument(nom, type=float)
+
+    args = vars(parser.parse_args(arguments))
+    forme = args.pop("forme")
+    objectifs = {"taux": args.pop("taux"), "nombre": args.pop("nombre"), "jeu": args.pop("jeu"),
+                 "modes": args.pop("mode") or MODES_EMPILEMENT}
+    lignes = args.pop("lignes")
+    en_json = args.pop("json")
+    if any(val <= 0 for val in args.values()):
+        parser.error("Toutes les valeurs doivent être positives!")
+
+    try:
+        if forme == "boite":
+            resultat = resoudre_boite(**args, **objectifs)
+        else:
+            resultat = resoudre_croix(**args, **objectifs)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+
+    if en_json:
+        print(json.dumps(resultat, indent=2, ensure_ascii=False))
+    else:
+        afficher_solutions(resultat, lignes)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
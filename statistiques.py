@@ -0,0 +1,196 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from empreinte import (aire_polygone, compter_centres_empreinte, normaliser_polygone, polygone_croix, polygone_rectangle,
+                       remplir_empreinte)
+from geometrie import calculer_nombre_par_axe, calculer_volume_croix, decomposer_croix
+from reseau_spheres import MODES_EMPILEMENT, compter_centres_boite, verifier_mode
+from voxels import voxeliser_empreinte
+
+def volume_sphere(rayon_sphere):
+    """
+    Calcule le volume d'une sphère
+    """
+    return (4/3) * math.pi * rayon_sphere**3
+
+def compter_spheres_region(largeur, longueur, hauteur, diametre, mode="cubique"):
+    """
+    Compte les sphères d'une région sans générer leurs positions
+    """
+    if mode == "cubique":
+        nx, ny, nz = calculer_nombre_par_axe(largeur, longueur, hauteur, diametre)
+        return {"nx": nx, "ny": ny, "nz": nz, "nombre": nx * ny * nz}
+    
+    return {"nombre": compter_centres_boite(largeur, longueur, hauteur, diametre, mode)}
+
+def assembler_statistiques(regions, volume_structure, rayon_sphere, mode):
+    """
+    Assemble les comptes par région en un dictionnaire de statistiques
+
+    rayon_sphere est un nombre, ou un tableau (N,) d'un rayon par sphère :
+    le volume des sphères est alors la somme de leurs volumes réels et
+    volume_sphere leur volume moyen.
+    """
+    nombre_total = sum(region["nombre"] for region in regions)
+    stats = {"mode": mode, "regions": regions, "nombre_total": nombre_total, "volume_structure": volume_structure}
+    
+    if np.ndim(rayon_sphere) == 0:
+        volume_une_sphere = volume_sphere(rayon_sphere)
+        volume_total_spheres = nombre_total * volume_une_sphere
+    else:
+        rayons = np.asarray(rayon_sphere, dtype=float)
+        volume_total_spheres = float(np.sum(volume_sphere(rayons)))
+        volume_une_sphere = volume_total_spheres / max(nombre_total, 1)
+        stats["rayon_min"] = float(rayons.min()) if len(rayons) else 0.0
+        stats["rayon_max"] = float(rayons.max()) if len(rayons) else 0.0
+    
+    stats.update({
+        "volume_sphere": volume_une_sphere,
+        "volume_total_spheres": volume_total_spheres,
+        "taux_remplissage": (volume_total_spheres / volume_structure) * 100,
+    })
+    return stats
+
+def statistiques_boite(largeur, longueur, hauteur, rayon_sphere, mode="cubique"):
+    """
+    Calcule en O(1) le nombre de sphères et le taux de remplissage d'un parallélépipède
+    """
+    verifier_mode(mode)
+    region = compter_spheres_region(largeur, longueur, hauteur, 2 * rayon_sphere, mode)
+    region["nom"] = "Parallélépipède"
+    
+    return assembler_statistiques([region], largeur * longueur * hauteur, rayon_sphere, mode)
+
+def statistiques_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, rayon_sphere, mode="cubique"):
+    """
+    Calcule en O(1) le nombre de sphères et le taux de remplissage de la croix
+    """
+    verifier_mode(mode)
+    regions = []
+    for nom, _, _, largeur, longueur in decomposer_croix(
+            largeur_centrale, longueur_centrale, largeur_bras, longueur_bras):
+        region = compter_spheres_region(largeur, longueur, hauteur, 2 * rayon_sphere, mode)
+        region["nom"] = nom
+        regions.append(region)
+    
+    volume_croix = calculer_volume_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur)
+    return assembler_statistiques(regions, volume_croix, rayon_sphere, mode)
+
+def statistiques_empreinte(polygone, hauteur, rayon_sphere, mode="cubique"):
+    """
+    Calcule le nombre de sphères et le taux de remplissage du prisme d'un polygone quelconque
+
+    Le masque n'est évalué que dans le plan, sans générer les positions 3D.
+    """
+    verifier_mode(mode)
+    polygone = normaliser_polygone(polygone)
+    region = {"nom": "Empreinte", "nombre": compter_centres_empreinte(polygone, hauteur, rayon_sphere, mode)}
+    
+    return assembler_statistiques([region], aire_polygone(polygone) * hauteur, rayon_sphere, mode)
+
+def statistiques_flux(blocs, volume_structure, rayon_sphere, mode="cubique", nom="Disposition"):
+    """
+    Calcule les statistiques d'une disposition fournie par blocs de centres,
+    sans la garder en mémoire
+    """
+    nombre = nombre_blocs = 0
+    for bloc in blocs:
+        nombre += len(bloc)
+        nombre_blocs += 1
+    region = {"nom": nom, "nombre": nombre, "blocs": nombre_blocs}
+    
+    return assembler_statistiques([region], volume_structure, rayon_sphere, mode)
+
+def statistiques_disposition(centres, rayons, volume_structure, mode="cubique", nom="Disposition", grille=None):
+    """
+    Calcule les statistiques d'une disposition générée, avec un rayon
+    unique ou un rayon par sphère
+
+    grille est une GrilleVoxels optionnelle de la structure et de ses murs :
+    les sphères y sont ajoutées et les volumes mesurés, où une sphère coupée
+    par un mur ne compte que pour sa partie libre, vont sous "voxels".
+    """
+    region = {"nom": nom, "nombre": len(centres)}
+    stats = assembler_statistiques([region], volume_structure, rayons, mode)
+    if grille is not None:
+        stats["voxels"] = grille.ajouter_spheres(centres, rayons).statistiques()
+    return stats
+
+def statistiques_voxels(polygone, hauteur, rayon_sphere, resolution, mode="cubique", epaisseur_mur=0.0):
+    """
+    Mesure sur une grille de voxels le remplissage en réseau du prisme d'un
+    polygone, avec des murs d'épaisseur donnée qui recouvrent les sphères du bord
+    """
+    polygone = normaliser_polygone(polygone)
+    centres = remplir_empreinte(polygone, hauteur, rayon_sphere, mode)
+    grille = voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur)
+    volume_structure = aire_polygone(polygone) * hauteur
+    return statistiques_disposition(centres, rayon_sphere, volume_structure, mode, "Empreinte", grille)
+
+def afficher_statistiques(stats, libelle_volume):
+    """
+    Affiche le bloc de statistiques dans le format des scripts interactifs
+    """
+    print(f"\n=== Statistiques (empilement {stats['mode']}) ===")
+    print(f"{libelle_volume}: {stats['volume_structure']:.2f}")
+    if "rayon_min" in stats:
+        print(f"Rayons des sphères: {stats['rayon_min']:.2f} à {stats['rayon_max']:.2f}")
+        print(f"Volume moyen d'une sphère: {stats['volume_sphere']:.2f}")
+    else:
+        print(f"Volume d'une sphère: {stats['volume_sphere']:.2f}")
+    print(f"Volume total des sphères: {stats['volume_total_spheres']:.2f}")
+    print(f"Taux de remplissage: {stats['taux_remplissage']:.1f}%")
+
+def main(arguments=None):
+    """
+    Point d'entrée en ligne de commande, affiche les statistiques en JSON
+    """
+    parser = argparse.ArgumentParser(description="Statistiques analytiques d'un remplissage de sphères")
+    parser.add_argument("--mode", default="cubique", choices=MODES_EMPILEMENT, help="Mode d'empilement")
+    parser.add_argument("--resolution", type=float, default=None,
+                        help="Côté des voxels : ajoute les volumes mesurés sur une grille de voxels")
+    parser.add_argument("--epaisseur-mur", type=float, default=0.0,
+                        help="Épaisseur des murs de la mesure par voxels (défaut: 0, sans murs)")
+    sous_parsers = parser.add_subparsers(dest="forme", required=True)
+    
+    parser_boite = sous_parsers.add_parser("boite", help="Parallélépipède")
+    for nom in ["largeur", "longueur", "hauteur", "rayon_sphere"]:
+        parser_boite.add_argument(nom, type=float)
+    
+    parser_croix = sous_parsers.add_parser("croix", help="Plan en croix")
+    for nom in ["largeur_centrale", "longueur_centrale", "largeur_bras", "longueur_bras", "hauteur", "rayon_sphere"]:
+        parser_croix.add_argument(nom, type=float)
+    
+    args = vars(parser.parse_args(arguments))
+    forme = args.pop("forme")
+    mode = args.pop("mode")
+    resolution = args.pop("resolution")
+    epaisseur_mur = args.pop("epaisseur_mur")
+    valeurs = list(args.values()) + [epaisseur_mur] + ([] if resolution is None else [resolution])
+    if not all(math.isfinite(val) for val in valeurs):
+        parser.error("Toutes les valeurs doivent être des nombres finis!")
+    if any(val <= 0 for val in args.values()) or (resolution is not None and resolution <= 0) or epaisseur_mur < 0:
+        parser.error("Toutes les valeurs doivent être positives!")
+    
+    if forme == "boite":
+        stats = statistiques_boite(**args, mode=mode)
+        polygone = polygone_rectangle(0, 0, args["largeur"], args["longueur"])
+    else:
+        stats = statistiques_croix(**args, mode=mode)
+        polygone = polygone_croix(args["largeur_centrale"], args["longueur_centrale"],
+                                  args["largeur_bras"], args["longueur_bras"])
+    
+    if resolution is not None:
+        try:
+            mesure = statistiques_voxels(polygone, args["hauteur"], args["rayon_sphere"], resolution, mode, epaisseur_mur)
+        except ValueError as erreur:
+            parser.error(str(erreur))
+        stats["voxels"] = dict(mesure["voxels"], nombre_spheres=mesure["nombre_total"])
+    
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from disposition import DispositionSpheres, type_indices
+
+def test_region_en_vues():
+    rng = np.random.default_rng(0)
+    blocs = [rng.random((5, 3)), rng.random((7, 3)), rng.random((2, 3))]
+    disposition = DispositionSpheres.depuis_blocs(blocs, 0.5, ["centre", "bras", "haut"])
+
+    region = disposition.region("bras")
+    np.testing.assert_array_equal(region.centres, blocs[1])
+    assert np.shares_memory(region.donnees, disposition.donnees)
+    assert np.shares_memory(region.regions, disposition.regions)
+    np.testing.assert_array_equal(disposition.region("haut").centres, blocs[2])
+
+def test_region_non_contigue():
+    centres = np.arange(12.0).reshape(4, 3)
+    disposition = DispositionSpheres(centres, 0.5, regions=[0, 1, 0, 1], noms_regions=["a", "b"])
+    np.testing.assert_array_equal(disposition.region("b").centres, centres[[1, 3]])
+    with pytest.raises(ValueError):
+        disposition.region("c")
+
+def test_coordonnees_reseau():
+    indices = np.array([[0, 1, 2], [3, 4, 5]])
+    disposition = DispositionSpheres.depuis_reseau(indices, [1.0, 2.0, 3.0], [0.5, 0.25, 2.0], 0.1)
+    np.testing.assert_allclose(np.column_stack(disposition.colonnes()), disposition.centres)
+    np.testing.assert_allclose(disposition.x, [1.0, 2.5])
+    np.testing.assert_allclose(disposition.z, [7.0, 13.0])
+
+def test_type_indices():
+    assert type_indices(np.array([-3, 40])) == np.int16
+    assert type_indices(np.array([0, 40000])) == np.int32
+    assert type_indices(np.array([0.0, 3e9])) == np.int64
+    for trop_grand in (1e19, np.inf, np.nan):
+        with pytest.raises(ValueError):
+            type_indices(np.array([0.0, trop_grand]))
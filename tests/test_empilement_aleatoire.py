@@ -0,0 +1,81 @@
+import math
+import time
+
+import numpy as np
+
+from empilement_aleatoire import (generer_centres_aleatoires, generer_centres_aleatoires_boite, remplir_polydisperse,
+                                  tirer_rayons)
+from empreinte import points_dans_empreinte, polygone_croix, polygone_rectangle
+
+def verifier_sans_chevauchement(centres, rayons):
+    """
+    Vérifie par force brute qu'aucune paire de sphères ne se chevauche
+    """
+    rayons = np.broadcast_to(rayons, (len(centres),))
+    d = np.linalg.norm(centres[:, None, :] - centres[None, :, :], axis=2)
+    limite = (rayons[:, None] + rayons[None, :]) * (1 - 1e-9)
+    np.fill_diagonal(d, np.inf)
+    assert not np.any(d < limite)
+
+def verifier_dans_boite(centres, rayons, bas, haut):
+    rayons = np.broadcast_to(rayons, (len(centres),))[:, None]
+    assert np.all(centres - rayons >= np.asarray(bas) - 1e-12)
+    assert np.all(centres + rayons <= np.asarray(haut) + 1e-12)
+
+def verifier_dans_prisme(centres, rayons, polygone, hauteur):
+    rayons = np.broadcast_to(rayons, (len(centres),))
+    assert points_dans_empreinte(polygone, centres[:, :2], rayons * (1 - 1e-9)).all()
+    assert np.all(centres[:, 2] - rayons >= -1e-12) and np.all(centres[:, 2] + rayons <= hauteur + 1e-12)
+
+def test_aleatoire_boite():
+    centres = generer_centres_aleatoires_boite(0.0, 0.0, 3.0, 3.0, 2.0, 0.15, graine=0)
+    verifier_sans_chevauchement(centres, 0.15)
+    verifier_dans_boite(centres, 0.15, (0.0, 0.0, 0.0), (3.0, 3.0, 2.0))
+    # Saturation : environ 38 % loin des parois, un peu moins avec elles
+    assert len(centres) * 4 / 3 * np.pi * 0.15 ** 3 / 18.0 > 0.3
+    np.testing.assert_array_equal(centres, generer_centres_aleatoires_boite(0.0, 0.0, 3.0, 3.0, 2.0, 0.15, graine=0))
+    assert len(generer_centres_aleatoires_boite(0.0, 0.0, 3.0, 3.0, 2.0, 0.15, nombre=50, graine=0)) == 50
+
+def test_aleatoire_croix():
+    polygone = polygone_croix(3.0, 2.5, 1.0, 1.5)
+    centres = generer_centres_aleatoires(polygone, 1.5, 0.12, graine=1)
+    assert len(centres) > 500
+    verifier_sans_chevauchement(centres, 0.12)
+    verifier_dans_prisme(centres, 0.12, polygone, 1.5)
+
+def test_lois_rayons_tronquees():
+    generateur = np.random.default_rng(0)
+    for loi in ("normale", "lognormale"):
+        for dispersion in (0.25, 0.6, 1.5):
+            rayons = tirer_rayons(0.15, dispersion, loi, 200000, generateur)
+            assert rayons.min() >= 0.05 * 0.15
+    lognormaux = tirer_rayons(0.15, 0.6, "lognormale", 200000, generateur)
+    assert lognormaux.min() >= 0.15 * math.exp(-1.8) * (1 - 1e-12)
+    assert lognormaux.max() <= 0.15 * math.exp(1.8) * (1 + 1e-12)
+
+def test_polydisperse_loi_large():
+    # Loi lognormale large : le plus petit rayon borne le coût de l'élagage
+    polygone = polygone_rectangle(0.0, 0.0, 4.0, 4.0)
+    debut = time.perf_counter()
+    centres, rayons = remplir_polydisperse(polygone, 2.0, 0.15, loi="lognormale", dispersion=0.6, graine=0)
+    assert time.perf_counter() - debut < 30.0
+
+    assert len(centres) > 200
+    assert rayons.min() >= 0.15 * math.exp(-1.8) * (1 - 1e-12)
+    assert np.sum(4 / 3 * np.pi * rayons ** 3) / 32.0 > 0.35
+    verifier_sans_chevauchement(centres, rayons)
+    verifier_dans_boite(centres, rayons, (0.0, 0.0, 0.0), (4.0, 4.0, 2.0))
+
+def test_polydisperse_croix():
+    polygone = polygone_croix(3.0, 2.5, 1.0, 1.5)
+    centres, rayons = remplir_polydisperse(polygone, 1.5, 0.12, graine=2)
+    assert len(centres) > 500
+    verifier_sans_chevauchement(centres, rayons)
+    verifier_dans_prisme(centres, rayons, polygone, 1.5)
+
+    # Rayons imposés : chaque sphère placée garde l'un d'eux
+    imposes = np.linspace(0.08, 0.2, 300)
+    centres, rayons = remplir_polydisperse(polygone, 1.5, 0.12, rayons=imposes, graine=3)
+    assert np.isin(rayons, imposes).all() and len(np.unique(rayons)) == len(rayons)
+    verifier_sans_chevauchement(centres, rayons)
+    verifier_dans_prisme(centres, rayons, polygone, 1.5)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from empreinte import (aire_polygone, compter_centres_empreinte, decaler_polygone, iterer_remplir_empreinte,
+                       points_dans_polygone, points_dans_polygone_epars, polygone_croix, polygone_rectangle, projeter_sur_bord,
+                       remplir_empreinte)
+from reseau_spheres import MODES_EMPILEMENT, generer_centres_boite
+from statistiques import main as statistiques_main
+from statistiques import statistiques_boite, statistiques_empreinte
+
+def dans_polygone_brut(polygone, x, y):
+    dedans = False
+    for i in range(len(polygone)):
+        (x1, y1), (x2, y2) = polygone[i], polygone[(i + 1) % len(polygone)]
+        if (y1 > y) != (y2 > y) and x1 + (y - y1) * (x2 - x1) / (y2 - y1) <= x:
+            dedans = not dedans
+    return dedans
+
+@pytest.mark.parametrize("test", [points_dans_polygone, points_dans_polygone_epars])
+def test_points_dans_polygone(test):
+    polygone = polygone_croix(6, 5, 2, 3)
+    rng = np.random.default_rng(0)
+    grille = np.stack(np.meshgrid(np.linspace(-1, 11, 37), np.linspace(-1, 12, 41)), axis=-1).reshape(-1, 2)
+    points = np.concatenate([grille, rng.uniform(-1, 12, (2000, 2))])
+
+    attendu = [dans_polygone_brut(polygone, x, y) for x, y in points]
+    np.testing.assert_array_equal(test(polygone, points), attendu)
+
+@pytest.mark.parametrize("mode", MODES_EMPILEMENT)
+@pytest.mark.parametrize("largeur, longueur, hauteur, rayon", [(5, 4, 3, 0.5), (3.3, 2.7, 4.1, 0.37)])
+def test_rectangle_comme_boite(mode, largeur, longueur, hauteur, rayon):
+    polygone = polygone_rectangle(0, 0, largeur, longueur)
+    nombre = statistiques_boite(largeur, longueur, hauteur, rayon, mode)["nombre_total"]
+
+    assert len(generer_centres_boite(0, 0, largeur, longueur, hauteur, 2 * rayon, mode=mode)) == nombre
+    assert len(remplir_empreinte(polygone, hauteur, rayon, mode)) == nombre
+    assert statistiques_empreinte(polygone, hauteur, rayon, mode)["nombre_total"] == nombre
+
+@pytest.mark.parametrize("mode", MODES_EMPILEMENT)
+def test_croix_remplie(mode):
+    polygone = polygone_croix(6, 5, 2, 3)
+    hauteur, rayon = 2.0, 0.3
+    centres = remplir_empreinte(polygone, hauteur, rayon, mode)
+
+    assert len(centres) == compter_centres_empreinte(polygone, hauteur, rayon, mode)
+    assert len(centres) == statistiques_empreinte(polygone, hauteur, rayon, mode)["nombre_total"]
+
+    # Aucune sphère ne dépasse du contour, du sol ou du plafond
+    assert points_dans_polygone(polygone, centres[:, :2]).all()
+    assert (projeter_sur_bord(polygone, centres[:, :2])[1] >= rayon - 1e-9).all()
+    assert (centres[:, 2] >= rayon - 1e-9).all() and (centres[:, 2] <= hauteur - rayon + 1e-9).all()
+
+    blocs = list(iterer_remplir_empreinte(polygone, hauteur, rayon, mode, taille_bloc=100))
+    assert max(len(bloc) for bloc in blocs) <= 100
+    flux = np.concatenate(blocs)
+    np.testing.assert_array_equal(np.unique(flux, axis=0), np.unique(centres, axis=0))
+
+@pytest.mark.parametrize("epaisseur", [0.0, -0.2, float("nan"), 1.0, 1.5])
+def test_decalage_epaisseur_invalide(epaisseur):
+    # Bras de largeur 2 : les murs doivent rester sous 1
+    with pytest.raises(ValueError):
+        decaler_polygone(polygone_croix(6, 5, 2, 3), epaisseur)
+
+def test_decalage_croix():
+    # Le contour intérieur est la croix de largeurs réduites de deux épaisseurs
+    interieur = decaler_polygone(polygone_croix(6, 5, 2, 3), 0.4)
+    assert aire_polygone(interieur) == pytest.approx(aire_polygone(polygone_croix(5.2, 4.2, 1.2, 3)))
+
+@pytest.mark.parametrize("arguments", [
+    ["boite", "nan", "2", "2", "0.5"],
+    ["boite", "inf", "2", "2", "0.5"],
+    ["croix", "6", "5", "2", "3", "2", "nan"],
+    ["--resolution", "nan", "boite", "2", "2", "2", "0.5"],
+    ["--epaisseur-mur", "inf", "boite", "2", "2", "2", "0.5"],
+])
+def test_statistiques_cli_valeurs_non_finies(arguments, capsys):
+    with pytest.raises(SystemExit):
+        statistiques_main(arguments)
+    assert "finis" in capsys.readouterr().err
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import export_maillage
+from empreinte import aire_polygone, polygone_croix
+from export_maillage import (DTYPE_PLY_FACE, DTYPE_PLY_INSTANCE, DTYPE_PLY_SOMMET, DTYPE_STL, exporter_instances,
+                             exporter_ply, exporter_scene, main, triangles_structure_croix)
+from maillage_sphere import gabarit_sphere
+
+def lire_ply(chemin):
+    donnees = open(chemin, "rb").read()
+    fin = donnees.index(b"end_header\n") + len(b"end_header\n")
+    lignes = donnees[:fin].decode("ascii").split("\n")[:-1]
+    nombres = {ligne.split()[1]: int(ligne.split()[2]) for ligne in lignes if ligne.startswith("element ")}
+    return lignes, nombres, donnees[fin:]
+
+def lire_stl(chemin):
+    return np.frombuffer(open(chemin, "rb").read()[84:], dtype=DTYPE_STL)["sommets"]
+
+def lire_obj(chemin):
+    lignes = [ligne.split() for ligne in open(chemin, encoding="ascii")]
+    return np.array([ligne[1:] for ligne in lignes if ligne[0] == "v"], dtype=float)
+
+def test_ply_entete_exact(tmp_path):
+    triangles = triangles_structure_croix(3, 3, 1, 1, 2, 0.1)
+    centres = np.random.default_rng(0).random((50, 3)) * 3
+    chemin = str(tmp_path / "scene.ply")
+    nb_faces = exporter_ply(chemin, triangles, centres, 0.2, taille_tampon=512)
+    lignes, nombres, corps = lire_ply(chemin)
+
+    elements = [ligne for ligne in lignes if ligne.startswith("element ")]
+    assert all(ligne == ligne.rstrip() for ligne in elements)
+    assert "property list uchar uint vertex_indices" in lignes
+    assert nombres["face"] == nb_faces
+
+    taille_sommets = nombres["vertex"] * DTYPE_PLY_SOMMET.itemsize
+    assert len(corps) == taille_sommets + nombres["face"] * DTYPE_PLY_FACE.itemsize
+    sommets = np.frombuffer(corps[:taille_sommets], dtype=DTYPE_PLY_SOMMET)
+    faces = np.frombuffer(corps[taille_sommets:], dtype=DTYPE_PLY_FACE)
+    assert (faces["n"] == 3).all() and faces["sommets"].max() == len(sommets) - 1
+    np.testing.assert_allclose(sommets["x"][:3 * len(triangles)], triangles[:, :, 0].ravel(), atol=1e-5)
+
+def test_ply_instances_entete_exact(tmp_path):
+    centres = np.random.default_rng(1).random((30, 3))
+    chemin = str(tmp_path / "instances.ply")
+    exporter_instances(chemin, centres, 0.1, taille_tampon=8)
+    lignes, nombres, corps = lire_ply(chemin)
+
+    assert "element instance 30" in lignes
+    instances = np.frombuffer(corps[-30 * DTYPE_PLY_INSTANCE.itemsize:], dtype=DTYPE_PLY_INSTANCE)
+    np.testing.assert_allclose(instances["x"], centres[:, 0], atol=1e-6)
+
+def test_ply_trop_de_sommets(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_maillage, "NOMBRE_MAX_SOMMETS_PLY", 1000)
+    chemin = tmp_path / "trop.ply"
+    with pytest.raises(ValueError):
+        exporter_ply(str(chemin), triangles_structure_croix(3, 3, 1, 1, 2, 0.1), np.zeros((10, 3)), 0.2)
+    assert not chemin.exists()
+
+@pytest.mark.parametrize("extension", [".stl", ".ply", ".obj"])
+def test_rayon_par_sphere(tmp_path, extension):
+    centres = np.array([[0.0, 0.0, 0.0], [3.0, 0.0, 0.0], [0.0, 3.0, 1.0]])
+    rayons = np.array([0.5, 1.0, 0.25])
+    chemin = str(tmp_path / f"spheres{extension}")
+    # Tampon de deux sphères : les rayons sont découpés avec les blocs
+    exporter_scene(chemin, None, centres, rayons, taille_tampon=2 * len(gabarit_sphere(20, 15)[2]))
+
+    if extension == ".stl":
+        points = lire_stl(chemin).reshape(len(centres), -1, 3)
+    elif extension == ".obj":
+        points = lire_obj(chemin).reshape(len(centres), -1, 3)
+    else:
+        _, nombres, corps = lire_ply(chemin)
+        sommets = np.frombuffer(corps[:nombres["vertex"] * DTYPE_PLY_SOMMET.itemsize], dtype=DTYPE_PLY_SOMMET)
+        points = np.column_stack([sommets["x"], sommets["y"], sommets["z"]]).reshape(len(centres), -1, 3)
+    distances = np.linalg.norm(points - centres[:, None, :], axis=2)
+    np.testing.assert_allclose(distances, np.broadcast_to(rayons[:, None], distances.shape), rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        exporter_scene(chemin, None, centres, rayons[:2])
+
+def test_instances_rayon_par_sphere(tmp_path):
+    centres = np.random.default_rng(2).random((30, 3))
+    rayons = np.linspace(0.1, 0.4, 30)
+    chemin = str(tmp_path / "instances.ply")
+    exporter_instances(chemin, centres, rayons, taille_tampon=8)
+    _, _, corps = lire_ply(chemin)
+    instances = np.frombuffer(corps[-30 * DTYPE_PLY_INSTANCE.itemsize:], dtype=DTYPE_PLY_INSTANCE)
+    np.testing.assert_allclose(instances["rayon"], rayons, rtol=1e-6)
+
+def test_croix_avec_sol(tmp_path):
+    # Épaisseur de mur par défaut (0) : sans murs, mais avec le sol
+    chemin = str(tmp_path / "croix.stl")
+    main([chemin, "croix", "6", "5", "2", "3", "2", "0.5"])
+    triangles = lire_stl(chemin)
+    sol = triangles[np.all(triangles[:, :, 2] == 0, axis=1)]
+    aire = np.linalg.norm(np.cross(sol[:, 1] - sol[:, 0], sol[:, 2] - sol[:, 0]), axis=1).sum() / 2
+    assert aire == pytest.approx(aire_polygone(polygone_croix(6, 5, 2, 3)))
+    assert len(triangles_structure_croix(6, 5, 2, 3, 2, 0.1)) > len(sol)
+
+@pytest.mark.parametrize("mode", ["aleatoire", "polydisperse"])
+def test_cli_modes_aleatoires(tmp_path, mode):
+    chemin = str(tmp_path / "boite.ply")
+    main(["--mode", mode, "--instances", chemin, "boite", "2", "2", "1", "0.2"])
+    _, nombres, corps = lire_ply(chemin)
+    instances = np.frombuffer(corps[-nombres["instance"] * DTYPE_PLY_INSTANCE.itemsize:], dtype=DTYPE_PLY_INSTANCE)
+    assert nombres["instance"] > 10
+    assert (len(np.unique(instances["rayon"])) > 1) == (mode == "polydisperse")
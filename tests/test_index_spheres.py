@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from index_spheres import IndexSpheres
+
+def distances_brutes(points, centres, rayons=None):
+    """
+    Distances (P, N) entre les points et les centres, ou jusqu'aux surfaces
+    """
+    d = np.linalg.norm(points[:, None, :] - centres[None, :, :], axis=2)
+    return d if rayons is None else d - rayons[None, :]
+
+@pytest.fixture
+def nuage():
+    rng = np.random.default_rng(0)
+    centres = rng.random((2000, 3)) * [10.0, 6.0, 3.0]
+    rayons = rng.uniform(0.05, 0.3, len(centres))
+    # Points dans le nuage, et loin de lui pour la recherche des points éloignés
+    points = np.concatenate([rng.random((3000, 3)) * [10.0, 6.0, 3.0],
+                             rng.normal(0.0, 30.0, (200, 3))])
+    return centres, rayons, points
+
+def plus_petites_brutes(points, centres, rayons=None, k_max=20):
+    """
+    k_max plus petites distances de chaque point, par lots, triées
+    """
+    resultats = []
+    for lot in np.array_split(np.arange(len(points)), 20):
+        d = distances_brutes(points[lot], centres, rayons)
+        resultats.append(np.sort(np.partition(d, k_max - 1, axis=1)[:, :k_max], axis=1))
+    return np.concatenate(resultats)
+
+def verifier_k_plus_proches(index, points, k, reference, centres, rayons=None):
+    indices, distances = index.k_plus_proches(points, k, surface=rayons is not None)
+    np.testing.assert_allclose(distances, reference[:, :k], atol=1e-12)
+    # Les indices renvoyés correspondent aux distances renvoyées
+    d = np.linalg.norm(points[:, None, :] - centres[indices], axis=2)
+    if rayons is not None:
+        d -= rayons[indices]
+    np.testing.assert_allclose(d, distances, atol=1e-12)
+
+def test_k_plus_proches_requetes_repetees(nuage):
+    centres, rayons, _ = nuage
+    rng = np.random.default_rng(3)
+    points = np.concatenate([rng.random((20000, 3)) * [10.0, 6.0, 3.0],
+                             rng.normal(0.0, 30.0, (200, 3))])
+    index = IndexSpheres(centres, rayons)
+    reference = plus_petites_brutes(points, centres)
+    reference_surface = plus_petites_brutes(points, centres, rayons)
+
+    # Le même index sert des k différents, en centre puis en surface : les
+    # gabarits faits pour une portée ne doivent pas servir à une autre
+    for k in (1, 2, 3, 8, 20, 7, 2):
+        verifier_k_plus_proches(index, points, k, reference, centres)
+    for k in (7, 1, 3, 7):
+        verifier_k_plus_proches(index, points, k, reference_surface, centres, rayons)
+    verifier_k_plus_proches(index, points, 5, reference, centres)
+
+def test_k_plus_proches_arbre_kd(nuage, monkeypatch):
+    pytest.importorskip("scipy")
+    centres, _, points = nuage
+    index = IndexSpheres(centres, 0.2)
+    par_arbre = [index.k_plus_proches(points, 4, surface=surface) for surface in (False, True)]
+
+    # Même réponse par la grille, sans SciPy
+    import index_spheres
+    monkeypatch.setattr(index_spheres, "cKDTree", None)
+    for surface, (indices, distances) in zip((False, True), par_arbre):
+        indices_grille, distances_grille = index.k_plus_proches(points, 4, surface=surface)
+        np.testing.assert_allclose(distances, distances_grille, atol=1e-12)
+        np.testing.assert_array_equal(indices, indices_grille)
+
+def test_plus_proche(nuage):
+    centres, rayons, points = nuage
+    index = IndexSpheres(centres, rayons)
+    indices, distances = index.plus_proche(points)
+    d = distances_brutes(points, centres)
+    np.testing.assert_allclose(distances, d.min(axis=1))
+    np.testing.assert_allclose(d[np.arange(len(points)), indices], distances)
+
+@pytest.mark.parametrize("surface", [False, True])
+def test_dans_rayon(nuage, surface):
+    centres, rayons, points = nuage
+    index = IndexSpheres(centres, rayons)
+    d = distances_brutes(points, centres)
+    rayons_recherche = np.random.default_rng(1).uniform(0.0, 1.0, len(points))
+
+    for rayon in (0.4, rayons_recherche, 0.1):
+        couples, distances = index.dans_rayon(points, rayon, surface)
+        limite = np.broadcast_to(rayon, (len(points),))[:, None] + (rayons[None, :] if surface else 0.0)
+        attendus = np.argwhere(d <= limite)
+        assert sorted(map(tuple, couples)) == sorted(map(tuple, attendus))
+        np.testing.assert_allclose(distances, d[couples[:, 0], couples[:, 1]])
+
+@pytest.mark.parametrize("mode", ["centre", "entiere", "touchee"])
+def test_dans_boite(nuage, mode):
+    centres, rayons, _ = nuage
+    index = IndexSpheres(centres, rayons)
+    rng = np.random.default_rng(2)
+    bas = rng.random((300, 3)) * [12.0, 8.0, 5.0] - 1.0
+    haut = bas + rng.random((300, 3)) * 2.0
+
+    for _ in range(2):
+        couples = index.dans_boite(bas, haut, mode)
+        if mode == "centre":
+            retenus = np.all((centres[None] >= bas[:, None]) & (centres[None] <= haut[:, None]), axis=2)
+        elif mode == "entiere":
+            r = rayons[None, :, None]
+            retenus = np.all((centres[None] - r >= bas[:, None]) & (centres[None] + r <= haut[:, None]), axis=2)
+        else:
+            ecart = np.clip(centres[None], bas[:, None], haut[:, None]) - centres[None]
+            retenus = np.einsum("bnj,bnj->bn", ecart, ecart) <= rayons[None, :] ** 2
+        assert sorted(map(tuple, couples)) == sorted(map(tuple, np.argwhere(retenus)))
+
+def test_k_invalide(nuage):
+    centres, rayons, points = nuage
+    index = IndexSpheres(centres)
+    with pytest.raises(ValueError):
+        index.k_plus_proches(points, 0)
+    with pytest.raises(ValueError):
+        index.k_plus_proches(points, 1, surface=True)
@@ -0,0 +1,20 @@
+import pytest
+
+import instrumentation
+from instrumentation import instrumentation_active, session_instrumentation
+
+def test_session_terminee_sur_saisie_invalide(monkeypatch, capsys):
+    import plan_3d
+    monkeypatch.setenv(instrumentation.VARIABLE_PROFIL, "1")
+    monkeypatch.setattr("builtins.input", lambda invite: "abc")
+    plan_3d.creer_plan_3d()
+    assert not instrumentation_active()
+    assert "Veuillez entrer des nombres valides" in capsys.readouterr().out
+
+def test_session_terminee_sur_exception(monkeypatch):
+    monkeypatch.setenv(instrumentation.VARIABLE_PROFIL, "1")
+    with pytest.raises(RuntimeError):
+        with session_instrumentation():
+            assert instrumentation_active()
+            raise RuntimeError
+    assert not instrumentation_active()
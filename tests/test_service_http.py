@@ -0,0 +1,36 @@
+import pytest
+
+from service_http import lire_parametres
+
+def requete(**valeurs):
+    return {nom: [str(valeur)] for nom, valeur in valeurs.items()}
+
+BOITE = {"largeur": 2, "longueur": 2, "hauteur": 2, "rayon_sphere": 0.5}
+PLAN = {"largeur_centrale": 3, "longueur_centrale": 3, "largeur_bras": 1, "longueur_bras": 1,
+        "hauteur": 2, "epaisseur_mur": 0.1}
+
+def test_parametres_valides():
+    parametres, dpi = lire_parametres("boite_spheres", requete(**BOITE, mode="cfc", dpi=150))
+    assert parametres == dict(BOITE, largeur=2.0, longueur=2.0, hauteur=2.0, mode="cfc")
+    assert dpi == 150
+
+@pytest.mark.parametrize("scene, valeurs", [
+    ("boite_spheres", dict(BOITE, largeur="inf")),
+    ("boite_spheres", dict(BOITE, largeur="1e400")),
+    ("boite_spheres", dict(BOITE, rayon_sphere="nan")),
+    ("boite_spheres", dict(BOITE, dispersion="-inf")),
+    ("plan_3d", dict(PLAN, epaisseur_mur="nan")),
+    ("boite_spheres", dict(BOITE, largeur=-1)),
+    ("boite_spheres", dict(BOITE, nombre="1e3")),
+    ("boite_spheres", dict(BOITE, mode="inconnu")),
+])
+def test_parametres_refuses(scene, valeurs):
+    with pytest.raises(ValueError):
+        lire_parametres(scene, requete(**valeurs))
+
+def test_polydisperse_tres_disperse_refuse():
+    # Au rayon moyen la scène passe, mais la loi tire des rayons jusqu'à 5 % du rayon
+    boite = dict(BOITE, largeur=10, longueur=10, hauteur=10)
+    lire_parametres("boite_spheres", requete(**boite, mode="polydisperse", dispersion=0.25))
+    with pytest.raises(ValueError, match="trop grande"):
+        lire_parametres("boite_spheres", requete(**boite, mode="polydisperse", loi="lognormale", dispersion=1.0))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from reseau_spheres import MODES_EMPILEMENT
+from solveur_rayon import resoudre_boite, resoudre_croix
+from statistiques import statistiques_boite, statistiques_croix
+
+CROIX = (6.0, 5.0, 2.0, 3.0)
+
+def statistiques(structure, rayon, mode):
+    if structure == "boite":
+        return statistiques_boite(4.0, 3.0, 2.5, rayon, mode)
+    return statistiques_croix(*CROIX, 2.5, rayon, mode)
+
+def resoudre(structure, **objectifs):
+    if structure == "boite":
+        return resoudre_boite(4.0, 3.0, 2.5, **objectifs)
+    return resoudre_croix(*CROIX, 2.5, **objectifs)
+
+def rayons_admissibles(structure, taux=None, nombre=None):
+    """
+    Rayons d'une grille fine qui atteignent les objectifs, par mode
+    """
+    admissibles = []
+    for rayon in np.geomspace(0.1, 1.0, 3000):
+        for mode in MODES_EMPILEMENT:
+            stats = statistiques(structure, rayon, mode)
+            if (taux is None or stats["taux_remplissage"] >= taux) and (nombre is None or stats["nombre_total"] >= nombre):
+                admissibles.append(rayon)
+    return np.array(admissibles)
+
+@pytest.mark.parametrize("structure", ["boite", "croix"])
+@pytest.mark.parametrize("objectifs", [{"taux": 55.0}, {"nombre": 200}, {"taux": 60.0, "nombre": 300}])
+def test_optimum(structure, objectifs):
+    optimum = resoudre(structure, **objectifs)["optimum"]
+    rayon, mode = optimum["rayon_sphere"], optimum["mode"]
+
+    # L'optimum atteint les objectifs, d'après le compte des statistiques
+    stats = statistiques(structure, rayon, mode)
+    assert stats["nombre_total"] == optimum["nombre_total"]
+    assert stats["taux_remplissage"] == pytest.approx(optimum["taux_remplissage"])
+    assert stats["taux_remplissage"] >= objectifs.get("taux", 0)
+    assert stats["nombre_total"] >= objectifs.get("nombre", 0)
+
+    # Aucun rayon plus grand ne les atteint, quel que soit le mode
+    admissibles = rayons_admissibles(structure, **objectifs)
+    assert len(admissibles) and admissibles.max() <= rayon * (1 + 1e-9)
+
+def test_front_pareto():
+    pareto = resoudre_croix(*CROIX, 2.5)["pareto"]
+    rayons = [solution["rayon_sphere"] for solution in pareto]
+    taux = [solution["taux_remplissage"] for solution in pareto]
+    assert rayons == sorted(rayons, reverse=True)
+    assert all(suivant > precedent for precedent, suivant in zip(taux, taux[1:]))
+
+def test_jeu_cubique():
+    optimum = resoudre_boite(4.0, 3.0, 2.5, taux=30.0, jeu=0.05, modes=("cubique",))["optimum"]
+    assert optimum["jeu"] >= 0.05 * (1 - 1e-9)
+    assert optimum["taux_remplissage"] >= 30.0
+
+@pytest.mark.parametrize("objectifs", [{"taux": 0.0}, {"taux": 100.0}, {"nombre": 0}, {"jeu": -0.1}])
+def test_objectifs_invalides(objectifs):
+    with pytest.raises(ValueError):
+        resoudre_boite(4.0, 3.0, 2.5, **objectifs)
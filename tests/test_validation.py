@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from empreinte import polygone_croix
+from reseau_spheres import generer_centres_boite
+from validation import (STRATEGIES_REPARATION, detecter_chevauchements, reparer_disposition, valider_disposition,
+                        valider_flux)
+
+def chevauchements_bruts(centres, rayons):
+    distances = np.linalg.norm(centres[:, None] - centres[None], axis=2)
+    i, j = np.nonzero(np.triu(distances < (rayons[:, None] + rayons[None]) * (1 - 1e-9), k=1))
+    return {(a, b) for a, b in zip(i, j)}
+
+def en_ensemble(paires):
+    return {(min(a, b), max(a, b)) for a, b in paires}
+
+def test_chevauchements_comme_force_brute():
+    rng = np.random.default_rng(0)
+    centres = rng.random((1500, 3)) * 10
+    rayons = rng.uniform(0.05, 0.4, len(centres))
+
+    paires, penetrations = detecter_chevauchements(centres, rayons)
+    assert en_ensemble(paires) == chevauchements_bruts(centres, rayons)
+    distances = np.linalg.norm(centres[paires[:, 0]] - centres[paires[:, 1]], axis=1)
+    np.testing.assert_allclose(penetrations, rayons[paires[:, 0]] + rayons[paires[:, 1]] - distances)
+
+def test_reseau_tangent_valide():
+    centres = generer_centres_boite(0, 0, 4, 4, 4, 1.0, mode="cfc")
+    assert valider_disposition(centres, 0.5, boite=(0, 0, 0, 4, 4, 4))["valide"]
+
+def test_flux_comme_disposition():
+    rng = np.random.default_rng(1)
+    centres = rng.random((3000, 3)) * [10, 10, 20]
+    centres = centres[np.argsort(centres[:, 2])]
+    boite = (0, 0, 0, 10, 10, 20)
+
+    rapport = valider_disposition(centres, 0.2, boite=boite)
+    flux = valider_flux(np.array_split(centres, 17), 0.2, boite=boite)
+    assert en_ensemble(flux["chevauchements"]) == en_ensemble(rapport["chevauchements"])
+    np.testing.assert_array_equal(np.sort(flux["debordements"]), rapport["debordements"])
+
+@pytest.mark.parametrize("strategie", STRATEGIES_REPARATION)
+@pytest.mark.parametrize("volume", ["boite", "croix"])
+def test_reparation_sans_conflit(strategie, volume):
+    rng = np.random.default_rng(2)
+    if volume == "boite":
+        limites = {"boite": (0, 0, 0, 5, 5, 3)}
+        centres = rng.random((600, 3)) * [5, 5, 3]
+    else:
+        limites = {"polygone": polygone_croix(6, 5, 2, 3), "hauteur": 2.0}
+        centres = rng.random((600, 3)) * [10, 11, 2]
+    rayons = rng.uniform(0.1, 0.3, len(centres))
+    centres[1] = centres[0]  # deux sphères de même centre
+
+    repares, indices = reparer_disposition(centres, rayons, strategie=strategie, **limites)
+    assert valider_disposition(repares, rayons[indices], **limites)["valide"]
+    assert len(indices) and (np.diff(indices) > 0).all()
+    if strategie == "supprimer":
+        np.testing.assert_array_equal(repares, centres[indices])
+
+def test_strategie_inconnue():
+    with pytest.raises(ValueError):
+        reparer_disposition(np.zeros((2, 3)), 0.1, boite=(0, 0, 0, 1, 1, 1), strategie="ignorer")
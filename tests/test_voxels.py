@@ -0,0 +1,74 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from empreinte import aire_polygone, decaler_polygone, polygone_croix, polygone_rectangle
+from reseau_spheres import generer_centres_boite
+from statistiques import main as statistiques_main
+from statistiques import statistiques_voxels
+from voxels import MUR, SPHERE, GrilleVoxels, voxeliser_boite, voxeliser_empreinte
+
+def test_volumes_boite_et_murs():
+    grille = voxeliser_boite(4.0, 3.0, 2.0, 0.05, epaisseur_mur=0.2)
+    assert grille.volume_total() == pytest.approx(24.0)
+    assert grille.volume_murs() == pytest.approx((12.0 - 3.6 * 2.6) * 2.0)
+
+def test_volumes_croix_et_murs():
+    polygone = polygone_croix(6, 5, 2, 3)
+    grille = voxeliser_empreinte(polygone, 2.0, 0.02, epaisseur_mur=0.15)
+    interieur = aire_polygone(decaler_polygone(polygone, 0.15))
+    assert grille.volume_total() == pytest.approx(aire_polygone(polygone) * 2.0)
+    assert grille.volume_murs() == pytest.approx((aire_polygone(polygone) - interieur) * 2.0, rel=1e-3)
+    assert grille.volume_libre() == pytest.approx(interieur * 2.0, rel=1e-3)
+
+def test_volume_sphere():
+    centre = np.array([[1.013, 1.007, 1.021]])
+    grille = voxeliser_empreinte(polygone_rectangle(0, 0, 2, 2), 2.0, 0.02, centres=centre, rayons=0.5)
+    assert grille.volume_spheres() == pytest.approx(4 / 3 * math.pi * 0.5 ** 3, rel=5e-3)
+
+def test_volume_reseau():
+    centres = generer_centres_boite(0, 0, 4, 4, 4, 1.0, mode="cfc")
+    grille = voxeliser_empreinte(polygone_rectangle(0, 0, 4, 4), 4.0, 0.02, centres=centres, rayons=0.5)
+    volume = len(centres) * 4 / 3 * math.pi * 0.5 ** 3
+    assert grille.volume_spheres() == pytest.approx(volume, rel=5e-3)
+    assert grille.taux_remplissage() == pytest.approx(100 * volume / 64.0, rel=5e-3)
+
+def test_spheres_comme_force_brute():
+    rng = np.random.default_rng(0)
+    centres = rng.random((40, 3)) * 2
+    rayons = rng.uniform(0.05, 0.4, len(centres))
+    grille = GrilleVoxels.englobant([0, 0, 0], [2, 2, 2], 0.05)
+    # Tranches de quelques lignes : les sphères chevauchent leurs bords
+    grille.ajouter_spheres(centres, rayons, taille_tranche=3000)
+
+    xs, ys, zs = grille.axes()
+    points = np.stack(np.meshgrid(xs, ys, zs, indexing="ij"), axis=-1)
+    attendu = np.zeros(grille.forme, dtype=bool)
+    for centre, rayon in zip(centres, rayons):
+        attendu |= np.sum((points - centre) ** 2, axis=-1) <= rayon ** 2
+    np.testing.assert_array_equal(grille.dense(grille.spheres), attendu)
+
+def test_coupe():
+    grille = voxeliser_boite(2.0, 2.0, 2.0, 0.1, epaisseur_mur=0.2)
+    grille.ajouter_spheres([[1.0, 1.0, 1.0]], 0.5)
+    coupe = grille.coupe("z", 1.0)
+    assert coupe[0, 0] == MUR and coupe[10, 10] == SPHERE
+    with pytest.raises(ValueError):
+        grille.coupe("x", 5.0)
+
+def test_statistiques_voxels_comme_analytiques():
+    stats = statistiques_voxels(polygone_rectangle(0, 0, 4, 4), 4.0, 0.5, 0.02, mode="cfc")
+    assert stats["voxels"]["volume_total_spheres"] == pytest.approx(stats["volume_total_spheres"], rel=5e-3)
+    assert stats["voxels"]["taux_remplissage"] == pytest.approx(stats["taux_remplissage"], rel=5e-3)
+
+def test_statistiques_cli_murs(capsys):
+    statistiques_main(["--resolution", "0.05", "--epaisseur-mur", "0.2", "croix", "6", "5", "2", "3", "2", "0.25"])
+    voxels = json.loads(capsys.readouterr().out)["voxels"]
+    # Les murs recouvrent une partie des sphères du bord
+    assert voxels["volume_murs"] > 0
+    interieur = voxels["taux_remplissage_interieur"] / 100 * (voxels["volume_structure"] - voxels["volume_murs"])
+    assert interieur < 0.95 * voxels["volume_total_spheres"]
+    with pytest.raises(SystemExit):
+        statistiques_main(["--resolution", "0.05", "--epaisseur-mur", "2", "croix", "6", "5", "2", "3", "2", "0.25"])
@@ -0,0 +1,242 @@
+import numpy as np
+
+from empreinte import normaliser_polygone, points_dans_empreinte, points_dans_polygone, projeter_sur_bord
+from grille_spatiale import GrilleSpatiale
+
+# Tolérance relative : des sphères tangentes (réseaux compacts) ne se chevauchent pas
+TOLERANCE_CONTACT = 1e-9
+
+STRATEGIES_REPARATION = ("supprimer", "decaler")
+
+# Direction d'écartement de deux sphères de même centre, qui n'ont pas de
+# direction propre (oblique pour ne pas buter d'emblée contre une paroi)
+DIRECTION_CONFONDUS = np.array([1.0, 2.0, 3.0]) / np.sqrt(14.0)
+
+def rayons_par_sphere(centres, rayons):
+    """
+    Retourne un tableau (N,) des rayons, à partir d'un rayon unique ou d'un rayon par sphère
+    """
+    return np.broadcast_to(np.asarray(rayons, dtype=float), (len(centres),))
+
+def detecter_chevauchements(centres, rayons):
+    """
+    Trouve toutes les paires de sphères qui se chevauchent
+
+    Les centres sont rangés dans une table de hachage spatiale dont la
+    cellule vaut le plus grand diamètre : seules les cellules voisines sont
+    comparées, en temps quasi linéaire. Retourne les paires (K, 2) et la
+    profondeur d'interpénétration (K,) de chacune.
+    """
+    centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+    rayons = rayons_par_sphere(centres, rayons)
+    if len(centres) < 2:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0)
+    
+    diametre_max = 2 * rayons.max()
+    grille = GrilleSpatiale(centres, diametre_max)
+    paires, distances = grille.paires_proches(diametre_max)
+    
+    somme_rayons = rayons[paires[:, 0]] + rayons[paires[:, 1]]
+    chevauchent = distances < somme_rayons * (1 - TOLERANCE_CONTACT)
+    
+    return paires[chevauchent], (somme_rayons - distances)[chevauchent]
+
+def detecter_debordements(centres, rayons, polygone=None, hauteur=None, boite=None):
+    """
+    Trouve les sphères qui dépassent du volume
+
+    Le volume est soit une boîte (x0, y0, z0, x1, y1, z1), soit le prisme
+    d'un polygone entre z=0 et z=hauteur. Retourne les indices des sphères.
+    """
+    centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+    rayons = rayons_par_sphere(centres, rayons)
+    tolerance = rayons * TOLERANCE_CONTACT
+    
+    if boite is not None:
+        bas, haut = np.asarray(boite[:3], dtype=float), np.asarray(boite[3:], dtype=float)
+        dehors = np.any(centres - rayons[:, None] < bas - tolerance[:, None], axis=1)
+        dehors |= np.any(centres + rayons[:, None] > haut + tolerance[:, None], axis=1)
+        return np.flatnonzero(dehors)
+    
+    if polygone is None or hauteur is None:
+        raise ValueError("Il faut une boîte, ou un polygone et une hauteur!")
+    
+    polygone = normaliser_polygone(polygone)
+    dehors = (centres[:, 2] - rayons < -tolerance) | (centres[:, 2] + rayons > hauteur + tolerance)
+    dehors |= ~points_dans_empreinte(polygone, centres[:, :2], rayons)
+    return np.flatnonzero(dehors)
+
+def valider_disposition(centres, rayons, polygone=None, hauteur=None, boite=None):
+    """
+    Vérifie une disposition de sphères et retourne un rapport
+
+    Le rapport contient les paires qui se chevauchent, leur profondeur
+    d'interpénétration et les indices des sphères qui dépassent du volume.
+    """
+    paires, penetrations = detecter_chevauchements(centres, rayons)
+    debordements = detecter_debordements(centres, rayons, polygone, hauteur, boite)
+    
+    return {
+        "nombre_spheres": len(np.asarray(centres).reshape(-1, 3)),
+        "chevauchements": paires,
+        "penetrations": penetrations,
+        "debordements": debordements,
+        "valide": len(paires) == 0 and len(debordements) == 0,
+    }
+
+def valider_flux(blocs, rayon, polygone=None, hauteur=None, boite=None):
+    """
+    Vérifie une disposition fournie par blocs (n, 3) de z minimal croissant,
+    avec une mémoire bornée
+
+    Seuls les centres à moins d'un diamètre sous le bloc courant sont gardés
+    pour la recherche des chevauchements entre blocs. Les indices du rapport
+    sont ceux de la concaténation des blocs, qui n'est jamais construite.
+    """
+    if boite is None and polygone is not None:
+        polygone = normaliser_polygone(polygone)
+    diametre = 2 * rayon
+    
+    tampon, indices_tampon = np.empty((0, 3)), np.empty(0, dtype=np.int64)
+    paires, penetrations, debordements = [], [], []
+    nombre, z_precedent = 0, -np.inf
+    
+    for bloc in blocs:
+        bloc = np.asarray(bloc, dtype=float).reshape(-1, 3)
+        if not len(bloc):
+            continue
+        z_min = bloc[:, 2].min()
+        if z_min < z_precedent - diametre * TOLERANCE_CONTACT:
+            raise ValueError("Les blocs doivent être produits par z minimal croissant!")
+        z_precedent = z_min
+        indices = np.arange(nombre, nombre + len(bloc))
+        
+        debordements.append(indices[detecter_debordements(bloc, rayon, polygone, hauteur, boite)])
+        
+        # Les blocs suivants commencent au-dessus de z_min : le reste du tampon est inutile
+        proches = tampon[:, 2] >= z_min - diametre
+        tampon, indices_tampon = tampon[proches], indices_tampon[proches]
+        
+        # Paires dont au moins une sphère appartient au bloc courant
+        points = np.concatenate([tampon, bloc])
+        paires_bloc, penetrations_bloc = detecter_chevauchements(points, rayon)
+        nouvelles = paires_bloc.max(axis=1) >= len(tampon)
+        paires.append(np.concatenate([indices_tampon, indices])[paires_bloc[nouvelles]])
+        penetrations.append(penetrations_bloc[nouvelles])
+        
+        tampon, indices_tampon = points, np.concatenate([indices_tampon, indices])
+        nombre += len(bloc)
+    
+    paires = np.concatenate(paires) if paires else np.empty((0, 2), dtype=np.int64)
+    debordements = np.concatenate(debordements) if debordements else np.empty(0, dtype=np.int64)
+    return {
+        "nombre_spheres": nombre,
+        "chevauchements": paires,
+        "penetrations": np.concatenate(penetrations) if penetrations else np.empty(0),
+        "debordements": debordements,
+        "valide": len(paires) == 0 and len(debordements) == 0,
+    }
+
+def afficher_rapport(rapport):
+    """
+    Affiche le résumé d'un rapport de validation
+    """
+    print("\n=== Validation de la disposition ===")
+    print(f"Sphères vérifiées: {rapport['nombre_spheres']}")
+    print(f"Paires qui se chevauchent: {len(rapport['chevauchements'])}")
+    if len(rapport["penetrations"]):
+        print(f"Interpénétration maximale: {rapport['penetrations'].max():.3f}")
+    print(f"Sphères qui dépassent du volume: {len(rapport['debordements'])}")
+    if not rapport["valide"]:
+        print("Attention: La disposition n'est pas valide!")
+
+def supprimer_conflits(nombre_spheres, paires, debordements):
+    """
+    Choisit les sphères à conserver pour éliminer tous les conflits
+
+    Les sphères qui débordent sont retirées, puis, pour chaque paire encore
+    en conflit, la sphère impliquée dans le plus de conflits est retirée.
+    C'est une heuristique gloutonne : le nombre de sphères retirées n'est
+    pas garanti minimal.
+    """
+    garder = np.ones(nombre_spheres, dtype=bool)
+    garder[debordements] = False
+    
+    paires = paires[garder[paires[:, 0]] & garder[paires[:, 1]]]
+    degres = np.bincount(paires.ravel(), minlength=nombre_spheres)
+    
+    # Les paires les plus conflictuelles d'abord
+    ordre = np.argsort(-np.maximum(degres[paires[:, 0]], degres[paires[:, 1]]), kind="stable")
+    for i, j in paires[ordre]:
+        if garder[i] and garder[j]:
+            garder[i if degres[i] > degres[j] else j] = False
+    
+    return garder
+
+def ramener_dans_volume(centres, rayons, polygone=None, hauteur=None, boite=None):
+    """
+    Déplace les sphères qui débordent pour qu'elles touchent le bord de l'intérieur
+    """
+    if boite is not None:
+        bas, haut = np.asarray(boite[:3], dtype=float), np.asarray(boite[3:], dtype=float)
+        return np.clip(centres, bas + rayons[:, None], np.maximum(haut - rayons[:, None], bas + rayons[:, None]))
+    
+    centres = centres.copy()
+    centres[:, 2] = np.clip(centres[:, 2], rayons, np.maximum(hauteur - rayons, rayons))
+    
+    indices = detecter_debordements(centres, rayons, polygone, hauteur)
+    if len(indices):
+        plan = centres[indices, :2]
+        projections, distances = projeter_sur_bord(polygone, plan)
+        direction = (plan - projections) / np.maximum(distances, 1e-12)[:, None]
+        
+        # Une sphère dont le centre est dehors est retournée vers l'intérieur
+        dehors = ~points_dans_polygone(polygone, plan)
+        direction[dehors] *= -1
+        centres[indices, :2] = projections + direction * rayons[indices, None]
+    
+    return centres
+
+def reparer_disposition(centres, rayons, polygone=None, hauteur=None, boite=None, strategie="supprimer", iterations=50):
+    """
+    Répare une disposition en supprimant ou en décalant les sphères fautives
+
+    strategie="supprimer" retire des sphères, par une heuristique gloutonne,
+    jusqu'à éliminer chevauchements et débordements. strategie="decaler"
+    écarte d'abord les paires qui se chevauchent et ramène les sphères dans
+    le volume, sur quelques itérations, puis supprime les conflits restants.
+    Deux sphères de même centre sont écartées selon DIRECTION_CONFONDUS.
+    Retourne les centres réparés et les indices des sphères conservées.
+    """
+    if strategie not in STRATEGIES_REPARATION:
+        raise ValueError(f"Stratégie inconnue: {strategie!r} (choix: {', '.join(STRATEGIES_REPARATION)})")
+    if boite is None:
+        polygone = normaliser_polygone(polygone)
+    
+    centres = np.array(centres, dtype=float).reshape(-1, 3)
+    rayons = np.array(rayons_par_sphere(centres, rayons))
+    
+    if strategie == "decaler":
+        for _ in range(iterations):
+            paires, penetrations = detecter_chevauchements(centres, rayons)
+            if len(paires) == 0 and len(detecter_debordements(centres, rayons, polygone, hauteur, boite)) == 0:
+                break
+            
+            # Chaque sphère d'une paire recule de la moitié de l'interpénétration
+            ecart = centres[paires[:, 0]] - centres[paires[:, 1]]
+            distances = np.linalg.norm(ecart, axis=1)
+            direction = ecart / np.maximum(distances, 1e-12)[:, None]
+            direction[distances == 0] = DIRECTION_CONFONDUS
+            pas = direction * (penetrations / 2 * (1 + 1e-6))[:, None]
+            deplacement = np.zeros_like(centres)
+            np.add.at(deplacement, paires[:, 0], pas)
+            np.add.at(deplacement, paires[:, 1], -pas)
+            
+            centres = ramener_dans_volume(centres + deplacement, rayons, polygone, hauteur, boite)
+    
+    paires, _ = detecter_chevauchements(centres, rayons)
+    debordements = detecter_debordements(centres, rayons, polygone, hauteur, boite)
+    garder = supprimer_conflits(len(centres), paires, debordements)
+    
+    indices = np.flatnonzero(garder)
+    return centres[indices], indices
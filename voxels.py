@@ -0,0 +1,313 @@
+import math
+
+import numpy as np
+
+from empreinte import decaler_polygone, normaliser_polygone, points_dans_polygone, polygone_croix, polygone_rectangle
+
+# Codes des voxels dans une coupe
+HORS_VOLUME, LIBRE, MUR, SPHERE = 0, 1, 2, 3
+
+# Nombre maximal de voxels d'une tranche de la grille lors du tracé des sphères
+TAILLE_TRANCHE_VOXELS = 1 << 23
+
+# Nombre de bits à 1 de chaque octet, pour compter les voxels sans les dépaqueter
+BITS_PAR_OCTET = np.array([bin(octet).count("1") for octet in range(256)], dtype=np.uint8)
+
+def compter_bits(octets):
+    """
+    Compte les bits à 1 d'un tableau d'octets
+    """
+    return int(BITS_PAR_OCTET[np.asarray(octets, dtype=np.uint8)].sum(dtype=np.int64))
+
+class GrilleVoxels:
+    """
+    Grille d'occupation d'un volume en voxels cubiques, un bit par voxel
+
+    Trois couches sont gardées, paquetées par colonnes verticales (axe z,
+    np.packbits) : le volume du bâtiment, les murs et les sphères. Un voxel
+    appartient à une couche si son centre est dans l'objet correspondant ;
+    l'erreur sur les volumes décroît donc avec la résolution (côté d'un voxel).
+    """
+
+    def __init__(self, origine, resolution, forme):
+        self.origine = np.asarray(origine, dtype=float).reshape(3)
+        self.resolution = float(resolution)
+        if self.resolution <= 0:
+            raise ValueError("La résolution doit être positive!")
+        self.forme = tuple(int(n) for n in forme)
+        if min(self.forme) <= 0:
+            raise ValueError("La grille doit contenir au moins un voxel par axe!")
+        
+        nx, ny, nz = self.forme
+        forme_paquetee = (nx, ny, (nz + 7) // 8)
+        self.volume = np.zeros(forme_paquetee, dtype=np.uint8)
+        self.murs = np.zeros(forme_paquetee, dtype=np.uint8)
+        self.spheres = np.zeros(forme_paquetee, dtype=np.uint8)
+
+    @classmethod
+    def englobant(cls, bas, haut, resolution):
+        """
+        Crée une grille vide qui couvre la boîte [bas, haut]
+        """
+        bas, haut = np.asarray(bas, dtype=float), np.asarray(haut, dtype=float)
+        forme = np.maximum(np.ceil((haut - bas) / resolution - 1e-9), 1).astype(int)
+        return cls(bas, resolution, forme)
+
+    def axes(self):
+        """
+        Coordonnées (xs, ys, zs) des centres des voxels sur chaque axe
+        """
+        return tuple(self.origine[axe] + (np.arange(n) + 0.5) * self.resolution
+                     for axe, n in enumerate(self.forme))
+
+    @property
+    def volume_voxel(self):
+        """
+        Volume d'un voxel
+        """
+        return self.resolution ** 3
+
+    @property
+    def nombre_octets(self):
+        """
+        Mémoire occupée par les trois couches
+        """
+        return self.volume.nbytes + self.murs.nbytes + self.spheres.nbytes
+
+    def masque_plan(self, polygone):
+        """
+        Masque (nx, ny) des colonnes dont le centre est dans le polygone
+        """
+        xs, ys, _ = self.axes()
+        grille_x, grille_y = np.meshgrid(xs, ys, indexing="ij")
+        points = np.column_stack([grille_x.ravel(), grille_y.ravel()])
+        return points_dans_polygone(polygone, points).reshape(self.forme[:2])
+
+    def colonne(self, z_min, z_max):
+        """
+        Colonne verticale paquetée des voxels dont le centre est dans [z_min, z_max]
+        """
+        zs = self.axes()[2]
+        return np.packbits((zs >= z_min) & (zs <= z_max))
+
+    def extruder(self, masque, z_min, z_max):
+        """
+        Couche paquetée (nx, ny, nz/8) d'un masque plan extrudé de z_min à z_max
+        """
+        return np.where(masque[:, :, None], self.colonne(z_min, z_max)[None, None, :], np.uint8(0))
+
+    def ajouter_empreinte(self, polygone, hauteur, z_start=0.0):
+        """
+        Ajoute au volume le prisme d'un polygone
+        """
+        self.volume |= self.extruder(self.masque_plan(polygone), z_start, z_start + hauteur)
+        return self
+
+    def ajouter_murs(self, polygone, hauteur, epaisseur_mur, z_start=0.0):
+        """
+        Ajoute les murs d'épaisseur donnée qui longent le contour d'un polygone
+
+        Comme dans plan_3d, le mur occupe la bande entre le contour et son
+        décalage intérieur de epaisseur_mur.
+        """
+        polygone = normaliser_polygone(polygone)
+        interieur = decaler_polygone(polygone, epaisseur_mur)
+        masque = self.masque_plan(polygone) & ~self.masque_plan(interieur)
+        self.murs |= self.extruder(masque, z_start, z_start + hauteur)
+        return self
+
+    def colonnes_spheres(self, centres, rayons, i_min, i_max):
+        """
+        Colonnes verticales de voxels occupées par des sphères, pour les
+        lignes i_min <= i < i_max de la grille
+
+        Retourne les indices (i, j) de chaque colonne et les bornes k_min,
+        k_max (incluses) de la corde de la sphère dans cette colonne.
+        """
+        nx, ny, nz = self.forme
+        cote = int(math.ceil(2 * rayons.max() / self.resolution)) + 1
+        
+        # Boîte englobante de chaque sphère dans le plan, cote x cote colonnes
+        premier = np.ceil((centres[:, :2] - rayons[:, None] - self.origine[:2]) / self.resolution - 0.5).astype(np.int64)
+        ii = premier[:, 0:1] + np.arange(cote)
+        jj = premier[:, 1:2] + np.arange(cote)
+        dx = self.origine[0] + (ii + 0.5) * self.resolution - centres[:, 0:1]
+        dy = self.origine[1] + (jj + 0.5) * self.resolution - centres[:, 1:2]
+        
+        # Demi-corde au carré de chaque colonne, négative hors de la sphère
+        h2 = (rayons ** 2)[:, None, None] - dx[:, :, None] ** 2 - dy[:, None, :] ** 2
+        valide = (h2 >= 0) & ((ii >= i_min) & (ii < i_max))[:, :, None] & ((jj >= 0) & (jj < ny))[:, None, :]
+        s, a, b = np.nonzero(valide)
+        
+        h = np.sqrt(h2[s, a, b])
+        z = centres[s, 2] - self.origine[2]
+        k_min = np.maximum(np.ceil((z - h) / self.resolution - 0.5), 0).astype(np.int64)
+        k_max = np.minimum(np.floor((z + h) / self.resolution - 0.5), nz - 1).astype(np.int64)
+        garder = k_min <= k_max
+        return ii[s, a][garder], jj[s, b][garder], k_min[garder], k_max[garder]
+
+    def ajouter_spheres(self, centres, rayons, taille_tranche=TAILLE_TRANCHE_VOXELS):
+        """
+        Ajoute des sphères : un voxel est occupé si son centre est dans une sphère
+
+        rayons est un nombre ou un tableau (N,) d'un rayon par sphère. La
+        grille est parcourue par tranches de lignes x : chaque sphère qui
+        touche la tranche y dépose ses cordes verticales (début +1, fin -1),
+        une somme cumulée le long de z donne l'occupation, paquetée puis
+        ajoutée à la couche. Le coût suit le nombre de colonnes et non le
+        nombre de voxels de chaque sphère.
+        """
+        centres = np.asarray(centres, dtype=float).reshape(-1, 3)
+        rayons = np.broadcast_to(np.asarray(rayons, dtype=float), (len(centres),))
+        if len(centres) == 0:
+            return self
+        
+        # Sphères triées par abscisse, pour retrouver celles qui touchent une tranche
+        ordre = np.argsort(centres[:, 0], kind="stable")
+        centres, rayons = centres[ordre], rayons[ordre]
+        rayon_max = rayons.max()
+        
+        nx, ny, nz = self.forme
+        xs = self.axes()[0]
+        lignes = max(1, taille_tranche // (ny * (nz + 1)))
+        for i_min in range(0, nx, lignes):
+            i_max = min(i_min + lignes, nx)
+            debut, fin = np.searchsorted(centres[:, 0], [xs[i_min] - rayon_max, xs[i_max - 1] + rayon_max])
+            if debut == fin:
+                continue
+            
+            i, j, k_min, k_max = self.colonnes_spheres(centres[debut:fin], rayons[debut:fin], i_min, i_max)
+            base = ((i - i_min) * ny + j) * (nz + 1)
+            taille = (i_max - i_min) * ny * (nz + 1)
+            bords = np.bincount(base + k_min, minlength=taille) - np.bincount(base + k_max + 1, minlength=taille)
+            occupes = np.cumsum(bords.reshape(i_max - i_min, ny, nz + 1), axis=2)[:, :, :nz] > 0
+            self.spheres[i_min:i_max] |= np.packbits(occupes, axis=2)
+        
+        return self
+
+    def compter(self, couche):
+        """
+        Nombre de voxels d'une couche paquetée
+        """
+        return compter_bits(couche)
+
+    def occupes(self):
+        """
+        Couche paquetée des voxels du volume occupés par un mur ou une sphère
+        """
+        return self.volume & (self.murs | self.spheres)
+
+    def volume_total(self):
+        """
+        Volume du bâtiment, murs compris
+        """
+        return self.compter(self.volume) * self.volume_voxel
+
+    def volume_murs(self):
+        """
+        Volume des murs dans le bâtiment
+        """
+        return self.compter(self.volume & self.murs) * self.volume_voxel
+
+    def volume_spheres(self):
+        """
+        Volume des sphères dans le bâtiment (les recouvrements ne sont comptés qu'une fois)
+        """
+        return self.compter(self.volume & self.spheres) * self.volume_voxel
+
+    def volume_libre(self):
+        """
+        Volume du bâtiment qui n'est occupé ni par un mur ni par une sphère
+        """
+        return (self.compter(self.volume) - self.compter(self.occupes())) * self.volume_voxel
+
+    def taux_remplissage(self, sans_murs=False):
+        """
+        Pourcentage du volume occupé par les sphères
+
+        Avec sans_murs, le pourcentage porte sur l'espace intérieur, murs exclus.
+        """
+        volume = self.volume & ~self.murs if sans_murs else self.volume
+        total = self.compter(volume)
+        return 100.0 * self.compter(volume & self.spheres) / total if total else 0.0
+
+    def statistiques(self):
+        """
+        Résumé des volumes de la grille, dans le format des autres statistiques
+        """
+        return {
+            "resolution": self.resolution,
+            "forme": list(self.forme),
+            "volume_structure": self.volume_total(),
+            "volume_murs": self.volume_murs(),
+            "volume_total_spheres": self.volume_spheres(),
+            "volume_libre": self.volume_libre(),
+            "taux_remplissage": self.taux_remplissage(),
+            "taux_remplissage_interieur": self.taux_remplissage(sans_murs=True),
+        }
+
+    def coupe(self, axe, position):
+        """
+        Coupe de la grille par le plan axe = position, tableau 2D de codes
+
+        Chaque case vaut HORS_VOLUME, LIBRE, MUR ou SPHERE (une sphère dans
+        un mur est comptée comme mur). axe vaut "x", "y" ou "z".
+        """
+        numero = "xyz".index(axe)
+        indice = int(math.floor((position - self.origine[numero]) / self.resolution))
+        if not 0 <= indice < self.forme[numero]:
+            raise ValueError(f"La position {position} est hors de la grille sur l'axe {axe}!")
+        
+        def tranche(couche):
+            if numero == 2:
+                # Un seul bit par colonne, pris sans dépaqueter
+                return (couche[:, :, indice >> 3] >> (7 - (indice & 7))) & 1
+            plan = couche[indice] if numero == 0 else couche[:, indice]
+            return np.unpackbits(plan, axis=-1, count=self.forme[2])
+        
+        volume, murs, spheres = tranche(self.volume), tranche(self.murs), tranche(self.spheres)
+        codes = np.where(volume, LIBRE, HORS_VOLUME).astype(np.uint8)
+        codes[(volume & spheres).astype(bool)] = SPHERE
+        codes[(volume & murs).astype(bool)] = MUR
+        return codes
+
+    def dense(self, couche):
+        """
+        Dépaquette une couche en tableau booléen (nx, ny, nz)
+        """
+        return np.unpackbits(couche, axis=-1, count=self.forme[2]).astype(bool)
+
+def voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur=0.0, centres=None, rayons=None):
+    """
+    Construit la grille d'occupation du prisme d'un polygone, avec ses murs
+    et ses sphères éventuels
+    """
+    polygone = normaliser_polygone(polygone)
+    bas, haut = polygone.min(axis=0), polygone.max(axis=0)
+    grille = GrilleVoxels.englobant([bas[0], bas[1], 0.0], [haut[0], haut[1], hauteur], resolution)
+    grille.ajouter_empreinte(polygone, hauteur)
+    if epaisseur_mur > 0:
+        grille.ajouter_murs(polygone, hauteur, epaisseur_mur)
+    if centres is not None:
+        grille.ajouter_spheres(centres, rayons)
+    return grille
+
+def voxeliser_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras, hauteur, resolution,
+                    epaisseur_mur=0.0, disposition=None):
+    """
+    Construit la grille d'occupation de la croix (murs de plan_3d et
+    sphères d'une disposition éventuels)
+    """
+    polygone = polygone_croix(largeur_centrale, longueur_centrale, largeur_bras, longueur_bras)
+    if disposition is None:
+        return voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur)
+    return voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur, disposition.centres, disposition.rayon)
+
+def voxeliser_boite(largeur, longueur, hauteur, resolution, epaisseur_mur=0.0, disposition=None):
+    """
+    Construit la grille d'occupation d'un parallélépipède
+    """
+    polygone = polygone_rectangle(0, 0, largeur, longueur)
+    if disposition is None:
+        return voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur)
+    return voxeliser_empreinte(polygone, hauteur, resolution, epaisseur_mur, disposition.centres, disposition.rayon)
\ No newline at end of file